@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Batch summarization of whole directories of recordings and documents.
+
+Walks a directory (or reads a manifest of paths / JSON lines), extracts every
+file on the worker processes and summarizes it with the same chain as the API,
+writing one result per file as JSONL or Parquet part files. Progress is
+checkpointed, so running the same command again after a crash or Ctrl-C
+continues with the files that are not done yet. Configuration comes from the
+same environment variables as the server (.env is read).
+
+    python batch.py archive/2023 --output results/2023.jsonl
+    python batch.py manifest.jsonl --format parquet --output results/parquet --analysis-type all
+"""
+
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from models.meeting_models import ANALYSIS_TYPES
+from services.batch import SUPPORTED_EXTENSIONS, BatchCheckpoint, BatchRunner, JsonlWriter, ParquetWriter, discover
+from services.executors import ExecutionPools
+from services.llm_cache import LLMResponseCache
+from services.llm_client import AsyncLLMClient
+from services.summarization_chain import SummarizationChain
+from services.summary_store import ChunkSummaryStore
+from services.text_cleaning import TextCleaner
+from services.token_budget import TokenBudget
+
+def build_services(args):
+    token_budget = TokenBudget(
+        context_window=int(os.getenv("LLM_CONTEXT_WINDOW", "30720")),
+        max_output_tokens=2000,
+        chars_per_token=float(os.getenv("LLM_CHARS_PER_TOKEN", "4.0"))
+    )
+    processor_options = {
+        "cache_dir": os.getenv("EXTRACTION_CACHE_DIR", "cache/extraction") or None,
+        "cache_max_bytes": int(os.getenv("EXTRACTION_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+        "chunking": os.getenv("CHUNKING_MODE", "characters"),
+        "token_budget": token_budget,
+        "max_chunk_tokens": int(os.getenv("MAX_CHUNK_TOKENS", "0")) or None,
+        "whisper_model": os.getenv("WHISPER_MODEL", "base"),
+        "cleaner": TextCleaner.from_env()
+    }
+    pools = ExecutionPools.from_env(processor_options)
+    if args.workers:
+        pools.cpu_workers = args.workers
+    chain = SummarizationChain(
+        gemini_api_key=os.getenv("GEMINI_API_KEY"),
+        llm_client=AsyncLLMClient.from_env(os.getenv("GEMINI_API_KEY"), count_tokens=token_budget.count),
+        response_cache=LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "86400")),
+            db_path=os.getenv("LLM_CACHE_DB") or None
+        ),
+        token_budget=token_budget,
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+        parallel_sections=os.getenv("LLM_PARALLEL_SECTIONS", "true").lower() == "true",
+        combined_sections=os.getenv("LLM_COMBINED_SECTIONS", "false").lower() == "true",
+        summary_store=ChunkSummaryStore(
+            db_path=os.getenv("SUMMARY_STORE_DB", "cache/summaries.db") or None,
+            max_entries=int(os.getenv("SUMMARY_STORE_MAX_ENTRIES", "100000"))
+        )
+    )
+    return pools, chain, token_budget
+
+async def run(args):
+    pools, chain, token_budget = build_services(args)
+    if args.format == "parquet":
+        writer = ParquetWriter(args.output, rows_per_file=args.rows_per_file)
+    else:
+        writer = JsonlWriter(args.output)
+    checkpoint = BatchCheckpoint(args.checkpoint or args.output.rstrip("/\\") + ".checkpoint.db")
+    items = list(discover(args.source, args.extensions or SUPPORTED_EXTENSIONS))
+    print(f"{len(items)} files found in {args.source}")
+
+    runner = BatchRunner(
+        pools, chain, writer, checkpoint, token_budget.count,
+        analysis_type=args.analysis_type,
+        whisper_model=args.whisper_model,
+        summarize=not args.no_summarize,
+        include_transcript=args.include_transcript,
+        summary_concurrency=args.summary_concurrency,
+        report_seconds=args.report_seconds
+    )
+    try:
+        await runner.run(items)
+    finally:
+        pools.shutdown()
+        chain.llm.close()
+    print(f"Checkpoint: {checkpoint.stats()}")
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory to walk, or a manifest with one path (or JSON object) per line")
+    parser.add_argument("--output", required=True, help="JSONL file, or a directory for --format parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint database (default: <output>.checkpoint.db)")
+    parser.add_argument("--analysis-type", choices=ANALYSIS_TYPES, default="comprehensive")
+    parser.add_argument("--whisper-model", default=None)
+    parser.add_argument("--extensions", nargs="+", default=None, help="file extensions to pick up in a directory")
+    parser.add_argument("--no-summarize", action="store_true", help="only extract/transcribe")
+    parser.add_argument("--include-transcript", action="store_true", help="store the cleaned transcript in the output")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU_POOL_SIZE)")
+    parser.add_argument("--summary-concurrency", type=int, default=4, help="files summarized at the same time")
+    parser.add_argument("--rows-per-file", type=int, default=500, help="records per Parquet part file")
+    parser.add_argument("--report-seconds", type=float, default=10.0, help="how often throughput is printed")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Chunking benchmark: character splitter vs token-budget splitter.
+
+Each sample transcript is split with both modes and summarized through
+SummarizationChain.process_chunks against a simulated LLM whose latency grows
+with the prompt size, so no API key is needed. Reports chunk counts, LLM calls
+per stage and wall-clock time.
+
+    python benchmarks/chunking_benchmark.py --minutes 30 90 180
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.document_processor import DocumentProcessor
+from services.summarization_chain import SummarizationChain
+from services.token_budget import TokenBudget
+
+WORDS_PER_MINUTE = 150
+
+class SimulatedLLM:
+    """Latency = base + per-1k-prompt-tokens cost; returns a fixed-size summary"""
+
+    def __init__(self, budget, base_latency, seconds_per_1k_tokens, max_output_tokens=2000):
+        self.budget = budget
+        self.base_latency = base_latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.max_output_tokens = max_output_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, use_cache=True):
+        tokens = self.budget.count(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += tokens
+        time.sleep(self.base_latency + tokens / 1000 * self.seconds_per_1k_tokens)
+        return "Summary of the discussion. " * 40
+
+def synthesize_transcript(sample, minutes):
+    """Repeat the sample with numbered segments until it reaches the requested meeting length"""
+    target_words = minutes * WORDS_PER_MINUTE
+    parts = []
+    words = 0
+    segment = 0
+    while words < target_words:
+        segment += 1
+        text = f"Segment {segment}. {sample}"
+        parts.append(text)
+        words += len(text.split())
+    return "\n\n".join(parts)
+
+def run(transcript, mode, args):
+    budget = TokenBudget()
+    processor = DocumentProcessor(chunking=mode, token_budget=budget)
+    cleaned = processor._clean_text(transcript)
+    chunks = processor._split_text(cleaned)
+
+    chain = SummarizationChain(gemini_api_key="benchmark", max_concurrency=args.concurrency, token_budget=budget)
+    llm = SimulatedLLM(budget, args.base_latency, args.seconds_per_1k_tokens)
+    chain.llm = llm
+
+    start_time = time.perf_counter()
+    result = chain.process_chunks(chunks, args.analysis_type, text=cleaned)
+    elapsed = time.perf_counter() - start_time
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+
+    calls = result["llm_calls"]
+    return {
+        "chunks": len(chunks),
+        "map": calls["map"],
+        "reduce": calls["reduce"],
+        "final": calls["final"],
+        "calls": llm.calls,
+        "prompt_tokens": llm.prompt_tokens,
+        "seconds": elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=["uploads/meeting.txt"], help="sample transcripts")
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90, 180],
+                        help="synthetic meeting lengths built from the samples")
+    parser.add_argument("--analysis-type", default="comprehensive")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-latency", type=float, default=0.05, help="simulated seconds per call")
+    parser.add_argument("--seconds-per-1k-tokens", type=float, default=0.01, help="simulated prompt cost")
+    args = parser.parse_args()
+
+    header = f"{'transcript':<28} {'mode':<11} {'chunks':>6} {'map':>5} {'reduce':>6} {'final':>5} {'calls':>5} {'tokens':>8} {'time':>7}"
+    print(header)
+    print("-" * len(header))
+    for filepath in args.files:
+        sample = Path(filepath).read_text(encoding="utf-8")
+        for minutes in args.minutes:
+            transcript = synthesize_transcript(sample, minutes)
+            label = f"{Path(filepath).name} ({minutes} min)"
+            for mode in ("characters", "tokens"):
+                stats = run(transcript, mode, args)
+                print(
+                    f"{label:<28} {mode:<11} {stats['chunks']:>6} {stats['map']:>5} {stats['reduce']:>6} "
+                    f"{stats['final']:>5} {stats['calls']:>5} {stats['prompt_tokens']:>8} {stats['seconds']:>6.2f}s"
+                )
+
+if __name__ == "__main__":
+    main()
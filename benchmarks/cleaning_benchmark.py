@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Cleaning benchmark: single-pass TextCleaner vs the previous str.replace chain.
+
+Multi-MB transcripts are synthesized from a sample, with fillers, line breaks
+and stray spaces mixed in the way Whisper output has them. Each
+implementation cleans every transcript several times. The script reports
+throughput (MB/s) and the peak memory allocated during one call (tracemalloc),
+both for whole transcripts and for segment-by-segment streaming.
+
+    python benchmarks/cleaning_benchmark.py --sizes-mb 1 8 32
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.text_cleaning import TextCleaner
+
+NOISE = ["um,", "uh,", "Um,", "you know,", "uh", " ,", " .", "  ", "\n", "\n\n"]
+
+def legacy_clean_text(text):
+    """DocumentProcessor._clean_text before the single-pass engine"""
+    text = " ".join(text.split())
+    text = text.replace("um,", "").replace("uh,", "").replace("you know,", "")
+    text = text.replace(" ,", ",").replace(" .", ".")
+    text = text.replace("  ", " ")
+    return text.strip()
+
+def synthesize_segments(sample, size_mb, noise, seed=0):
+    """Whisper-like segments of 8-20 words; `noise` is the share of words followed by a filler or stray space"""
+    rng = random.Random(seed)
+    words = sample.split()
+    target = int(size_mb * 1024 * 1024)
+    segments = []
+    size = 0
+    position = 0
+    while size < target:
+        length = rng.randint(8, 20)
+        segment_words = []
+        for _ in range(length):
+            segment_words.append(words[position % len(words)])
+            position += 1
+            if rng.random() < noise:
+                segment_words.append(rng.choice(NOISE))
+        segment = " ".join(segment_words)
+        segments.append(segment)
+        size += len(segment) + 1
+    return segments
+
+def measure(func, argument, repeat):
+    """(best seconds, peak bytes allocated by one call)"""
+    seconds = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(argument)
+        seconds.append(time.perf_counter() - start_time)
+    tracemalloc.start()
+    func(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(seconds), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", default="uploads/meeting.txt", help="text the transcripts are built from")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--noise", type=float, default=0.02, help="share of words followed by a filler or stray space")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sample = Path(args.sample).read_text(encoding="utf-8")
+    cleaner = TextCleaner()
+    implementations = [
+        ("legacy str.replace", lambda segments: legacy_clean_text("\n".join(segments))),
+        ("TextCleaner.clean", lambda segments: cleaner.clean("\n".join(segments))),
+        # Streaming never holds a full-size intermediate copy; the join is the output itself
+        ("clean_segments", lambda segments: "".join(cleaner.clean_segments(segments)))
+    ]
+
+    header = f"{'size':>7} {'implementation':<20} {'time':>8} {'MB/s':>8} {'peak alloc':>11} {'output':>9}"
+    print(header)
+    print("-" * len(header))
+    for size_mb in args.sizes_mb:
+        segments = synthesize_segments(sample, size_mb, args.noise)
+        megabytes = sum(len(segment) + 1 for segment in segments) / (1024 * 1024)
+        for name, func in implementations:
+            seconds, peak = measure(func, segments, args.repeat)
+            output_mb = len(func(segments)) / (1024 * 1024)
+            print(f"{megabytes:>5.1f}MB {name:<20} {seconds:>7.3f}s {megabytes / seconds:>8.1f} "
+                  f"{peak / (1024 * 1024):>8.1f} MB {output_mb:>6.1f} MB")
+
+if __name__ == "__main__":
+    main()
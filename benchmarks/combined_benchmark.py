@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Combined-prompt benchmark: one JSON call vs four section calls for "all".
+
+Each sample transcript is analyzed with SummarizationChain.process_transcript
+against a simulated LLM whose latency grows with prompt and output size, so no
+API key is needed. Reports LLM calls, prompt tokens billed and wall-clock time
+for sequential sections, parallel sections and the combined prompt.
+--invalid-json makes that share of combined answers unparseable to measure the
+cost of the fallback.
+
+    python benchmarks/combined_benchmark.py --minutes 10 30 60
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.summarization_chain import SummarizationChain
+from services.token_budget import TokenBudget
+
+WORDS_PER_MINUTE = 150
+
+class SimulatedLLM:
+    """Latency = base + prompt cost + output cost; JSON answers when a schema is requested"""
+
+    def __init__(self, budget, args):
+        self.budget = budget
+        self.args = args
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, use_cache=True, json_schema=None):
+        tokens = self.budget.count(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += tokens
+        section = "Summary of the discussion. " * 60
+        if json_schema is None:
+            output = section
+        elif self._random.random() < self.args.invalid_json:
+            output = '{"comprehensive_summary": "truncated'
+        else:
+            output = json.dumps({key: section for key in json_schema["properties"]})
+        time.sleep(
+            self.args.base_latency
+            + tokens / 1000 * self.args.seconds_per_1k_prompt_tokens
+            + self.budget.count(output) / 1000 * self.args.seconds_per_1k_output_tokens
+        )
+        return output
+
+def synthesize_transcript(sample, minutes):
+    target_words = minutes * WORDS_PER_MINUTE
+    parts = []
+    words = 0
+    while words < target_words:
+        parts.append(sample)
+        words += len(sample.split())
+    return "\n\n".join(parts)
+
+def run(transcript, mode, args):
+    budget = TokenBudget()
+    chain = SummarizationChain(
+        gemini_api_key="benchmark",
+        token_budget=budget,
+        parallel_sections=mode != "sequential",
+        combined_sections=mode == "combined"
+    )
+    llm = SimulatedLLM(budget, args)
+    chain.llm = llm
+
+    start_time = time.perf_counter()
+    result = chain.process_transcript(transcript, "all")
+    elapsed = time.perf_counter() - start_time
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    return {"calls": llm.calls, "prompt_tokens": llm.prompt_tokens, "seconds": elapsed,
+            "fallback": mode == "combined" and not result.get("combined")}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=["uploads/meeting.txt"], help="sample transcripts")
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 30, 60])
+    parser.add_argument("--base-latency", type=float, default=0.3, help="simulated seconds per call")
+    parser.add_argument("--seconds-per-1k-prompt-tokens", type=float, default=0.05)
+    parser.add_argument("--seconds-per-1k-output-tokens", type=float, default=0.5)
+    parser.add_argument("--invalid-json", type=float, default=0.0, help="share of unparseable combined answers")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = f"{'transcript':<28} {'mode':<11} {'calls':>5} {'prompt tokens':>13} {'time':>7} {'fallbacks':>9}"
+    print(header)
+    print("-" * len(header))
+    for filepath in args.files:
+        sample = Path(filepath).read_text(encoding="utf-8")
+        for minutes in args.minutes:
+            transcript = synthesize_transcript(sample, minutes)
+            label = f"{Path(filepath).name} ({minutes} min)"
+            for mode in ("sequential", "parallel", "combined"):
+                runs = [run(transcript, mode, args) for _ in range(args.repeat)]
+                calls = sum(r["calls"] for r in runs) / len(runs)
+                tokens = sum(r["prompt_tokens"] for r in runs) / len(runs)
+                seconds = sum(r["seconds"] for r in runs) / len(runs)
+                fallbacks = sum(r["fallback"] for r in runs)
+                print(f"{label:<28} {mode:<11} {calls:>5.1f} {tokens:>13.0f} {seconds:>6.2f}s {fallbacks:>6}/{len(runs)}")
+
+if __name__ == "__main__":
+    main()
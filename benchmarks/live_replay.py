@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Live meeting client: replays audio files over the /live WebSocket in real time.
+
+Each file is decoded to 16 kHz mono PCM (WAV files in that format are sent as
+they are, anything else goes through ffmpeg) and sent in --frame-ms frames at
+the pace of the recording (--speed 2 sends twice as fast). Transcript segments
+and running summaries are printed as they arrive, with the lag between the
+audio being sent and its segment coming back.
+
+--sessions N replays the same file over N concurrent sessions to see how many
+live meetings the server keeps up with; the summary line reports the lag per
+session.
+
+    python benchmarks/live_replay.py uploads/meeting.wav --url ws://localhost:8000/live
+    python benchmarks/live_replay.py uploads/meeting.wav --sessions 8 --speed 4 --quiet
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.document_processor import WHISPER_SAMPLE_RATE
+from services.streaming_transcription import BYTES_PER_SAMPLE, decode_to_pcm
+
+def load_pcm(filepath):
+    """16 kHz mono s16le bytes of an audio file"""
+    if filepath.lower().endswith(".wav"):
+        with wave.open(filepath, "rb") as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (WHISPER_SAMPLE_RATE, 1, BYTES_PER_SAMPLE):
+                return wav.readframes(wav.getnframes())
+    with tempfile.TemporaryDirectory() as tmp:
+        return Path(decode_to_pcm(filepath, str(Path(tmp) / "audio.pcm"))).read_bytes()
+
+async def replay(pcm, args, session_number):
+    import websockets
+
+    frame_bytes = int(WHISPER_SAMPLE_RATE * args.frame_ms / 1000) * BYTES_PER_SAMPLE
+    url = f"{args.url}?encoding=pcm&analysis_type={args.analysis_type}"
+    if args.whisper_model:
+        url += f"&whisper_model={args.whisper_model}"
+    label = f"[{session_number}] " if args.sessions > 1 else ""
+    lags = []
+    summaries = 0
+    final = None
+
+    async with websockets.connect(url, max_size=None) as websocket:
+        ready = json.loads(await websocket.recv())
+        if ready["type"] != "ready":
+            raise RuntimeError(ready.get("error", ready))
+        start_time = time.perf_counter()
+
+        async def send():
+            for offset in range(0, len(pcm), frame_bytes):
+                # Real-time pacing: the frame is sent once its audio "has been spoken"
+                due = start_time + offset / BYTES_PER_SAMPLE / WHISPER_SAMPLE_RATE / args.speed
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await websocket.send(pcm[offset:offset + frame_bytes])
+            await websocket.send(json.dumps({"type": "stop"}))
+
+        sender = asyncio.create_task(send())
+        async for raw in websocket:
+            message = json.loads(raw)
+            if message["type"] == "segment":
+                sent_at = start_time + message["end"] / args.speed
+                lags.append(time.perf_counter() - sent_at)
+                if not args.quiet:
+                    print(f"{label}{message['start']:>7.1f}s  (+{lags[-1]:.1f}s)  {message['text']}")
+            elif message["type"] == "summary":
+                summaries += 1
+                if not args.quiet:
+                    print(f"{label}--- running summary after {message['stats']['audio_seconds']:.0f}s of audio ---")
+                    print(message["analysis"].get("comprehensive_summary") or message["analysis"])
+            elif message["type"] == "final":
+                final = message
+            elif message["type"] == "error":
+                print(f"{label}error: {message['error']}")
+        await sender
+
+    return {"lags": lags, "summaries": summaries, "final": final, "seconds": time.perf_counter() - start_time}
+
+async def run(args):
+    pcm = load_pcm(args.file)
+    duration = len(pcm) / BYTES_PER_SAMPLE / WHISPER_SAMPLE_RATE
+    print(f"Replaying {args.file} ({duration:.0f}s) over {args.sessions} session(s) at {args.speed}x")
+    results = await asyncio.gather(*(replay(pcm, args, number + 1) for number in range(args.sessions)))
+
+    print(f"\n{'session':>7} {'segments':>8} {'summaries':>9} {'median lag':>10} {'max lag':>8} {'final':>6}")
+    for number, result in enumerate(results, 1):
+        lags = result["lags"] or [0.0]
+        final_ok = bool(result["final"] and result["final"]["analysis"].get("success"))
+        print(f"{number:>7} {len(result['lags']):>8} {result['summaries']:>9} "
+              f"{statistics.median(lags):>9.1f}s {max(lags):>7.1f}s {'ok' if final_ok else 'failed':>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="WAV (or any ffmpeg-readable) recording")
+    parser.add_argument("--url", default="ws://localhost:8000/live")
+    parser.add_argument("--frame-ms", type=int, default=100)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed relative to real time")
+    parser.add_argument("--sessions", type=int, default=1, help="concurrent sessions")
+    parser.add_argument("--whisper-model", default=None)
+    parser.add_argument("--analysis-type", default="comprehensive")
+    parser.add_argument("--quiet", action="store_true", help="only print the per-session table")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: latency of the cheap endpoints while uploads are being processed.
+
+Start the server first:
+    uvicorn main:app --host 127.0.0.1 --port 8000
+
+Then run:
+    python benchmarks/load_benchmark.py --file path/to/recording.mp3 --uploads 4
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+CHEAP_ENDPOINTS = ["/", "/analysis-types"]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def timed_get(base_url, path):
+    start_time = time.perf_counter()
+    with urllib.request.urlopen(base_url + path, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - start_time
+
+def post_upload(base_url, filepath):
+    """POST a file to /upload as multipart/form-data using only the standard library"""
+    boundary = uuid.uuid4().hex
+    payload = Path(filepath).read_bytes()
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{Path(filepath).name}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(
+        base_url + "/upload",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    start_time = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=3600) as response:
+        response.read()
+    return time.perf_counter() - start_time
+
+def probe_cheap_endpoints(base_url, stop_event, latencies, interval):
+    while not stop_event.is_set():
+        for path in CHEAP_ENDPOINTS:
+            latencies[path].append(timed_get(base_url, path))
+        time.sleep(interval)
+
+def run_phase(base_url, filepath, uploads, probes, duration, interval):
+    latencies = {path: [] for path in CHEAP_ENDPOINTS}
+    upload_times = []
+    stop_event = threading.Event()
+
+    probe_threads = [
+        threading.Thread(target=probe_cheap_endpoints, args=(base_url, stop_event, latencies, interval))
+        for _ in range(probes)
+    ]
+    upload_threads = [
+        threading.Thread(target=lambda: upload_times.append(post_upload(base_url, filepath)))
+        for _ in range(uploads)
+    ]
+
+    for thread in probe_threads + upload_threads:
+        thread.start()
+
+    if uploads:
+        for thread in upload_threads:
+            thread.join()
+    else:
+        time.sleep(duration)
+
+    stop_event.set()
+    for thread in probe_threads:
+        thread.join()
+
+    return latencies, upload_times
+
+def report(title, latencies, upload_times):
+    print(f"\n{title}")
+    print("-" * 50)
+    for path, values in latencies.items():
+        print(
+            f"{path:<16} n={len(values):<5} "
+            f"p50={percentile(values, 50) * 1000:8.1f}ms  "
+            f"p99={percentile(values, 99) * 1000:8.1f}ms"
+        )
+    if upload_times:
+        print(f"{'/upload':<16} n={len(upload_times):<5} mean={statistics.mean(upload_times):8.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--file", default="uploads/meeting.txt", help="file to upload during the loaded phase")
+    parser.add_argument("--uploads", type=int, default=4, help="concurrent uploads in the loaded phase")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent cheap-endpoint clients")
+    parser.add_argument("--idle-seconds", type=float, default=5.0, help="duration of the idle baseline phase")
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between probe requests")
+    args = parser.parse_args()
+
+    latencies, _ = run_phase(args.url, args.file, 0, args.probes, args.idle_seconds, args.interval)
+    report("Idle baseline", latencies, [])
+
+    latencies, upload_times = run_phase(args.url, args.file, args.uploads, args.probes, 0, args.interval)
+    report(f"During {args.uploads} concurrent uploads of {args.file}", latencies, upload_times)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Payload benchmark: what one upload costs on the wire and in server memory,
+with chunks stored as text copies vs as offsets with a transcript ID.
+
+    copies    every chunk holds its own content (plus the 10% overlap), the
+              upload response carries the cleaned and the raw transcript, and
+              /summarize gets the cleaned transcript posted back
+    offsets   chunks are (start, end) offsets into the cleaned transcript, the
+              transcript is kept once under transcript_id, the raw transcript
+              is left out, and /summarize gets the ID
+
+Transcripts are synthesized from a sample, like in cleaning_benchmark.py.
+Each mode and size runs in a fresh interpreter, which reports the RSS growth
+while the upload result and its response are alive and, in a second pass,
+the Python allocations (held and peak, tracemalloc).
+
+    python benchmarks/payload_benchmark.py --sizes-mb 1 4 16
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ["copies", "offsets"]
+
+def build(mode, raw):
+    """Upload result, /upload response body and /summarize request body, as the server holds them"""
+    from services.document_processor import DocumentProcessor
+    from services.transcript_store import TranscriptStore
+
+    processor = DocumentProcessor()
+    cleaned = processor._clean_text(raw)
+    chunks = processor._split_text(cleaned)
+    info = {"text_length": len(cleaned), "word_count": len(cleaned.split()), "chunk_count": len(chunks)}
+    if mode == "copies":
+        chunks = [{**chunk, "content": cleaned[chunk["start"]:chunk["end"]]} for chunk in chunks]
+        response = {"transcript": cleaned, "raw_transcript": raw, "chunks": len(chunks), "processing_info": info}
+        request = {"transcript": cleaned, "analysis_type": "comprehensive"}
+        store = None
+    else:
+        store = TranscriptStore()
+        transcript_id = store.put(cleaned, chunks, {})
+        response = {"transcript_id": transcript_id, "transcript": cleaned, "chunks": len(chunks), "processing_info": info}
+        request = {"transcript_id": transcript_id, "analysis_type": "comprehensive"}
+    result = {"raw_transcript": raw, "cleaned_transcript": cleaned, "chunks": chunks}
+    return result, json.dumps(response), json.dumps(request), store
+
+def child(mode, size_mb, noise):
+    import gc
+    import tracemalloc
+
+    from cleaning_benchmark import synthesize_segments
+    from services.model_registry import rss_bytes
+
+    sample = (ROOT / "uploads" / "meeting.txt").read_text(encoding="utf-8")
+    raw = "\n".join(synthesize_segments(sample, size_mb, noise))
+    build(mode, raw[:10000])  # imports and regex compilation stay out of the measurement
+
+    gc.collect()
+    rss_before = rss_bytes()
+    kept = build(mode, raw)
+    rss_growth = rss_bytes() - rss_before
+    upload_bytes, request_bytes = len(kept[1].encode()), len(kept[2].encode())
+    del kept
+    gc.collect()
+
+    tracemalloc.start()
+    kept = build(mode, raw)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({
+        "raw_bytes": len(raw.encode()), "upload_bytes": upload_bytes, "request_bytes": request_bytes,
+        "held": held, "peak": peak, "rss_growth": rss_growth, "chunks": len(kept[0]["chunks"])
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--noise", type=float, default=0.02, help="share of words followed by a filler or stray space")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SIZE_MB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(ROOT))
+        child(args.child[0], float(args.child[1]), args.noise)
+        return
+
+    megabyte = 1024 * 1024
+    header = (f"{'size':>7} {'mode':<8} {'chunks':>6} {'/upload':>10} {'/summarize':>11} "
+              f"{'held':>9} {'peak':>9} {'RSS growth':>11}")
+    print(header)
+    print("-" * len(header))
+    for size_mb in args.sizes_mb:
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(size_mb), "--noise", str(args.noise)],
+                capture_output=True, text=True, check=True, cwd=ROOT
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{stats['raw_bytes'] / megabyte:>5.1f}MB {mode:<8} {stats['chunks']:>6} "
+                  f"{stats['upload_bytes'] / megabyte:>7.2f} MB {stats['request_bytes'] / 1024:>8.1f} KB "
+                  f"{stats['held'] / megabyte:>6.1f} MB {stats['peak'] / megabyte:>6.1f} MB "
+                  f"{stats['rss_growth'] / megabyte:>8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: encoding large summary responses.
+
+Responses are built like a /process result for a long recording: the four
+analysis sections plus one chunk_results entry per chunk. Each encoder turns
+the same payload into JSON bytes several times; the best time is reported.
+
+    json.dumps           Starlette's JSONResponse (the previous default)
+    jsonable_encoder     FastAPI's conversion of a returned dict without a
+                         response_model, followed by json.dumps
+    SummaryResponse      FastAPI's response_model path with pydantic v2:
+                         validate, then serialize in pydantic-core
+    serialization.dumps  what FastJSONResponse renders with (orjson when installed)
+
+Encoders whose package is missing are skipped.
+
+    python benchmarks/serialization_benchmark.py --chunks 100 1000 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.meeting_models import SummaryResponse
+from services import serialization
+
+WORDS = ("budget roadmap hiring launch customer review quarter design deadline migration "
+         "owner risk follow-up decision metrics onboarding release support").split()
+
+def text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def build_payload(chunks, seed=0):
+    rng = random.Random(seed)
+    return {
+        "success": True,
+        "analysis_type": "all",
+        "comprehensive_summary": text(rng, 600),
+        "topic_analysis": text(rng, 300),
+        "action_items": text(rng, 300),
+        "sentiment_analysis": text(rng, 200),
+        "input_length": chunks * 4000,
+        "word_count": chunks * 700,
+        "total_chunks": chunks,
+        "chunks_reused": 0,
+        "chunks_recomputed": chunks,
+        "reduce_levels": 2,
+        "llm_calls": {"map": chunks, "reduce": chunks // 8, "final": 4, "total": chunks + chunks // 8 + 4},
+        "chunk_results": [
+            {"success": True, "chunk_index": index, "summary": text(rng, 150), "reused": False,
+             "input_length": 4000, "latency": round(rng.uniform(0.5, 3.0), 2)}
+            for index in range(chunks)
+        ],
+        "processing_time": 12.34
+    }
+
+def encoders():
+    def starlette(payload):
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+    found = [("json.dumps", starlette)]
+    try:
+        from fastapi.encoders import jsonable_encoder
+        found.append(("jsonable_encoder", lambda payload: starlette(jsonable_encoder(payload))))
+    except ImportError:
+        pass
+    found.append(("SummaryResponse", lambda payload: SummaryResponse.model_validate(payload).model_dump_json(exclude_none=True).encode("utf-8")))
+    name = "serialization.dumps" + (" (orjson)" if serialization.orjson is not None else " (json)")
+    found.append((name, serialization.dumps))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    header = f"{'chunks':>6} {'payload':>9} {'encoder':<28} {'time':>9} {'MB/s':>8}"
+    print(header)
+    print("-" * len(header))
+    for chunks in args.chunks:
+        payload = build_payload(chunks)
+        reference = json.loads(encoders()[0][1](payload))
+        for name, encode in encoders():
+            seconds = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                output = encode(payload)
+                seconds.append(time.perf_counter() - start_time)
+            if json.loads(output) != reference:
+                raise RuntimeError(f"{name} produced different JSON")
+            megabytes = len(output) / (1024 * 1024)
+            print(f"{chunks:>6} {megabytes:>6.2f} MB {name:<28} {min(seconds) * 1000:>7.1f}ms {megabytes / min(seconds):>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time and resident memory of the app per configuration.
+
+Every run starts a fresh interpreter that imports main and runs the startup
+preload, so nothing is shared between runs. Reported numbers are medians.
+
+    text-only       PRELOAD_MODULES=""          (heavy dependencies load on first use)
+    audio-enabled   PRELOAD_MODULES="audio"     (numpy; Whisper/torch load in the pool workers, not here)
+    full            PRELOAD_MODULES="all"       (numpy and httpx; the document loaders also load in the workers)
+
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CONFIGURATIONS = [
+    ("text-only", ""),
+    ("audio-enabled", "audio"),
+    ("full", "all")
+]
+
+# Runs in the child interpreter
+PROBE = """
+import json, sys, time
+start_time = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.preload_modules()
+ready = time.perf_counter()
+from services.model_registry import rss_bytes
+heavy = ["torch", "whisper", "google.generativeai", "pypdf", "docx2txt"]
+print(json.dumps({
+    "import_seconds": imported - start_time,
+    "preload_seconds": ready - imported,
+    "rss_bytes": rss_bytes(),
+    "loaded": [name for name in heavy if name in sys.modules]
+}))
+"""
+
+def measure(preload_modules):
+    env = dict(os.environ, PRELOAD_MODULES=preload_modules, WHISPER_PRELOAD="false")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    header = f"{'configuration':<15} {'import':>8} {'preload':>8} {'total':>8} {'RSS':>9}  heavy modules loaded"
+    print(header)
+    print("-" * len(header))
+    for name, preload_modules in CONFIGURATIONS:
+        try:
+            runs = [measure(preload_modules) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<15} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        import_seconds = statistics.median(run["import_seconds"] for run in runs)
+        preload_seconds = statistics.median(run["preload_seconds"] for run in runs)
+        rss_mb = statistics.median(run["rss_bytes"] for run in runs) / (1024 * 1024)
+        print(
+            f"{name:<15} {import_seconds:>7.2f}s {preload_seconds:>7.2f}s {import_seconds + preload_seconds:>7.2f}s "
+            f"{rss_mb:>6.0f} MB  {', '.join(runs[-1]['loaded']) or '-'}"
+        )
+
+if __name__ == "__main__":
+    main()
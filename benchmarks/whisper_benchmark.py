@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Whisper benchmark: real-time factor of parallel transcription per worker count.
+
+The reference recording is decoded to PCM once, then transcribed with one
+Whisper call in a single worker and with ParallelTranscriber for each worker
+count. Models are loaded before timing starts. RTF = wall-clock seconds /
+audio seconds (lower is better; below 1.0 is faster than real time).
+
+    python benchmarks/whisper_benchmark.py recording.mp3 --workers 1 2 4 --model base
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.document_processor import DocumentProcessor
+from services.executors import ExecutionPools
+from services.parallel_transcription import ParallelTranscriber
+from services.streaming_transcription import decode_to_pcm, pcm_duration
+
+async def warm_up(pools):
+    """Start every worker (and load its model) before timing; each blocking task occupies one worker"""
+    await asyncio.gather(*(pools.run_cpu(time.sleep, 1.0) for _ in range(pools.cpu_workers)))
+
+async def run(filepath, pcm_path, workers, args, parallel):
+    options = {"whisper_model": args.model}
+    pools = ExecutionPools(cpu_workers=workers, io_workers=4, processor_options=options, preload_whisper=True)
+    try:
+        await warm_up(pools)
+        start_time = time.perf_counter()
+        if parallel:
+            transcriber = ParallelTranscriber(pools, DocumentProcessor(**options), segment_seconds=args.segment_seconds)
+            result = await transcriber.process_file(filepath, decoded_audio=pcm_path)
+        else:
+            result = await pools.process_file(filepath, decoded_audio=pcm_path)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        pools.shutdown()
+
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    return elapsed, result["metadata"].get("parallel_segments", 1), len(result["cleaned_transcript"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="reference recording")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--segment-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pcm_path = decode_to_pcm(args.file, str(Path(tmp) / "reference.pcm"))
+        duration = pcm_duration(pcm_path)
+        print(f"{Path(args.file).name}: {duration:.0f}s of audio, model {args.model}")
+
+        header = f"{'mode':<10} {'workers':>7} {'segments':>8} {'time':>8} {'RTF':>6} {'speedup':>7} {'chars':>7}"
+        print(header)
+        print("-" * len(header))
+
+        baseline = None
+        runs = [(1, False)] + [(workers, True) for workers in args.workers]
+        for workers, parallel in runs:
+            elapsed, segments, chars = asyncio.run(run(args.file, pcm_path, workers, args, parallel))
+            baseline = baseline or elapsed
+            mode = "parallel" if parallel else "single"
+            print(
+                f"{mode:<10} {workers:>7} {segments:>8} {elapsed:>7.1f}s {elapsed / duration:>6.3f} "
+                f"{baseline / elapsed:>6.2f}x {chars:>7}"
+            )
+
+if __name__ == "__main__":
+    main()
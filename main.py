@@ -1,43 +1,340 @@
-from fastapi import FastAPI, Request, UploadFile, File, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import google.generativeai as genai
 from dotenv import load_dotenv
-import whisper
+import asyncio
 import os
 import time
 from pathlib import Path
-import shutil
+import json
+from typing import Any, Optional
 from services.document_processor import DocumentProcessor
 from services.summarization_chain import SummarizationChain
-from models.meeting_models import FileUploadResponse, SummaryRequest, SummaryResponse
+from services.executors import ExecutionPools
+from services.job_queue import JobQueue, JobStore, QueueFullError
+from services.llm_cache import LLMResponseCache
+from services.ingestion import UploadIngestor, UploadTooLargeError, iter_upload_file, remove_upload
+from services.token_budget import TokenBudget
+from services.streaming_pipeline import StreamingAudioPipeline
+from services.parallel_transcription import ParallelTranscriber
+from services.document_processor import AUDIO_EXTENSIONS
+from services.model_registry import read_model_metrics
+from services.preload import parse_preload_groups, preload
+from services.llm_client import AsyncLLMClient
+from services.summary_store import ChunkSummaryStore
+from services.live_session import FfmpegPcmDecoder, LiveSession
+from services.text_cleaning import TextCleaner
+from services.transcript_store import TranscriptStore
+from services.serialization import dumps
+from services import tracing
+from services.metrics import CONTENT_TYPE, REGISTRY
+from models import meeting_models
+from models.meeting_models import ANALYSIS_TYPES, AnalysisRequest, FileUploadResponse, ProcessRequest, SummaryRequest, SummaryResponse
 
-app = FastAPI()
+class FastJSONResponse(JSONResponse):
+    """JSON responses encoded with orjson when it is installed (services.serialization.dumps)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+app = FastAPI(default_response_class=FastJSONResponse)
 load_dotenv()
 
+# ✅ Request limits for /summarize and /process bodies (larger inputs go through /upload and transcript_id)
+meeting_models.MAX_TRANSCRIPT_CHARS = int(os.getenv("MAX_TRANSCRIPT_CHARS", "5000000"))
+meeting_models.MAX_REQUEST_CHUNKS = int(os.getenv("MAX_REQUEST_CHUNKS", "10000"))
+
+# ✅ Invalid request bodies: 422 with the same {"error": ...} shape as every other error
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    messages = [
+        f"{'.'.join(str(part) for part in error['loc'] if part != 'body')}: {error['msg']}"
+        for error in exc.errors()
+    ]
+    return FastJSONResponse(status_code=422, content={"error": "; ".join(messages)})
+
+# ✅ Per-request tracing: stage spans recorded anywhere in the request (pools included) land in one
+# trace, exposed as a Server-Timing header and, with "timings": true, in the response body
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with tracing.trace() as request_trace:
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = request.scope.get("route")
+            tracing.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - request_trace.start,
+                method=request.method, route=getattr(route, "path", "unmatched"), status=str(status)
+            )
+    if request_trace.stages:
+        response.headers["Server-Timing"] = request_trace.server_timing()
+    return response
+
 # Set up folders
 UPLOAD_FOLDER = "uploads"
 Path(UPLOAD_FOLDER).mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# ✅ Gemini API setup
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-gemini_model = genai.GenerativeModel("gemini-pro")
+# ✅ Heavy dependencies (Whisper/torch, Gemini SDK, PDF/DOCX loaders) are imported on first use;
+# PRELOAD_MODULES="audio,llm,pdf,docx" (or "all") imports them at startup instead: what the request
+# path needs in this process, Whisper and the document loaders in the pool workers
+PRELOAD_MODULES = parse_preload_groups(os.getenv("PRELOAD_MODULES", ""))
+
+# ✅ Gemini API setup (legacy route), created on first use
+_gemini_model = None
+
+def get_gemini_model():
+    global _gemini_model
+    if _gemini_model is None:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _gemini_model = genai.GenerativeModel("gemini-pro")
+    return _gemini_model
+
+# ✅ Token budget of the LLM window, shared by chunking and map-reduce
+token_budget = TokenBudget(
+    context_window=int(os.getenv("LLM_CONTEXT_WINDOW", "30720")),
+    max_output_tokens=2000,
+    chars_per_token=float(os.getenv("LLM_CHARS_PER_TOKEN", "4.0"))
+)
+
+# ✅ Content-addressed cache of transcription/extraction results (EXTRACTION_CACHE_DIR="" disables it)
+processor_options = {
+    "cache_dir": os.getenv("EXTRACTION_CACHE_DIR", "cache/extraction") or None,
+    "cache_max_bytes": int(os.getenv("EXTRACTION_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+    "chunking": os.getenv("CHUNKING_MODE", "characters"),
+    "token_budget": token_budget,
+    "max_chunk_tokens": int(os.getenv("MAX_CHUNK_TOKENS", "0")) or None,
+    "whisper_model": os.getenv("WHISPER_MODEL", "base"),
+    # ✅ Filler words removed from transcripts (FILLER_WORDS, COMMA_FILLERS)
+    "cleaner": TextCleaner.from_env()
+}
 
 # ✅ Initialize services
-document_processor = DocumentProcessor()
-summarization_chain = SummarizationChain(gemini_api_key=os.getenv("GEMINI_API_KEY"))
+document_processor = DocumentProcessor(**processor_options)
+# ✅ LLM response cache: in-memory LRU with an optional SQLite tier (LLM_CACHE_DB)
+response_cache = LLMResponseCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "86400")),
+    db_path=os.getenv("LLM_CACHE_DB") or None
+)
+# ✅ Chunk-level summaries by content hash, so a resubmitted transcript only re-maps changed chunks
+summary_store = ChunkSummaryStore(
+    db_path=os.getenv("SUMMARY_STORE_DB", "cache/summaries.db") or None,
+    max_entries=int(os.getenv("SUMMARY_STORE_MAX_ENTRIES", "100000"))
+)
+# ✅ Transcripts kept server-side under an ID, so /summarize and /process don't need the text posted back
+# (SQLite, shared by all workers; TRANSCRIPT_STORE_DB="" keeps them in memory)
+transcript_store = TranscriptStore(
+    db_path=os.getenv("TRANSCRIPT_STORE_DB", "cache/transcripts.db") or None,
+    max_bytes=int(os.getenv("TRANSCRIPT_STORE_MAX_MB", "256")) * 1024 * 1024,
+    max_entries=int(os.getenv("TRANSCRIPT_STORE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("TRANSCRIPT_TTL", "86400"))
+)
+# ✅ Async LLM client: pooled connections, RPM/TPM token buckets, retries with jittered backoff
+# (LLM_BACKEND=stub answers locally, for offline load tests)
+llm_client = AsyncLLMClient.from_env(os.getenv("GEMINI_API_KEY"), count_tokens=token_budget.count)
+summarization_chain = SummarizationChain(
+    gemini_api_key=os.getenv("GEMINI_API_KEY"),
+    llm_client=llm_client,
+    response_cache=response_cache,
+    token_budget=token_budget,
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    parallel_sections=os.getenv("LLM_PARALLEL_SECTIONS", "true").lower() == "true",
+    combined_sections=os.getenv("LLM_COMBINED_SECTIONS", "false").lower() == "true",
+    summary_store=summary_store,
+    incremental_chunk_tokens=int(os.getenv("INCREMENTAL_CHUNK_TOKENS", "1500"))
+)
+
+# ✅ Execution pools: Whisper/PDF/DOCX in processes, file and LLM I/O in threads
+pools = ExecutionPools.from_env(processor_options)
+
+# ✅ Parallel Whisper: one recording split at pauses and transcribed on every CPU worker
+parallel_transcriber = ParallelTranscriber(
+    pools,
+    document_processor,
+    segment_seconds=float(os.getenv("WHISPER_SEGMENT_SECONDS", "60"))
+)
+extractor = parallel_transcriber if os.getenv("PARALLEL_TRANSCRIPTION", "false").lower() == "true" else pools
+
+# ✅ Chunked upload ingestion: unique paths, on-the-fly hashing, size cap, early audio decode
+ingestor = UploadIngestor(
+    UPLOAD_FOLDER, max_bytes=int(os.getenv("MAX_UPLOAD_MB", "1024")) * 1024 * 1024, run_io=pools.run_io
+)
+
+def upload_too_large(request: Request) -> bool:
+    """Reject oversized uploads from the Content-Length header before reading the body"""
+    content_length = request.headers.get("content-length")
+    return content_length is not None and content_length.isdigit() and int(content_length) > ingestor.max_bytes
+
+# ✅ Whisper model sizes a request may choose; WHISPER_MODEL stays the default
+WHISPER_MODELS = sorted(
+    {name.strip() for name in os.getenv("WHISPER_MODELS", "tiny,base,small").split(",") if name.strip()}
+    | {processor_options["whisper_model"]}
+)
+
+def unknown_whisper_model(whisper_model: Optional[str]) -> bool:
+    return whisper_model is not None and whisper_model not in WHISPER_MODELS
+
+def unknown_whisper_model_response(whisper_model: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=400,
+        content={"error": f"Unknown Whisper model '{whisper_model}', choose one of {', '.join(WHISPER_MODELS)}"}
+    )
+
+async def build_upload_response(result: dict, include_raw: bool = False) -> dict:
+    """
+    Response body shared by /upload and extraction-only jobs. The cleaned
+    transcript is stored under transcript_id; the raw transcript is only
+    returned on request.
+    """
+    transcript_id = await pools.run_io(
+        transcript_store.put, result["cleaned_transcript"], result["chunks"], result["metadata"]
+    )
+    response = {
+        "transcript_id": transcript_id,
+        "transcript": result["cleaned_transcript"],
+        "file_type": result["file_type"],
+        "metadata": result["metadata"],
+        "chunks": len(result["chunks"]),
+        "processing_info": {
+            "text_length": len(result["cleaned_transcript"]),
+            "word_count": len(result["cleaned_transcript"].split()),
+            "chunk_count": len(result["chunks"])
+        }
+    }
+    if include_raw:
+        response["raw_transcript"] = result["raw_transcript"]
+    return response
+
+async def resolve_transcript(request: AnalysisRequest):
+    """(transcript text, stored entry or None, error response or None) for a request body"""
+    if not request.transcript_id:
+        return request.transcript or "", None, None
+    entry = await pools.run_io(transcript_store.get, request.transcript_id)
+    if entry is None:
+        return None, None, JSONResponse(
+            status_code=404, content={"error": "Transcript not found or expired, upload the file again"}
+        )
+    return entry["text"], entry, None
+
+def with_timings(response: dict, requested: bool) -> dict:
+    """Adds the request's per-stage breakdown (see services.tracing) when the client asked for it"""
+    request_trace = tracing.current()
+    if requested and request_trace is not None:
+        response["timings"] = request_trace.breakdown(include_spans=True)
+    return response
+
+# ✅ Streaming transcription: windows are transcribed while finished chunks are already summarized
+streaming_pipeline = StreamingAudioPipeline(
+    pools,
+    document_processor,
+    summarization_chain,
+    window_seconds=float(os.getenv("WHISPER_WINDOW_SECONDS", "30")),
+    overlap_seconds=float(os.getenv("WHISPER_WINDOW_OVERLAP", "2"))
+)
+STREAMING_TRANSCRIPTION = os.getenv("STREAMING_TRANSCRIPTION", "true").lower() == "true"
+
+# ✅ Live meetings: audio frames over a WebSocket, rolling transcript and a running summary
+LIVE_SESSION_OPTIONS = {
+    "window_seconds": float(os.getenv("LIVE_WINDOW_SECONDS", "15")),
+    "overlap_seconds": float(os.getenv("WHISPER_WINDOW_OVERLAP", "2")),
+    "refresh_seconds": float(os.getenv("LIVE_SUMMARY_SECONDS", "60")),
+    "refresh_chunks": int(os.getenv("LIVE_SUMMARY_CHUNKS", "2")),
+    "max_pending_seconds": float(os.getenv("LIVE_MAX_PENDING_SECONDS", "120"))
+}
+MAX_LIVE_SESSIONS = int(os.getenv("MAX_LIVE_SESSIONS", "50"))
+live_sessions = {}
+
+# ✅ Background jobs: extraction + summarization outside the request/response cycle
+async def run_job(job: dict, report) -> dict:
+    # The upload (and its decoded PCM) is only needed until the job has finished, whatever the outcome
+    try:
+        result = await run_job_stages(job, report)
+    except asyncio.CancelledError:
+        # Shutting down: the job is taken over by another worker, which still needs the upload
+        raise
+    except BaseException:
+        await pools.run_io(remove_upload, job["filepath"], job["options"].get("decoded_audio"))
+        raise
+    await pools.run_io(remove_upload, job["filepath"], job["options"].get("decoded_audio"))
+    return result
+
+async def run_job_stages(job: dict, report) -> dict:
+    options = job["options"]
+    analysis_type = options.get("analysis_type", "comprehensive")
+
+    is_audio = Path(job["filepath"]).suffix.lower() in AUDIO_EXTENSIONS
+    if STREAMING_TRANSCRIPTION and is_audio and options.get("summarize"):
+        report("transcribing", f"Transcribing {job['filename']}", 10)
+        start_time = time.time()
+        result = await streaming_pipeline.run(
+            job["filepath"], options.get("content_hash"), options.get("decoded_audio"), analysis_type,
+            report=report, whisper_model=options.get("whisper_model")
+        )
+        if not result["analysis"]["success"]:
+            raise Exception(result["analysis"]["error"])
+        result["analysis"]["processing_time"] = round(time.time() - start_time, 2)
+
+        response = await build_upload_response(result, options.get("include_raw", False))
+        response["analysis"] = result["analysis"]
+        return response
+
+    report("extracting", f"Extracting text from {job['filename']}", 10)
+    result = await extractor.process_file(
+        job["filepath"], options.get("content_hash"), options.get("decoded_audio"), options.get("whisper_model")
+    )
+    if not result["success"]:
+        raise Exception(result["error"])
+
+    response = await build_upload_response(result, options.get("include_raw", False))
+    if not options.get("summarize"):
+        return response
+
+    report("summarizing", f"Running {analysis_type} analysis", 60)
+    start_time = time.time()
+    summary = await pools.run_io(summarization_chain.process_transcript, result["cleaned_transcript"], analysis_type)
+    if not summary["success"]:
+        raise Exception(summary["error"])
+    summary["processing_time"] = round(time.time() - start_time, 2)
 
-# ✅ Whisper model (lazy loading for backward compatibility)
-model = None
+    response["analysis"] = summary
+    return response
 
-def get_whisper_model():
-    global model
-    if model is None:
-        model = whisper.load_model("base")
-    return model
+job_queue = JobQueue(
+    JobStore(os.getenv("JOB_DB_PATH", "jobs.db")),
+    run_job,
+    concurrency=int(os.getenv("JOB_CONCURRENCY", "2")),
+    max_depth=int(os.getenv("JOB_QUEUE_DEPTH", "100")),
+    # Jobs of a worker that stops renewing its lease are taken over by another one
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60")),
+    retention_seconds=float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+)
+
+@app.on_event("startup")
+def preload_modules():
+    return preload(PRELOAD_MODULES)
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+# ✅ WHISPER_PRELOAD=true or PRELOAD_MODULES: start the workers (imports, model load + warm-up) before the first request
+@app.on_event("startup")
+async def warm_up_models():
+    if pools.preload_whisper or pools.preload_groups:
+        await pools.warm_up()
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    await job_queue.stop()
+    pools.shutdown()
+    summarization_chain.llm.close()
 
 # ✅ Homepage route
 @app.get("/", response_class=HTMLResponse)
@@ -45,61 +342,155 @@ async def read_index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 # ✅ Enhanced route for file processing with LangChain
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    filename = file.filename
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    
+@app.post("/upload", response_model=FileUploadResponse, response_model_exclude_none=True)
+async def upload_file(file: UploadFile = File(...), whisper_model: Optional[str] = Form(None),
+                      include_raw: bool = Form(False), timings: bool = Form(False)):
+    if unknown_whisper_model(whisper_model):
+        return unknown_whisper_model_response(whisper_model)
+
     # Save uploaded file
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        upload = await ingestor.ingest(iter_upload_file(file), file.filename)
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
     
-    # Process file using the enhanced document processor
-    result = document_processor.process_file(filepath)
+    # Process file using the enhanced document processor in a worker process
+    try:
+        result = await extractor.process_file(
+            upload["filepath"], upload["content_hash"], upload["decoded_audio"], whisper_model
+        )
+    finally:
+        await pools.run_io(remove_upload, upload["filepath"], upload["decoded_audio"])
     
     if not result["success"]:
         return JSONResponse(status_code=400, content={"error": result["error"]})
     
     # Return enhanced response with metadata and chunks
+    return with_timings(await build_upload_response(result, include_raw), timings)
+
+# ✅ Zero-buffering upload: the raw request body is the file (?filename= gives its name/type)
+@app.post("/upload/stream", response_model=FileUploadResponse, response_model_exclude_none=True)
+async def upload_stream(request: Request, filename: str, whisper_model: Optional[str] = None,
+                        include_raw: bool = False, timings: bool = False):
+    if unknown_whisper_model(whisper_model):
+        return unknown_whisper_model_response(whisper_model)
+    if upload_too_large(request):
+        return JSONResponse(status_code=413, content={"error": "Upload exceeds the maximum size"})
+
+    try:
+        upload = await ingestor.ingest(request.stream(), filename)
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+
+    try:
+        result = await extractor.process_file(
+            upload["filepath"], upload["content_hash"], upload["decoded_audio"], whisper_model
+        )
+    finally:
+        await pools.run_io(remove_upload, upload["filepath"], upload["decoded_audio"])
+
+    if not result["success"]:
+        return JSONResponse(status_code=400, content={"error": result["error"]})
+
+    return with_timings(await build_upload_response(result, include_raw), timings)
+
+# ✅ Submit a file as a background job and return its ID immediately
+@app.post("/jobs")
+async def submit_job(
+    file: UploadFile = File(...),
+    analysis_type: str = Form("comprehensive"),
+    summarize: bool = Form(False),
+    whisper_model: Optional[str] = Form(None),
+    include_raw: bool = Form(False)
+):
+    if unknown_whisper_model(whisper_model):
+        return unknown_whisper_model_response(whisper_model)
+    # Checked before the upload is read, with the 422 /summarize gets from SummaryRequest
+    if analysis_type not in ANALYSIS_TYPES:
+        return JSONResponse(
+            status_code=422, content={"error": f"analysis_type: must be one of {', '.join(ANALYSIS_TYPES)}"}
+        )
+
+    try:
+        upload = await ingestor.ingest(iter_upload_file(file), file.filename)
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+
+    options = {
+        "analysis_type": analysis_type,
+        "summarize": summarize,
+        "content_hash": upload["content_hash"],
+        "decoded_audio": upload["decoded_audio"],
+        "whisper_model": whisper_model,
+        "include_raw": include_raw
+    }
+    try:
+        job_id = await job_queue.submit(upload["filename"], upload["filepath"], options)
+    except QueueFullError as e:
+        await pools.run_io(remove_upload, upload["filepath"], upload["decoded_audio"])
+        return JSONResponse(status_code=503, content={"error": str(e)})
+
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+# ✅ Poll job progress; the result is included once the job is finished
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await pools.run_io(job_queue.store.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+
     return {
-        "transcript": result["cleaned_transcript"],
-        "raw_transcript": result["raw_transcript"],
-        "file_type": result["file_type"],
-        "metadata": result["metadata"],
-        "chunks": len(result["chunks"]),
-        "processing_info": {
-            "text_length": len(result["cleaned_transcript"]),
-            "word_count": len(result["cleaned_transcript"].split()),
-            "chunk_count": len(result["chunks"])
-        }
+        "job_id": job_id,
+        "state": job["state"],
+        "status": JobStore.to_status(job),
+        "result": job["result"],
+        "error": job["error"],
+        "queue_depth": job_queue.depth
+    }
+
+# ✅ Whisper models: sizes on offer, plus load time and memory per model in each worker process
+@app.get("/models")
+async def list_models():
+    return {
+        "default": processor_options["whisper_model"],
+        "available": WHISPER_MODELS,
+        "preload": pools.preload_whisper,
+        "workers": await pools.run_io(read_model_metrics, pools.model_metrics_dir) if pools.model_metrics_dir else []
     }
 
 # ✅ Legacy upload route for backward compatibility
 @app.post("/upload-legacy")
 async def upload_file_legacy(file: UploadFile = File(...)):
     filename = file.filename
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        upload = await ingestor.ingest(iter_upload_file(file), filename, decode_audio=False)
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    filepath = upload["filepath"]
 
-    if filename.endswith((".mp3", ".wav")):
-        whisper_model = get_whisper_model()
-        result = whisper_model.transcribe(filepath)
-        transcript = result["text"]
-    elif filename.endswith(".txt"):
-        with open(filepath, "r", encoding="utf-8") as f:
-            transcript = f.read()
-    else:
-        return JSONResponse(status_code=400, content={"error": "Unsupported file type"})
+    try:
+        if filename.endswith((".mp3", ".wav")):
+            transcript = await pools.transcribe(filepath)
+        elif filename.endswith(".txt"):
+            transcript = await pools.run_io(Path(filepath).read_text, "utf-8")
+        else:
+            return JSONResponse(status_code=400, content={"error": "Unsupported file type"})
+    finally:
+        await pools.run_io(remove_upload, filepath)
 
     return {"transcript": transcript}
 
 # ✅ Enhanced route for intelligent summarization with LangChain
-@app.post("/summarize")
-async def summarize(data: dict):
-    transcript = data.get("transcript", "")
-    analysis_type = data.get("analysis_type", "comprehensive")
+@app.post("/summarize", response_model=SummaryResponse, response_model_exclude_none=True)
+async def summarize(request: SummaryRequest):
+    # transcript_id (from /upload) instead of posting the text back
+    transcript, _, error = await resolve_transcript(request)
+    if error is not None:
+        return error
+    analysis_type = request.analysis_type
+    use_cache = not request.bypass_cache
+    # Edited or extended transcripts: only new/changed chunks are summarized again
+    incremental = request.incremental
     
     if not transcript:
         return JSONResponse(status_code=400, content={"error": "Transcript not provided"})
@@ -107,8 +498,11 @@ async def summarize(data: dict):
     try:
         start_time = time.time()
         
-        # Use the enhanced summarization chain
-        result = summarization_chain.process_transcript(transcript, analysis_type)
+        # Use the enhanced summarization chain (blocking Gemini calls run in the I/O pool)
+        if incremental:
+            result = await pools.run_io(summarization_chain.summarize_incremental, transcript, analysis_type, use_cache)
+        else:
+            result = await pools.run_io(summarization_chain.process_transcript, transcript, analysis_type, use_cache)
         
         processing_time = time.time() - start_time
         result["processing_time"] = round(processing_time, 2)
@@ -118,20 +512,53 @@ async def summarize(data: dict):
         
         # Return structured response based on analysis type
         if analysis_type == "comprehensive":
-            return {"summary": result["comprehensive_summary"], **result}
+            return with_timings({"summary": result["comprehensive_summary"], **result}, request.timings)
         else:
-            return result
+            return with_timings(result, request.timings)
 
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+# ✅ Streaming summarization over Server-Sent Events
+@app.post("/summarize/stream")
+async def summarize_stream(request: SummaryRequest):
+    transcript, _, error = await resolve_transcript(request)
+    if error is not None:
+        return error
+    analysis_type = request.analysis_type
+    use_cache = not request.bypass_cache
+
+    if not transcript:
+        return JSONResponse(status_code=400, content={"error": "Transcript not provided"})
+
+    def event_stream():
+        # Sync generator: Starlette iterates it in a worker thread, off the event loop
+        start_time = time.time()
+        try:
+            for event in summarization_chain.stream_transcript(transcript, analysis_type, use_cache):
+                if event["event"] == "done":
+                    event["processing_time"] = round(time.time() - start_time, 2)
+                yield f"event: {event['event']}\ndata: {dumps(event).decode()}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {dumps({'error': str(e)}).decode()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ✅ New route for processing with chunks (for large documents)
-@app.post("/process")
-async def process_document(data: dict):
+@app.post("/process", response_model=SummaryResponse, response_model_exclude_none=True)
+async def process_document(request: ProcessRequest):
     """Enhanced processing endpoint that handles chunked documents"""
-    transcript = data.get("transcript", "")
-    chunks = data.get("chunks", [])
-    analysis_type = data.get("analysis_type", "comprehensive")
+    transcript, entry, error = await resolve_transcript(request)
+    if error is not None:
+        return error
+    # A stored transcript brings its chunk offsets from /upload
+    chunks = entry["chunks"] if entry is not None else request.chunks or []
+    analysis_type = request.analysis_type
+    use_cache = not request.bypass_cache
     
     if not transcript and not chunks:
         return JSONResponse(status_code=400, content={"error": "Transcript or chunks not provided"})
@@ -141,10 +568,12 @@ async def process_document(data: dict):
         
         if chunks:
             # Process using chunks for better handling of large documents
-            result = summarization_chain.process_chunks(chunks, analysis_type)
+            result = await pools.run_io(
+                summarization_chain.process_chunks, chunks, analysis_type, use_cache, transcript or None
+            )
         else:
             # Process single transcript
-            result = summarization_chain.process_transcript(transcript, analysis_type)
+            result = await pools.run_io(summarization_chain.process_transcript, transcript, analysis_type, use_cache)
         
         processing_time = time.time() - start_time
         result["processing_time"] = round(processing_time, 2)
@@ -152,11 +581,120 @@ async def process_document(data: dict):
         if not result["success"]:
             return JSONResponse(status_code=500, content={"error": result["error"]})
         
-        return result
+        return with_timings(result, request.timings)
 
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+# ✅ Stored transcripts: metadata and chunk offsets (?include_text=true adds the text), or delete one
+@app.get("/transcripts/{transcript_id}")
+async def get_transcript(transcript_id: str, include_text: bool = False):
+    entry = await pools.run_io(transcript_store.get, transcript_id)
+    if entry is None:
+        return JSONResponse(status_code=404, content={"error": "Transcript not found or expired"})
+    if not include_text:
+        entry.pop("text")
+    return entry
+
+@app.delete("/transcripts/{transcript_id}")
+async def delete_transcript(transcript_id: str):
+    if not await pools.run_io(transcript_store.delete, transcript_id):
+        return JSONResponse(status_code=404, content={"error": "Transcript not found"})
+    return {"deleted": transcript_id}
+
+# ✅ Live meeting: send binary audio frames, then {"type": "stop"} for the final summary
+@app.websocket("/live")
+async def live_meeting(websocket: WebSocket, encoding: str = "pcm", whisper_model: Optional[str] = None,
+                       analysis_type: str = "comprehensive"):
+    # Invalid analysis types are refused before the handshake completes (HTTP 403), like a 422 from /summarize
+    if analysis_type not in ANALYSIS_TYPES:
+        await websocket.close(code=1008, reason=f"analysis_type must be one of {', '.join(ANALYSIS_TYPES)}")
+        return
+    await websocket.accept()
+    error = None
+    if unknown_whisper_model(whisper_model):
+        error = f"Unknown Whisper model '{whisper_model}', choose one of {', '.join(WHISPER_MODELS)}"
+    elif encoding not in ("pcm", "opus"):
+        error = "encoding must be pcm (16 kHz mono s16le) or opus (WebM/Ogg)"
+    elif encoding == "opus" and not FfmpegPcmDecoder.available():
+        error = "Opus streams need ffmpeg on the server"
+    elif len(live_sessions) >= MAX_LIVE_SESSIONS:
+        await websocket.send_json({"type": "error", "error": "Too many live sessions, try again later"})
+        await websocket.close(code=1013)
+        return
+    if error:
+        await websocket.send_json({"type": "error", "error": error})
+        await websocket.close(code=1008)
+        return
+
+    session = LiveSession(
+        pools, document_processor, summarization_chain, websocket.send_json,
+        whisper_model=whisper_model, analysis_type=analysis_type, **LIVE_SESSION_OPTIONS
+    )
+    decoder = FfmpegPcmDecoder(session.feed) if encoding == "opus" else None
+    live_sessions[session.session_id] = session
+    try:
+        if decoder:
+            await decoder.start()
+        await session.send({"type": "ready", "session_id": session.session_id, "encoding": encoding})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                if decoder is None:
+                    await session.feed(message["bytes"])
+                elif not await decoder.feed(message["bytes"]):
+                    raise Exception("Could not decode the audio stream")
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                break
+
+        if decoder:
+            await decoder.finish()
+        await session.close()
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        try:
+            await session.send({"type": "error", "error": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        session.cancel()
+        if decoder:
+            decoder.kill()
+        live_sessions.pop(session.session_id, None)
+
+# ✅ Live sessions in progress
+@app.get("/live/sessions")
+async def list_live_sessions():
+    return {
+        "max_sessions": MAX_LIVE_SESSIONS,
+        "sessions": [{"session_id": session_id, **session.stats} for session_id, session in live_sessions.items()]
+    }
+
+# ✅ Cache statistics
+@app.get("/cache/stats")
+async def cache_stats():
+    extraction_cache = document_processor.cache
+    return {
+        "extraction": extraction_cache.stats() if extraction_cache else None,
+        "llm": response_cache.stats(),
+        "coalescing": summarization_chain.llm.single_flight.stats(),
+        "summaries": summary_store.stats(),
+        "transcripts": transcript_store.stats()
+    }
+
+# ✅ Prometheus metrics of this process: stage durations, request latency, LLM tokens and cache hits
+REGISTRY.gauge("meeting_job_queue_depth", "Background jobs waiting for a worker", lambda: job_queue.depth)
+REGISTRY.gauge("meeting_live_sessions", "Live transcription sessions in progress", lambda: len(live_sessions))
+
+@app.get("/metrics")
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # ✅ Route to get available analysis types
 @app.get("/analysis-types")
 async def get_analysis_types():
@@ -186,7 +724,8 @@ async def summarize_legacy(data: dict):
 Summarize this meeting:
 {transcript}"""
 
-        response = gemini_model.generate_content(
+        import google.generativeai as genai
+        response = await get_gemini_model().generate_content_async(
             prompt,
             generation_config=genai.types.GenerationConfig(
                 temperature=0.7,
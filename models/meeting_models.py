@@ -1,34 +1,120 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+# Analysis types the summarization chain offers (SummarizationChain.get_summary_types)
+ANALYSIS_TYPES = ("comprehensive", "topics", "actions", "sentiment", "all")
+# Request limits, read at validation time so main can set them from the environment.
+# Inline transcripts above MAX_TRANSCRIPT_CHARS are rejected; large files go through /upload and transcript_id
+MAX_TRANSCRIPT_CHARS = 5_000_000
+MAX_REQUEST_CHUNKS = 10_000
+
+class ProcessingInfo(BaseModel):
+    text_length: int
+    word_count: int
+    chunk_count: int
+
 class FileUploadResponse(BaseModel):
-    success: bool
-    file_type: str
+    transcript_id: str
+    transcript: str
     raw_transcript: Optional[str] = None
-    cleaned_transcript: Optional[str] = None
-    chunks: Optional[List[Dict]] = None
-    metadata: Optional[Dict] = None
-    error: Optional[str] = None
+    file_type: str
+    metadata: Dict[str, Any] = {}
+    chunks: int
+    processing_info: ProcessingInfo
+    timings: Optional[Dict[str, Any]] = None
 
-class SummaryRequest(BaseModel):
-    transcript: str
+class AnalysisRequest(BaseModel):
+    """The transcript itself or the transcript_id returned by /upload"""
+    transcript: Optional[str] = None
+    transcript_id: Optional[str] = Field(None, max_length=64)
     analysis_type: str = "comprehensive"
+    bypass_cache: bool = False
+    # Include the per-stage timing breakdown of this request in the response
+    timings: bool = False
+
+    @field_validator("transcript")
+    @classmethod
+    def transcript_size(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and len(value) > MAX_TRANSCRIPT_CHARS:
+            raise ValueError(f"longer than {MAX_TRANSCRIPT_CHARS} characters, upload it as a file and use transcript_id")
+        return value
+
+    @field_validator("analysis_type")
+    @classmethod
+    def known_analysis_type(cls, value: str) -> str:
+        if value not in ANALYSIS_TYPES:
+            raise ValueError(f"must be one of {', '.join(ANALYSIS_TYPES)}")
+        return value
+
+class SummaryRequest(AnalysisRequest):
+    """Body of /summarize and /summarize/stream"""
+    incremental: bool = False
     file_metadata: Optional[Dict] = None
 
+class ProcessRequest(AnalysisRequest):
+    """Body of /process: additionally accepts chunks, with their content or as offsets into transcript"""
+    chunks: Optional[List[Dict[str, Any]]] = None
+
+    @model_validator(mode="after")
+    def chunks_have_text(self) -> "ProcessRequest":
+        if self.chunks and len(self.chunks) > MAX_REQUEST_CHUNKS:
+            raise ValueError(f"more than {MAX_REQUEST_CHUNKS} chunks")
+        if (self.chunks and not self.transcript and not self.transcript_id
+                and any("content" not in chunk for chunk in self.chunks)):
+            raise ValueError("chunks without content need the transcript their offsets point into")
+        return self
+
+class LLMCalls(BaseModel):
+    map: int
+    reduce: int
+    final: int
+    total: int
+
+class ChunkResult(BaseModel):
+    success: bool
+    chunk_index: int
+    summary: Optional[str] = None
+    reused: Optional[bool] = None
+    input_length: Optional[int] = None
+    latency: Optional[float] = None
+    error: Optional[str] = None
+
 class SummaryResponse(BaseModel):
+    # Fields added by later pipeline stages pass through unchanged
+    model_config = ConfigDict(extra="allow")
+
     success: bool
     analysis_type: str
+    summary: Optional[str] = None
     comprehensive_summary: Optional[str] = None
     topic_analysis: Optional[str] = None
     action_items: Optional[str] = None
     sentiment_analysis: Optional[str] = None
+    section_errors: Optional[Dict[str, str]] = None
+    combined: Optional[bool] = None
+    combined_error: Optional[str] = None
     input_length: Optional[int] = None
     word_count: Optional[int] = None
     total_chunks: Optional[int] = None
+    chunks_reused: Optional[int] = None
+    chunks_recomputed: Optional[int] = None
+    chunks_failed: Optional[int] = None
+    reduce_levels: Optional[int] = None
+    partials_truncated: Optional[int] = None
+    llm_calls: Optional[LLMCalls] = None
+    chunk_results: Optional[List[ChunkResult]] = None
     processing_time: Optional[float] = None
+    timings: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class CombinedAnalysis(BaseModel):
+    """All four sections of the "all" analysis, as returned by the single-call JSON prompt"""
+    comprehensive_summary: str
+    topic_analysis: str
+    action_items: str
+    sentiment_analysis: str
+
 class ProcessingStatus(BaseModel):
     stage: str
     message: str
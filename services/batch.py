@@ -0,0 +1,326 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from models.meeting_models import ANALYSIS_TYPES
+from services.document_processor import AUDIO_EXTENSIONS
+
+SUPPORTED_EXTENSIONS = AUDIO_EXTENSIONS + (".txt", ".pdf", ".docx", ".doc")
+
+def file_key(filepath: str) -> str:
+    """Path, size and modification time: a file that changed since it was processed is processed again"""
+    stat = os.stat(filepath)
+    return f"{os.path.abspath(filepath)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def discover(source: str, extensions: Iterable[str] = SUPPORTED_EXTENSIONS) -> Iterator[Dict[str, Any]]:
+    """
+    Files to process, in a stable order. `source` is a directory (searched
+    recursively) or a manifest: one path per line, or JSON lines with "path"
+    and optional per-file "analysis_type" / "whisper_model". Relative manifest
+    paths are resolved against the manifest's directory.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    root = Path(source)
+    if root.is_dir():
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in extensions:
+                yield {"path": str(path)}
+        return
+
+    with open(root, encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            item = json.loads(line) if line.startswith("{") else {"path": line}
+            if not os.path.isabs(item["path"]):
+                item["path"] = str(root.parent / item["path"])
+            yield item
+
+class BatchCheckpoint:
+    """SQLite record of every file a batch has written or failed, so an interrupted run resumes"""
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files "
+                "(key TEXT PRIMARY KEY, path TEXT NOT NULL, status TEXT NOT NULL, error TEXT, finished_at REAL NOT NULL)"
+            )
+
+    def completed(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT key FROM files WHERE status = 'done'")}
+
+    def mark(self, key: str, path: str, status: str, error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (key, path, status, error, time.time())
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
+
+class JsonlWriter:
+    """One JSON object per line; every record is flushed to disk before its file is checkpointed"""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def committed_keys(self) -> Set[str]:
+        """Keys already in the output, e.g. written just before a crash and not yet checkpointed"""
+        keys = set()
+        with open(self.path, encoding="utf-8") as existing:
+            for line in existing:
+                try:
+                    keys.add(json.loads(line)["key"])
+                except (ValueError, KeyError):
+                    continue  # a line cut off by the crash
+        return keys
+
+    def write(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Returns the records that are now durable"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return [record]
+
+    def close(self) -> List[Dict[str, Any]]:
+        self._file.close()
+        return []
+
+class ParquetWriter:
+    """
+    Parquet part files in a directory (Parquet files cannot be appended to).
+    Records are buffered and written rows_per_file at a time; a record only
+    counts as written once its part file exists. Requires pyarrow.
+    """
+
+    COLUMNS = ["key", "path", "file_type", "duration", "language", "word_count", "chunk_count",
+               "extraction_seconds", "summary_seconds", "transcript", "analysis"]
+
+    def __init__(self, directory: str, rows_per_file: int = 500):
+        import pyarrow  # noqa: F401 - fail before any file is processed
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rows_per_file = max(1, rows_per_file)
+        self._rows: List[Dict[str, Any]] = []
+        self._run = time.strftime("%Y%m%d-%H%M%S")
+        self._parts = 0
+
+    def committed_keys(self) -> Set[str]:
+        import pyarrow.parquet as pq
+        keys = set()
+        for part in self.directory.glob("part-*.parquet"):
+            keys.update(pq.read_table(part, columns=["key"]).column("key").to_pylist())
+        return keys
+
+    def write(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._rows.append(record)
+        if len(self._rows) >= self.rows_per_file:
+            return self._flush()
+        return []
+
+    def close(self) -> List[Dict[str, Any]]:
+        return self._flush()
+
+    def _flush(self) -> List[Dict[str, Any]]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not self._rows:
+            return []
+        rows, self._rows = self._rows, []
+        # Analysis sections differ per analysis type; they are stored as one JSON column
+        table = pa.Table.from_pylist([
+            {
+                **{column: row.get(column) for column in self.COLUMNS},
+                "analysis": json.dumps(row["analysis"], ensure_ascii=False) if row.get("analysis") is not None else None
+            }
+            for row in rows
+        ])
+        self._parts += 1
+        part = self.directory / f"part-{self._run}-{self._parts:05d}.parquet"
+        pq.write_table(table, str(part) + ".tmp")
+        os.replace(str(part) + ".tmp", part)
+        return rows
+
+class ThroughputMeter:
+    """Files/min, audio-hours per wall-clock hour and summarized tokens/sec since the run started"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.counters = {"done": 0, "failed": 0, "skipped": 0, "audio_seconds": 0.0, "tokens": 0}
+        self._start = time.perf_counter()
+
+    def add(self, **values):
+        for name, value in values.items():
+            self.counters[name] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self._start, 1e-9)
+        return {
+            **self.counters,
+            "elapsed_seconds": round(elapsed, 1),
+            "files_per_minute": round((self.counters["done"] + self.counters["failed"]) / elapsed * 60, 2),
+            "audio_hours_per_hour": round(self.counters["audio_seconds"] / elapsed, 2),
+            "tokens_per_second": round(self.counters["tokens"] / elapsed, 1)
+        }
+
+    def line(self) -> str:
+        stats = self.snapshot()
+        finished = stats["done"] + stats["failed"] + stats["skipped"]
+        return (
+            f"[{finished}/{self.total}] {stats['files_per_minute']:.1f} files/min, "
+            f"{stats['audio_hours_per_hour']:.2f} audio-h/h, {stats['tokens_per_second']:.0f} tokens/s, "
+            f"{stats['failed']} failed, {stats['skipped']} skipped ({stats['elapsed_seconds']:.0f}s)"
+        )
+
+class BatchRunner:
+    """
+    Extraction and summarization of many files, pipelined: while one file is
+    being summarized the process pool is already extracting the next ones.
+    At most cpu_workers extractions and summary_concurrency summaries run at a
+    time (LLM calls are additionally held to the client's rate limits), and at
+    most max_in_flight files are held in memory.
+
+    Each result is written, then checkpointed. On restart, files that are
+    checkpointed (or already in the output) are skipped; failed files are tried
+    again.
+    """
+
+    def __init__(self, pools, chain, writer, checkpoint: BatchCheckpoint, count_tokens: Callable[[str], int],
+                 analysis_type: str = "comprehensive", whisper_model: Optional[str] = None, summarize: bool = True,
+                 include_transcript: bool = False, summary_concurrency: int = 4, max_in_flight: Optional[int] = None,
+                 report_seconds: float = 10.0, report: Callable[[str], None] = print):
+        self.pools = pools
+        self.chain = chain
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.count_tokens = count_tokens
+        self.analysis_type = analysis_type
+        self.whisper_model = whisper_model
+        self.summarize = summarize
+        self.include_transcript = include_transcript
+        self.summary_concurrency = max(1, summary_concurrency)
+        self.max_in_flight = max_in_flight or 2 * pools.cpu_workers + self.summary_concurrency
+        self.report_seconds = report_seconds
+        self.report = report
+
+    async def run(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Records written just before a crash were not checkpointed yet
+        completed = self.checkpoint.completed()
+        for key in self.writer.committed_keys() - completed:
+            self.checkpoint.mark(key, key.rsplit(":", 2)[0], "done")
+            completed.add(key)
+
+        meter = ThroughputMeter(len(items))
+        extract_slots = asyncio.Semaphore(self.pools.cpu_workers)
+        summary_slots = asyncio.Semaphore(self.summary_concurrency)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        reporter = asyncio.create_task(self._report_periodically(meter))
+        tasks = set()
+
+        async def process(item: Dict[str, Any], key: str):
+            try:
+                record = await self._process(item, key, extract_slots, summary_slots)
+                if record.get("error"):
+                    self.checkpoint.mark(key, item["path"], "failed", record["error"])
+                    meter.add(failed=1)
+                    self.report(f"failed: {item['path']}: {record['error']}")
+                else:
+                    tokens = record.pop("_tokens", 0)
+                    self._commit(self.writer.write(record))
+                    meter.add(done=1, audio_seconds=record.get("duration") or 0.0, tokens=tokens)
+            finally:
+                in_flight.release()
+
+        try:
+            for item in items:
+                try:
+                    key = file_key(item["path"])
+                except OSError as e:
+                    meter.add(failed=1)
+                    self.report(f"failed: {item['path']}: {e}")
+                    continue
+                if key in completed:
+                    meter.add(skipped=1)
+                    continue
+                await in_flight.acquire()
+                task = asyncio.create_task(process(item, key))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+            self._commit(self.writer.close())
+        finally:
+            reporter.cancel()
+        self.report(meter.line())
+        return meter.snapshot()
+
+    async def _process(self, item: Dict[str, Any], key: str, extract_slots: asyncio.Semaphore,
+                       summary_slots: asyncio.Semaphore) -> Dict[str, Any]:
+        record = {"key": key, "path": item["path"]}
+        # A misspelled manifest entry fails (and is retried on the next run) before any extraction work
+        analysis_type = item.get("analysis_type") or self.analysis_type
+        if self.summarize and analysis_type not in ANALYSIS_TYPES:
+            record["error"] = f"analysis_type must be one of {', '.join(ANALYSIS_TYPES)}"
+            return record
+        try:
+            start_time = time.perf_counter()
+            async with extract_slots:
+                result = await self.pools.process_file(
+                    item["path"], None, None, item.get("whisper_model") or self.whisper_model
+                )
+            record["extraction_seconds"] = round(time.perf_counter() - start_time, 2)
+            if not result["success"]:
+                record["error"] = result["error"]
+                return record
+
+            metadata = result.get("metadata", {})
+            transcript = result["cleaned_transcript"]
+            record.update({
+                "file_type": result.get("file_type"),
+                "duration": metadata.get("duration"),
+                "language": metadata.get("language"),
+                "word_count": len(transcript.split()),
+                "chunk_count": len(result["chunks"])
+            })
+            if self.include_transcript:
+                record["transcript"] = transcript
+            if not self.summarize:
+                return record
+
+            start_time = time.perf_counter()
+            async with summary_slots:
+                analysis = await self.pools.run_io(
+                    self.chain.process_chunks, result["chunks"], analysis_type, True, transcript
+                )
+            record["summary_seconds"] = round(time.perf_counter() - start_time, 2)
+            if not analysis["success"]:
+                record["error"] = analysis["error"]
+                return record
+            record["analysis"] = {key: value for key, value in analysis.items() if key != "chunk_results"}
+            record["_tokens"] = self.count_tokens(transcript)
+            return record
+        except Exception as e:
+            record["error"] = str(e)
+            return record
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        for record in records:
+            self.checkpoint.mark(record["key"], record["path"], "done")
+
+    async def _report_periodically(self, meter: ThroughputMeter):
+        while True:
+            await asyncio.sleep(self.report_seconds)
+            self.report(meter.line())
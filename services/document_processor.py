@@ -1,46 +1,109 @@
 import os
-import whisper
+import subprocess
 from pathlib import Path
-from typing import Dict, Any
-from langchain_community.document_loaders import TextLoader
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.document_loaders import Docx2txtLoader
+from typing import Dict, Any, List, Optional
+# PDF/DOCX loaders are imported by the methods that use them, so text-only
+# deployments never load them
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document
+from services import tracing
+from services.extraction_cache import ExtractionCache, hash_file
+from services.prompt_templates import MeetingPromptTemplates
+from services.token_budget import TokenBudget
+from services.model_registry import whisper_models
+from services.text_cleaning import TextCleaner
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a')
+# Whisper's native input format: 16 kHz mono 16-bit PCM
+WHISPER_SAMPLE_RATE = 16000
 
 class DocumentProcessor:
-    def __init__(self):
-        self.whisper_model = None  # Lazy loading
+    # Bump when extraction output changes so stale cache entries are not reused
+    CACHE_VERSION = 5
+    
+    def __init__(self, cache_dir: Optional[str] = None, cache_max_bytes: int = 1024 * 1024 * 1024,
+                 chunking: str = "characters", token_budget: Optional[TokenBudget] = None,
+                 max_chunk_tokens: Optional[int] = None, whisper_model: str = "base",
+                 cleaner: Optional[TextCleaner] = None):
+        """
+        Args:
+            chunking: "characters" (fixed 2000-character chunks) or "tokens"
+                (chunks sized so chunk + prompt template fit the model window)
+            token_budget: Model window used by "tokens" chunking
+            max_chunk_tokens: Optional cap on token chunk size, e.g. for more map-stage parallelism
+            whisper_model: Default Whisper model size ("tiny", "base", "small", ...)
+            cleaner: Filler/normalization rules applied to extracted text (defaults to TextCleaner())
+        """
+        self.whisper_model_name = whisper_model
+        self.cleaner = cleaner or TextCleaner()
+        self.chunking = chunking
+        self.token_budget = token_budget or TokenBudget()
+        
+        if chunking == "tokens":
+            # Every chunk is formatted into one of these templates, so the largest one bounds the chunk
+            templates = MeetingPromptTemplates.get_section_prompts() + [MeetingPromptTemplates.get_chunk_summary_prompt()]
+            self.chunk_size = self.token_budget.content_budget(templates)
+            if max_chunk_tokens:
+                self.chunk_size = min(self.chunk_size, max_chunk_tokens)
+            self.chunk_overlap = self.chunk_size // 10
+            length_function = self.token_budget.count
+        elif chunking == "characters":
+            self.chunk_size = 2000
+            self.chunk_overlap = 200
+            length_function = len
+        else:
+            raise ValueError(f"Unknown chunking mode: {chunking}")
+        self.length_function = length_function
+        
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=200,
-            length_function=len,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=length_function,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
+        # Content-addressed cache of extraction results (disabled without a cache_dir)
+        self.cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir else None
     
-    def _get_whisper_model(self):
-        """Lazy load Whisper model"""
-        if self.whisper_model is None:
-            self.whisper_model = whisper.load_model("base")
-        return self.whisper_model
+    def _get_whisper_model(self, name: Optional[str] = None):
+        """Whisper model from the process-wide registry (loaded once, on first use)"""
+        return whisper_models.get(name or self.whisper_model_name)
     
-    def process_file(self, filepath: str) -> Dict[str, Any]:
+    def process_file(self, filepath: str, content_hash: Optional[str] = None,
+                     decoded_audio: Optional[str] = None, whisper_model: Optional[str] = None) -> Dict[str, Any]:
         """
         Process uploaded file and return structured data
+        
+        Args:
+            filepath: Path of the uploaded file
+            content_hash: SHA-256 of the file bytes, if already known (computed otherwise)
+            decoded_audio: Path of 16 kHz mono s16le PCM already decoded from an audio upload
+            whisper_model: Whisper model size for this file (defaults to the processor's)
         """
         file_extension = Path(filepath).suffix.lower()
         
         try:
-            if file_extension in ['.mp3', '.wav', '.m4a']:
-                return self._process_audio(filepath)
+            with tracing.span("extraction_cache.lookup"):
+                cache_key = self.cache_key(filepath, content_hash, whisper_model)
+                cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                cached["metadata"]["cache_hit"] = True
+                return cached
+            
+            if file_extension in AUDIO_EXTENSIONS:
+                result = self._process_audio(filepath, decoded_audio, whisper_model)
             elif file_extension == '.txt':
-                return self._process_text(filepath)
+                result = self._process_text(filepath)
             elif file_extension == '.pdf':
-                return self._process_pdf(filepath)
+                result = self._process_pdf(filepath)
             elif file_extension in ['.docx', '.doc']:
-                return self._process_docx(filepath)
+                result = self._process_docx(filepath)
             else:
                 raise ValueError(f"Unsupported file type: {file_extension}")
+            
+            if cache_key is not None:
+                result["metadata"]["cache_hit"] = False
+                with tracing.span("extraction_cache.store"):
+                    self.cache.put(cache_key, result)
+            return result
                 
         except Exception as e:
             return {
@@ -49,12 +112,70 @@ class DocumentProcessor:
                 "file_type": file_extension
             }
     
-    def _process_audio(self, filepath: str) -> Dict[str, Any]:
+    def cache_key(self, filepath: str, content_hash: Optional[str] = None,
+                  whisper_model: Optional[str] = None, pipeline: str = "file") -> Optional[str]:
+        """
+        Extraction cache key for a file, or None when caching is disabled.
+        pipeline separates results built differently from the same file (the
+        streaming pipeline cleans and chunks segment by segment).
+        """
+        if self.cache is None:
+            return None
+        file_extension = Path(filepath).suffix.lower()
+        return self.cache.make_key(
+            content_hash or hash_file(filepath), self._cache_settings(file_extension, whisper_model, pipeline)
+        )
+    
+    def _cache_settings(self, file_extension: str, whisper_model: Optional[str] = None,
+                        pipeline: str = "file") -> Dict[str, Any]:
+        """Processor settings that change the extraction result"""
+        return {
+            "version": self.CACHE_VERSION,
+            "pipeline": pipeline,
+            "extension": file_extension,
+            "whisper_model": (whisper_model or self.whisper_model_name) if file_extension in AUDIO_EXTENSIONS else None,
+            "chunking": self.chunking,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "cleaning": self.cleaner.settings()
+        }
+    
+    def _process_audio(self, filepath: str, decoded_audio: Optional[str] = None,
+                       whisper_model: Optional[str] = None) -> Dict[str, Any]:
         """Process audio files using Whisper"""
-        model = self._get_whisper_model()
-        result = model.transcribe(filepath)
-        transcript = result["text"]
-        
+        with tracing.span("whisper.load_model"):
+            model = self._get_whisper_model(whisper_model)
+        with tracing.span("whisper.transcribe"):
+            if decoded_audio:
+                # PCM decoded while the upload streamed in; Whisper skips its own ffmpeg pass
+                import numpy as np
+                samples = np.fromfile(decoded_audio, dtype=np.int16)
+                result = model.transcribe(samples.astype(np.float32) / 32768.0)
+                result.setdefault("duration", len(samples) / WHISPER_SAMPLE_RATE)
+            else:
+                result = model.transcribe(filepath)
+        duration = result.get("duration") or self._audio_duration(filepath, result.get("segments"))
+        return self._build_audio_result(result["text"], duration, result.get("language", "unknown"))
+    
+    @staticmethod
+    def _audio_duration(filepath: str, segments: Optional[List[Dict[str, Any]]]) -> float:
+        """
+        Whisper's transcribe() reports no duration: use the end of the last
+        segment, or ask ffprobe when nothing was transcribed
+        """
+        if segments:
+            return float(segments[-1]["end"])
+        try:
+            output = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", filepath],
+                capture_output=True, text=True, check=True
+            ).stdout
+            return float(output.strip())
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            return 0.0
+    
+    def _build_audio_result(self, transcript: str, duration: float, language: str) -> Dict[str, Any]:
+        """Clean and chunk a Whisper transcript into the process_file result shape"""
         # Clean and preprocess the transcript
         cleaned_transcript = self._clean_text(transcript)
         
@@ -68,14 +189,14 @@ class DocumentProcessor:
             "cleaned_transcript": cleaned_transcript,
             "chunks": chunks,
             "metadata": {
-                "duration": result.get("duration", 0),
-                "language": result.get("language", "unknown")
+                "duration": duration,
+                "language": language
             }
         }
     
     def _process_text(self, filepath: str) -> Dict[str, Any]:
         """Process text files"""
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with tracing.span("read.text"), open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
         cleaned_content = self._clean_text(content)
@@ -95,8 +216,10 @@ class DocumentProcessor:
     
     def _process_pdf(self, filepath: str) -> Dict[str, Any]:
         """Process PDF files"""
-        loader = PyPDFLoader(filepath)
-        documents = loader.load()
+        with tracing.span("parse.pdf"):
+            from langchain_community.document_loaders import PyPDFLoader
+            loader = PyPDFLoader(filepath)
+            documents = loader.load()
         
         # Combine all pages
         content = "\n\n".join([doc.page_content for doc in documents])
@@ -117,8 +240,10 @@ class DocumentProcessor:
     
     def _process_docx(self, filepath: str) -> Dict[str, Any]:
         """Process DOCX files"""
-        loader = Docx2txtLoader(filepath)
-        documents = loader.load()
+        with tracing.span("parse.docx"):
+            from langchain_community.document_loaders import Docx2txtLoader
+            loader = Docx2txtLoader(filepath)
+            documents = loader.load()
         
         content = "\n\n".join([doc.page_content for doc in documents])
         cleaned_content = self._clean_text(content)
@@ -137,29 +262,25 @@ class DocumentProcessor:
         }
     
     def _clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        # Remove excessive whitespace
-        text = " ".join(text.split())
-        
-        # Remove common transcription artifacts
-        text = text.replace("um,", "").replace("uh,", "").replace("you know,", "")
-        
-        # Fix common punctuation issues
-        text = text.replace(" ,", ",").replace(" .", ".")
-        text = text.replace("  ", " ")
-        
-        return text.strip()
+        """Clean and normalize text (fillers, whitespace, punctuation spacing) in one pass"""
+        with tracing.span("clean"):
+            return self.cleaner.clean(text)
     
     def _split_text(self, text: str) -> list:
-        """Split text into semantic chunks"""
-        documents = [Document(page_content=text)]
-        chunks = self.text_splitter.split_documents(documents)
-        
-        return [
-            {
-                "content": chunk.page_content,
-                "metadata": chunk.metadata,
-                "length": len(chunk.page_content)
-            }
-            for chunk in chunks
-        ]
+        """
+        Split text into semantic chunks, kept as (start, end) offsets into `text`
+        instead of copies of it (SummarizationChain.process_chunks slices them on demand)
+        """
+        chunks = []
+        start = -1
+        with tracing.span("split"):
+            for piece in self.text_splitter.split_text(text):
+                # Chunks come in order; overlap only reaches back into the previous chunk
+                start = text.find(piece, start + 1)
+                chunks.append({
+                    "start": start,
+                    "end": start + len(piece),
+                    "length": len(piece),
+                    "tokens": self.token_budget.count(piece)
+                })
+        return chunks
@@ -0,0 +1,179 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from services import tracing
+from services.model_registry import remove_dead_worker_metrics
+from services.preload import parse_preload_groups
+
+# Per-process DocumentProcessor, created by the pool initializer in each worker
+_worker_processor = None
+
+def _init_cpu_worker(processor_options: Dict[str, Any], preload_whisper: bool = False,
+                     model_metrics_dir: Optional[str] = None, preload_groups: Sequence[str] = ()):
+    """
+    Create the DocumentProcessor once per worker process, optionally importing the
+    PRELOAD_MODULES groups and loading and warming Whisper right away
+    """
+    global _worker_processor
+    from services.document_processor import DocumentProcessor
+    from services.model_registry import whisper_models
+    from services.preload import WORKER_PRELOAD_GROUPS, preload
+    if preload_groups:
+        try:
+            preload(list(preload_groups), WORKER_PRELOAD_GROUPS)
+        except Exception:
+            # Same as a failed model preload: the module is imported on first use instead
+            pass
+    if model_metrics_dir:
+        whisper_models.metrics_path = os.path.join(model_metrics_dir, f"worker-{os.getpid()}.json")
+    _worker_processor = DocumentProcessor(**processor_options)
+    if preload_whisper:
+        try:
+            whisper_models.warm_up(_worker_processor.whisper_model_name)
+        except Exception:
+            # An initializer error breaks the whole pool; fall back to loading on first use
+            pass
+
+def _worker_model_stats() -> Dict[str, Any]:
+    from services.model_registry import whisper_models
+    return whisper_models.stats()
+
+def _process_file_in_worker(filepath: str, content_hash: Optional[str] = None, decoded_audio: Optional[str] = None,
+                            whisper_model: Optional[str] = None) -> Dict[str, Any]:
+    # Spans recorded here stay in this process; their totals travel back with the result
+    with tracing.trace() as timings:
+        result = _worker_processor.process_file(filepath, content_hash, decoded_audio, whisper_model)
+    result["timings"] = timings.stage_seconds()
+    return result
+
+def _transcribe_in_worker(filepath: str, whisper_model: Optional[str] = None) -> str:
+    return _worker_processor._get_whisper_model(whisper_model).transcribe(filepath)["text"]
+
+def _transcribe_window_in_worker(pcm_path: str, start: float, end: float,
+                                 whisper_model: Optional[str] = None) -> Dict[str, Any]:
+    from services.streaming_transcription import transcribe_window
+    return transcribe_window(_worker_processor._get_whisper_model(whisper_model), pcm_path, start, end)
+
+def _transcribe_pcm_in_worker(pcm: bytes, start: float, whisper_model: Optional[str] = None) -> Dict[str, Any]:
+    from services.streaming_transcription import pcm_to_float, transcribe_samples
+    return transcribe_samples(_worker_processor._get_whisper_model(whisper_model), pcm_to_float(pcm), start)
+
+class ExecutionPools:
+    """
+    Keeps blocking work off the event loop.
+    CPU-bound work (Whisper, PDF/DOCX parsing) runs in a process pool,
+    I/O-bound work (file writes, Gemini HTTP calls) runs in a thread pool.
+    """
+
+    def __init__(self, cpu_workers: int = 2, io_workers: int = 16, processor_options: Optional[Dict[str, Any]] = None,
+                 preload_whisper: bool = False, model_metrics_dir: Optional[str] = None,
+                 preload_groups: Optional[List[str]] = None):
+        self.cpu_workers = max(1, cpu_workers)
+        self.io_workers = max(1, io_workers)
+        # Keyword arguments for the DocumentProcessor built in each worker process
+        self.processor_options = processor_options or {}
+        # Load and warm the Whisper model when a worker starts instead of on its first audio file
+        self.preload_whisper = preload_whisper
+        # Workers publish their model load metrics here (see model_registry.read_model_metrics)
+        self.model_metrics_dir = model_metrics_dir
+        # PRELOAD_MODULES groups imported by each worker when it starts (Whisper, document loaders)
+        self.preload_groups = list(preload_groups or [])
+        self._cpu_pool = None
+        self._io_pool = None
+
+    @classmethod
+    def from_env(cls, processor_options: Optional[Dict[str, Any]] = None) -> "ExecutionPools":
+        return cls(
+            cpu_workers=int(os.getenv("CPU_POOL_SIZE", "2")),
+            io_workers=int(os.getenv("IO_POOL_SIZE", "16")),
+            processor_options=processor_options,
+            preload_whisper=os.getenv("WHISPER_PRELOAD", "false").lower() == "true",
+            model_metrics_dir=os.getenv("MODEL_METRICS_DIR", "cache/models") or None,
+            preload_groups=parse_preload_groups(os.getenv("PRELOAD_MODULES", ""))
+        )
+
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        """Lazy creation so importing the app does not spawn processes"""
+        if self._cpu_pool is None:
+            if self.model_metrics_dir:
+                # Workers of a previous pool (or another process) that have exited left stale metrics
+                remove_dead_worker_metrics(self.model_metrics_dir)
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                initializer=_init_cpu_worker,
+                initargs=(self.processor_options, self.preload_whisper, self.model_metrics_dir, self.preload_groups)
+            )
+        return self._cpu_pool
+
+    @property
+    def io_pool(self) -> ThreadPoolExecutor:
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io")
+        return self._io_pool
+
+    async def run_cpu(self, func: Callable, *args) -> Any:
+        """
+        Run a picklable module-level function in the process pool. A worker that
+        dies (OOM kill, segfault in a native library) breaks the whole pool; it is
+        dropped so the next call starts a fresh one instead of failing forever.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self.cpu_pool
+        try:
+            return await loop.run_in_executor(pool, partial(func, *args))
+        except BrokenProcessPool:
+            # Concurrent callers share the broken pool; only the first one replaces it
+            if self._cpu_pool is pool:
+                self._cpu_pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def run_io(self, func: Callable, *args) -> Any:
+        """Run a blocking I/O function in the thread pool (spans it records join the caller's trace)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_pool, partial(tracing.in_context(func), *args))
+
+    async def warm_up(self) -> List[Dict[str, Any]]:
+        """
+        Start every worker process now, so the initializer (module and Whisper preload) runs
+        before the first request. The pool spawns a new worker for each task submitted
+        while none is idle, so one task per worker reaches all of them.
+        """
+        return await asyncio.gather(*(self.run_cpu(_worker_model_stats) for _ in range(self.cpu_workers)))
+
+    async def process_file(self, filepath: str, content_hash: Optional[str] = None,
+                           decoded_audio: Optional[str] = None, whisper_model: Optional[str] = None) -> Dict[str, Any]:
+        """DocumentProcessor.process_file in a worker process"""
+        with tracing.span("pool.process_file"):
+            result = await self.run_cpu(_process_file_in_worker, filepath, content_hash, decoded_audio, whisper_model)
+        tracing.record_stages(result.pop("timings", None))
+        return result
+
+    async def transcribe(self, filepath: str, whisper_model: Optional[str] = None) -> str:
+        """Plain Whisper transcription in a worker process"""
+        with tracing.span("whisper.transcribe"):
+            return await self.run_cpu(_transcribe_in_worker, filepath, whisper_model)
+
+    async def transcribe_window(self, pcm_path: str, start: float, end: float,
+                                whisper_model: Optional[str] = None) -> Dict[str, Any]:
+        """Whisper transcription of one window of decoded PCM in a worker process"""
+        with tracing.span("whisper.window"):
+            return await self.run_cpu(_transcribe_window_in_worker, pcm_path, start, end, whisper_model)
+
+    async def transcribe_pcm(self, pcm: bytes, start: float, whisper_model: Optional[str] = None) -> Dict[str, Any]:
+        """Whisper transcription of in-memory PCM (live audio) that begins at `start` seconds"""
+        with tracing.span("whisper.live_window"):
+            return await self.run_cpu(_transcribe_pcm_in_worker, pcm, start, whisper_model)
+
+    def shutdown(self):
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+            self._io_pool = None
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def hash_file(filepath: str) -> str:
+    """Streaming SHA-256 of a file's bytes (constant memory for large recordings)"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Disk-backed, content-addressed cache for DocumentProcessor results.
+
+    Entries are keyed by the file's content hash plus the processor settings
+    (Whisper model, splitter configuration), so a re-upload of the same bytes
+    skips transcription/parsing entirely. Results are stored as JSON files and
+    tracked in a SQLite index that also holds hit/miss counters, which keeps the
+    cache consistent across worker processes. Least recently used entries are
+    evicted once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = "cache/extraction", max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.db"), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+
+    @staticmethod
+    def make_key(content_hash: str, settings: Dict[str, Any]) -> str:
+        """Combine the content hash with the settings that affect the result"""
+        settings_blob = json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(f"{content_hash}:{settings_blob}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._increment("misses")
+            return None
+
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, path.stat().st_size, time.time())
+            )
+        self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes
+        }
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+            evicted = 0
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._path(key).unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+            self._increment("evictions", evicted)
+
+    def _increment(self, name: str, amount: int = 1):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from services import tracing
+from services.document_processor import AUDIO_EXTENSIONS, WHISPER_SAMPLE_RATE
+
+INGEST_CHUNK_SIZE = 1024 * 1024
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size"""
+
+class StreamingAudioDecoder:
+    """
+    Pipes audio bytes into ffmpeg while they are still arriving and writes
+    16 kHz mono PCM next to the upload, so Whisper can skip its own decode.
+    """
+
+    def __init__(self, pcm_path: str):
+        self.pcm_path = pcm_path
+        self._process = None
+        self._output = None
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("ffmpeg") is not None
+
+    async def start(self):
+        self._output = open(self.pcm_path, "wb")
+        self._process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=self._output,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+
+    async def feed(self, data: bytes) -> bool:
+        """Forward a chunk to ffmpeg; returns False once the decoder has given up"""
+        if self._process is None or self._process.stdin.is_closing():
+            return False
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+    async def finish(self) -> Optional[str]:
+        """Close the input and return the PCM path, or None if decoding failed"""
+        try:
+            if not self._process.stdin.is_closing():
+                self._process.stdin.close()
+            return_code = await self._process.wait()
+        finally:
+            self._output.close()
+
+        if return_code != 0 or os.path.getsize(self.pcm_path) == 0:
+            Path(self.pcm_path).unlink(missing_ok=True)
+            return None
+        return self.pcm_path
+
+    async def abort(self):
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        if self._output is not None:
+            self._output.close()
+        Path(self.pcm_path).unlink(missing_ok=True)
+
+class UploadIngestor:
+    """
+    Writes an upload to a unique path chunk by chunk.
+
+    The bytes are hashed as they arrive (the hash feeds the extraction cache),
+    the size limit is enforced before anything beyond it is written, and audio
+    is decoded concurrently when ffmpeg is available. Memory use stays at one
+    chunk regardless of the upload size. Small request-body chunks are batched
+    up to INGEST_CHUNK_SIZE and written by run_io (the I/O pool), so the
+    event loop never blocks on the disk.
+
+    Upload files are named per request; callers delete them with
+    remove_upload once the extraction or job is finished.
+    """
+
+    def __init__(self, upload_dir: str, max_bytes: int, decode_audio: bool = True,
+                 run_io: Optional[Callable] = None):
+        self.upload_dir = upload_dir
+        self.max_bytes = max_bytes
+        self.decode_audio = decode_audio and StreamingAudioDecoder.available()
+        self.run_io = run_io or _run_in_default_executor
+
+    async def ingest(self, chunks: AsyncIterator[bytes], filename: str, decode_audio: bool = True) -> Dict[str, Any]:
+        with tracing.span("upload.save"):
+            return await self._ingest(chunks, filename, decode_audio)
+
+    async def _ingest(self, chunks: AsyncIterator[bytes], filename: str, decode_audio: bool) -> Dict[str, Any]:
+        # Never trust the client's filename for the path; keep only its extension
+        extension = Path(filename or "").suffix.lower()
+        stem = os.path.join(self.upload_dir, uuid.uuid4().hex)
+        filepath = stem + extension
+
+        decoder = None
+        if decode_audio and self.decode_audio and extension in AUDIO_EXTENSIONS:
+            decoder = StreamingAudioDecoder(stem + ".pcm")
+            await decoder.start()
+
+        digest = hashlib.sha256()
+        size = 0
+        batch: List[bytes] = []
+        batch_size = 0
+        buffer = None
+        try:
+            buffer = await self.run_io(open, filepath, "wb")
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the maximum size of {self.max_bytes // (1024 * 1024)} MB"
+                    )
+                batch.append(chunk)
+                batch_size += len(chunk)
+                if batch_size >= INGEST_CHUNK_SIZE:
+                    await self.run_io(_write_batch, buffer, digest, batch)
+                    batch, batch_size = [], 0
+                if decoder is not None and not await decoder.feed(chunk):
+                    await decoder.abort()
+                    decoder = None
+            await self.run_io(_write_batch, buffer, digest, batch)
+            await self.run_io(buffer.close)
+        except BaseException:
+            if buffer is not None:
+                buffer.close()
+            Path(filepath).unlink(missing_ok=True)
+            if decoder is not None:
+                await decoder.abort()
+            raise
+
+        return {
+            "filename": filename,
+            "filepath": filepath,
+            "content_hash": digest.hexdigest(),
+            "size": size,
+            "decoded_audio": await decoder.finish() if decoder is not None else None
+        }
+
+def _write_batch(buffer, digest, batch: List[bytes]):
+    data = b"".join(batch)
+    digest.update(data)
+    buffer.write(data)
+
+async def _run_in_default_executor(func: Callable, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+def remove_upload(filepath: str, decoded_audio: Optional[str] = None):
+    """Delete an upload and the PCM decoded from it (streamed or by decode_to_pcm next to the file)"""
+    for path in (filepath, decoded_audio, str(Path(filepath).with_suffix(".pcm"))):
+        if path:
+            Path(path).unlink(missing_ok=True)
+
+async def iter_upload_file(file, chunk_size: int = INGEST_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a FastAPI UploadFile in fixed-size chunks"""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
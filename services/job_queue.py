@@ -0,0 +1,280 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from models.meeting_models import ProcessingStatus
+
+# Job lifecycle states; anything not finished is re-queued once its owner's lease expires
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATES = (COMPLETED, FAILED)
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its configured depth"""
+
+class JobStore:
+    """
+    SQLite-backed job state so jobs survive a worker restart.
+
+    Every unfinished job is leased by one process (owner plus heartbeat), so
+    several app workers can share the database: a job is only taken over
+    once its owner has stopped renewing the lease.
+    """
+
+    def __init__(self, db_path: str = "jobs.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    filepath TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    progress INTEGER NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    owner TEXT,
+                    heartbeat REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            # Databases created before leases were added
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "heartbeat" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL NOT NULL DEFAULT 0")
+
+    def create(self, filename: str, filepath: str, options: Dict[str, Any], owner: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, filename, filepath, options, state, stage, message, progress, "
+                "created_at, updated_at, owner, heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, filepath, json.dumps(options), QUEUED, "queued", "Waiting for a worker", 0,
+                 now, now, owner, time.time())
+            )
+        return job_id
+
+    def update(self, job_id: str, state: str, stage: str, message: str, progress: int,
+               result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE jobs SET state = ?, stage = ?, message = ?, progress = ?,
+                    result = COALESCE(?, result), error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (state, stage, message, progress, json.dumps(result) if result is not None else None,
+                 error, datetime.now().isoformat(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE state NOT IN (?, ?) ORDER BY created_at", FINISHED_STATES
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def renew(self, owner: str):
+        """Extend the lease on every unfinished job this owner holds"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND state NOT IN (?, ?)",
+                (time.time(), owner, *FINISHED_STATES)
+            )
+
+    def release(self, owner: str):
+        """Give up the owner's leases (on shutdown), so another process can take the jobs over right away"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat = 0 WHERE owner = ? AND state NOT IN (?, ?)", (owner, *FINISHED_STATES)
+            )
+
+    def claim_expired(self, owner: str, lease_seconds: float) -> List[str]:
+        """
+        Take over unfinished jobs whose lease has expired; the conditional UPDATE
+        is atomic, so each job is claimed by exactly one process
+        """
+        now = time.time()
+        claimed = []
+        with self._lock:
+            candidates = self._conn.execute(
+                "SELECT id FROM jobs WHERE state NOT IN (?, ?) AND heartbeat < ? ORDER BY created_at",
+                (*FINISHED_STATES, now - lease_seconds)
+            ).fetchall()
+            for row in candidates:
+                with self._conn:
+                    updated = self._conn.execute(
+                        "UPDATE jobs SET owner = ?, heartbeat = ?, state = ?, stage = 'queued', "
+                        "message = 'Re-queued after its worker stopped', progress = 0, updated_at = ? "
+                        "WHERE id = ? AND state NOT IN (?, ?) AND heartbeat < ?",
+                        (owner, now, QUEUED, datetime.now().isoformat(), row["id"], *FINISHED_STATES,
+                         now - lease_seconds)
+                    ).rowcount
+                if updated:
+                    claimed.append(row["id"])
+        return claimed
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Delete finished jobs (and their results) last updated more than older_than_seconds ago"""
+        cutoff = datetime.fromtimestamp(time.time() - older_than_seconds).isoformat()
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?", (*FINISHED_STATES, cutoff)
+            ).rowcount
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    @staticmethod
+    def to_status(job: Dict[str, Any]) -> ProcessingStatus:
+        return ProcessingStatus(
+            stage=job["stage"],
+            message=job["message"],
+            progress=job["progress"],
+            timestamp=datetime.fromisoformat(job["updated_at"])
+        )
+
+# Signature of the function that does the actual work for a job.
+# It receives the job record and a progress callback (stage, message, progress).
+JobHandler = Callable[[Dict[str, Any], Callable[[str, str, int], None]], Awaitable[Dict[str, Any]]]
+
+class JobQueue:
+    """
+    Bounded asyncio queue with a fixed number of workers running a job handler.
+
+    The queue renews its leases every lease_seconds / 3. On start and on every
+    renewal it takes over jobs whose lease has expired (their process died),
+    and it deletes finished jobs older than retention_seconds.
+
+    SQLite calls never run on the event loop: a locked database would stall
+    every request for up to the connection timeout. Job writes go through one
+    writer thread, so progress updates land in order and before the final state.
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, concurrency: int = 2, max_depth: int = 100,
+                 lease_seconds: float = 60.0, retention_seconds: float = 7 * 24 * 3600):
+        self.store = store
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.max_depth = max(1, max_depth)
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._writer: Optional[ThreadPoolExecutor] = None
+        # Submissions between the depth check and the queue insert count towards the depth
+        self._submitting = 0
+
+    async def start(self):
+        """Start the workers and take over jobs left by processes that are gone"""
+        self._queue = asyncio.Queue()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        await self._maintain()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._workers.append(asyncio.create_task(self._keep_leases()))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Pending progress writes land before the leases are released
+        await asyncio.to_thread(self._writer.shutdown)
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    async def submit(self, filename: str, filepath: str, options: Dict[str, Any]) -> str:
+        if self.depth >= self.max_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_depth} pending jobs)")
+        self._submitting += 1
+        try:
+            job_id = await self._write(self.store.create, filename, filepath, options, owner=self.owner)
+            self._queue.put_nowait(job_id)
+        finally:
+            self._submitting -= 1
+        return job_id
+
+    async def _write(self, func: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._writer, partial(func, *args, **kwargs))
+
+    async def _keep_leases(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._maintain()
+            except sqlite3.Error:
+                pass  # a busy database only delays the next renewal
+
+    async def _maintain(self):
+        def maintain() -> List[str]:
+            self.store.renew(self.owner)
+            if self.retention_seconds > 0:
+                self.store.purge_finished(self.retention_seconds)
+            return self.store.claim_expired(self.owner, self.lease_seconds)
+
+        for job_id in await asyncio.to_thread(maintain):
+            self._queue.put_nowait(job_id)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + self._submitting if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await asyncio.to_thread(self.store.get, job_id)
+        # Taken over by another process (this one missed its renewals), or already done
+        if job is None or job["state"] in FINISHED_STATES or job["owner"] != self.owner:
+            return
+
+        last_progress = {"value": 0}
+
+        def report(stage: str, message: str, progress: int):
+            # Called from the loop and from worker threads alike: queue the write, don't wait for it
+            last_progress["value"] = progress
+            self._writer.submit(self.store.update, job_id, RUNNING, stage, message, progress)
+
+        try:
+            result = await self.handler(job, report)
+            await self._write(self.store.update, job_id, COMPLETED, "completed", "Processing complete", 100,
+                              result=result)
+        except Exception as e:
+            await self._write(self.store.update, job_id, FAILED, "failed", str(e), last_progress["value"],
+                              error=str(e))
@@ -0,0 +1,256 @@
+import asyncio
+import shutil
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.document_processor import WHISPER_SAMPLE_RATE
+from services.streaming_transcription import BYTES_PER_SAMPLE, IncrementalChunker, SegmentStitcher
+
+BYTES_PER_SECOND = WHISPER_SAMPLE_RATE * BYTES_PER_SAMPLE
+
+class LiveSession:
+    """
+    One live meeting: 16 kHz mono s16le PCM in, transcript segments and a
+    running summary out.
+
+    Audio is buffered until a window is full, then transcribed on the CPU pool
+    while the next window fills; consecutive windows overlap and are stitched
+    like the streaming pipeline's. Finished chunks go to the map stage right
+    away, and the running summary is refreshed from the stored chunk summaries
+    every refresh_seconds or after refresh_chunks new chunks. The text that has
+    not filled a chunk yet is merged as is, so a refresh makes no map call of
+    its own. Messages to the client are sent one at a time (the transcription
+    and refresh tasks share the socket).
+
+    Memory per session is bounded: at most max_pending_seconds of audio are
+    buffered (feed() waits for the transcription in flight beyond that, which
+    pushes back on the client), only the last transcript_tail segments are kept
+    (every segment is sent to the client as it is produced), and chunk text is
+    dropped once its summary exists.
+    """
+
+    def __init__(self, pools, processor, chain, emit: Callable[[Dict[str, Any]], Awaitable[None]],
+                 whisper_model: Optional[str] = None, analysis_type: str = "comprehensive", use_cache: bool = True,
+                 window_seconds: float = 30.0, overlap_seconds: float = 2.0, refresh_seconds: float = 60.0,
+                 refresh_chunks: int = 2, max_pending_seconds: float = 120.0, transcript_tail: int = 200):
+        self.session_id = uuid.uuid4().hex
+        self.pools = pools
+        self.processor = processor
+        self.chain = chain
+        self.emit = emit
+        self.whisper_model = whisper_model
+        self.analysis_type = analysis_type
+        self.use_cache = use_cache
+        self.window_bytes = int(window_seconds * WHISPER_SAMPLE_RATE) * BYTES_PER_SAMPLE
+        self.overlap_bytes = int(min(overlap_seconds, window_seconds / 2) * WHISPER_SAMPLE_RATE) * BYTES_PER_SAMPLE
+        self.refresh_seconds = refresh_seconds
+        self.refresh_chunks = max(1, refresh_chunks)
+        self.max_pending_bytes = max(int(max_pending_seconds * BYTES_PER_SECOND), self.window_bytes)
+
+        self.segments = deque(maxlen=transcript_tail)
+        self.summary: Optional[Dict[str, Any]] = None
+        self.stats = {"audio_seconds": 0.0, "windows": 0, "segments": 0, "chunks": 0, "refreshes": 0, "backpressure_waits": 0}
+
+        self._audio = bytearray()
+        self._audio_start = 0.0
+        self._window: Optional[asyncio.Task] = None
+        self._stitcher = SegmentStitcher()
+        self._lower = -1.0
+        self._chunker = IncrementalChunker(processor)
+        self._map_slots = asyncio.Semaphore(chain.max_concurrency)
+        self._map_tasks: List[asyncio.Task] = []
+        self._unmapped: Dict[int, Dict[str, Any]] = {}
+        self._refresh: Optional[asyncio.Task] = None
+        self._last_refresh = time.monotonic()
+        self._chunks_at_refresh = 0
+        self._segments_at_refresh = 0
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: Dict[str, Any]):
+        """Emit one message; concurrent tasks never interleave their frames"""
+        async with self._send_lock:
+            await self.emit(message)
+
+    async def feed(self, pcm: bytes):
+        """Add received audio; starts the next window once enough is buffered"""
+        self._audio.extend(pcm)
+        self.stats["audio_seconds"] += len(pcm) / BYTES_PER_SECOND
+        if self._window is not None and (self._window.done() or len(self._audio) > self.max_pending_bytes):
+            if not self._window.done():
+                self.stats["backpressure_waits"] += 1
+            await self._finish_window()
+        if self._window is None and len(self._audio) >= self.window_bytes:
+            self._start_window(final=False)
+
+    async def close(self) -> Dict[str, Any]:
+        """Transcribe what is left, summarize every chunk and return the final analysis"""
+        try:
+            await self._finish_window()
+            # Everything buffered is new audio except the overlap with the previous window
+            while len(self._audio) > self.window_bytes:
+                self._start_window(final=False)
+                await self._finish_window()
+            if len(self._audio) > (self.overlap_bytes if self.stats["windows"] else 0):
+                self._start_window(final=True)
+                await self._finish_window()
+            self._start_map(self._chunker.finish())
+            if self._refresh is not None:
+                await asyncio.gather(self._refresh, return_exceptions=True)
+            return await self._summarize()
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        for task in [self._window, self._refresh] + self._map_tasks:
+            if task is not None and not task.done():
+                task.cancel()
+
+    def _start_window(self, final: bool):
+        size = len(self._audio) - len(self._audio) % BYTES_PER_SAMPLE if final else self.window_bytes
+        pcm = bytes(self._audio[:size])
+        start = self._audio_start
+        # Keep the overlap so the next window hears the words cut at this boundary
+        consumed = size if final else size - self.overlap_bytes
+        del self._audio[:consumed]
+        self._audio_start += consumed / BYTES_PER_SECOND
+        end = start + size / BYTES_PER_SECOND
+        upper = float("inf") if final else end - self.overlap_bytes / BYTES_PER_SECOND / 2
+        self._window = asyncio.create_task(self._transcribe(pcm, start, upper))
+
+    async def _finish_window(self):
+        if self._window is not None:
+            window, self._window = self._window, None
+            await window
+
+    async def _transcribe(self, pcm: bytes, start: float, upper: float):
+        result = await self.pools.transcribe_pcm(pcm, start, self.whisper_model)
+        self.stats["windows"] += 1
+        lower, self._lower = self._lower, upper
+        for segment in self._stitcher.keep(result["segments"], lower, upper):
+            self.segments.append(segment)
+            self.stats["segments"] += 1
+            await self.send({"type": "segment", **segment})
+            self._start_map(self._chunker.add(self.processor._clean_text(segment["text"])))
+        self._maybe_refresh()
+
+    def _start_map(self, chunks: List[Dict[str, Any]]):
+        for chunk in chunks:
+            index = len(self._map_tasks)
+            self._unmapped[index] = chunk
+            self._map_tasks.append(asyncio.create_task(self._summarize_chunk(index, chunk)))
+            self.stats["chunks"] += 1
+
+    async def _summarize_chunk(self, index: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._map_slots:
+            result = await self.pools.run_io(self.chain.summarize_chunk, index, chunk, self.use_cache)
+        if result["success"]:
+            self._unmapped.pop(index, None)
+        return result
+
+    def _maybe_refresh(self):
+        if self._refresh is not None and not self._refresh.done():
+            return
+        new_chunks = len(self._map_tasks) - self._chunks_at_refresh
+        new_segments = self.stats["segments"] - self._segments_at_refresh
+        due = time.monotonic() - self._last_refresh >= self.refresh_seconds
+        if new_chunks >= self.refresh_chunks or (due and new_segments):
+            self._refresh = asyncio.create_task(self._refresh_summary())
+
+    async def _refresh_summary(self):
+        self._last_refresh = time.monotonic()
+        self._chunks_at_refresh = len(self._map_tasks)
+        self._segments_at_refresh = self.stats["segments"]
+        try:
+            await self._summarize(final=False)
+        except Exception as e:
+            await self.send({"type": "error", "error": f"Summary refresh failed: {e}"})
+
+    async def _summarize(self, final: bool = True) -> Dict[str, Any]:
+        # A chunk whose map call failed is summarized again instead of failing every later refresh
+        for index, task in enumerate(self._map_tasks):
+            if task.done() and index in self._unmapped:
+                self._map_tasks[index] = asyncio.create_task(self._summarize_chunk(index, self._unmapped[index]))
+        chunk_results = list(await asyncio.gather(*self._map_tasks))
+
+        # The text that has not filled a chunk yet joins the chunk summaries as is (close() flushes it into a chunk)
+        pending = self._chunker.pending()
+        if not chunk_results and not pending:
+            analysis = {"success": False, "error": "No speech transcribed yet", "analysis_type": self.analysis_type}
+        else:
+            analysis = await self.pools.run_io(
+                self.chain.reduce_chunk_results, chunk_results, self.analysis_type, self.use_cache, pending or None
+            )
+            # Chunk summaries stay on the server; clients get the merged analysis
+            analysis = {key: value for key, value in analysis.items() if key != "chunk_results"}
+            self.summary = analysis
+        self.stats["refreshes"] += 1
+        await self.send({
+            "type": "final" if final else "summary",
+            "analysis": analysis,
+            "stats": {**self.stats, "audio_seconds": round(self.stats["audio_seconds"], 2)}
+        })
+        return analysis
+
+class FfmpegPcmDecoder:
+    """
+    Decodes a compressed live stream (e.g. WebM/Ogg Opus from a browser's
+    MediaRecorder) to 16 kHz mono PCM while frames are still arriving, and
+    hands the decoded audio to on_pcm.
+    """
+
+    def __init__(self, on_pcm: Callable[[bytes], Awaitable[None]], read_bytes: int = BYTES_PER_SECOND):
+        self.on_pcm = on_pcm
+        self.read_bytes = read_bytes
+        self._process = None
+        self._reader: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("ffmpeg") is not None
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-fflags", "nobuffer", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            pcm = await self._process.stdout.read(self.read_bytes)
+            if not pcm:
+                return
+            await self.on_pcm(pcm)
+
+    async def feed(self, data: bytes) -> bool:
+        """Forward a frame to ffmpeg; returns False once the decoder has given up"""
+        if self._process is None or self._process.stdin.is_closing():
+            return False
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+    async def finish(self):
+        """Close the input and wait until all decoded audio was handed over"""
+        if self._process is None:
+            return
+        if not self._process.stdin.is_closing():
+            self._process.stdin.close()
+        try:
+            await self._reader
+        finally:
+            await self._process.wait()
+
+    def kill(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    The memory tier is an LRU of at most max_entries responses; the optional
+    SQLite tier (db_path) survives restarts and is shared by every worker on
+    the host. Entries expire after ttl_seconds in both tiers.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 24 * 3600,
+                 db_path: Optional[str] = None, disk_max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "stored": 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+
+    @staticmethod
+    def make_key(model: str, generation_config: Dict[str, Any], prompt: str) -> str:
+        """Key covering everything that changes the response"""
+        digest = hashlib.sha256()
+        digest.update(model.encode())
+        digest.update(json.dumps(generation_config, sort_keys=True).encode())
+        digest.update(prompt.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._store_in_memory(key, row[0], row[1])
+                    self._counters["disk_hits"] += 1
+                    return row[0]
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_in_memory(key, value, expires_at)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, expires_at))
+                    self._counters["stored"] += 1
+                    # Trimming scans the table, so it only runs every 100 writes
+                    # (the disk tier can exceed disk_max_entries by that much in between)
+                    if self._counters["stored"] % 100 == 0:
+                        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                        self._conn.execute(
+                            "DELETE FROM responses WHERE key NOT IN "
+                            "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT ?)",
+                            (self.disk_max_entries,)
+                        )
+
+    def record_bypass(self):
+        with self._lock:
+            self._counters["bypassed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+            disk_entries = (
+                self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if self._conn is not None else None
+            )
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+    def _store_in_memory(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+class SingleFlight:
+    """
+    In-flight deduplication: while a call for a key is running, callers with
+    the same key wait for its result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._counters["calls"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
@@ -0,0 +1,391 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Iterator, Optional
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+class LLMError(Exception):
+    """An LLM call failed and retrying will not help (bad request, invalid key, blocked prompt)"""
+
+class RetryableLLMError(LLMError):
+    """A transient failure (5xx, dropped connection, timeout); the call may be retried"""
+
+class LLMTimeoutError(RetryableLLMError):
+    """The call did not finish within the per-call timeout"""
+
+class RateLimitError(RetryableLLMError):
+    """The API answered 429; retry_after is the server's hint in seconds, if any"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Async token bucket: holds up to `capacity` units and refills at `capacity`
+    per `period` seconds. acquire() waits until enough units are available.
+    The lock is created for the running loop, so the bucket survives a
+    restarted BackgroundLoop.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._available = capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        # A request larger than the whole bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._loop_lock():
+            self._refill()
+            while self._available < amount:
+                await asyncio.sleep((amount - self._available) / self.rate)
+                self._refill()
+            self._available -= amount
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets; a limit of 0 disables that bucket"""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    async def acquire(self, tokens: int):
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(tokens)
+
+class GeminiBackend:
+    """Gemini REST API over one shared httpx connection pool"""
+
+    def __init__(self, api_key: str, max_connections: int = 20, timeout: float = 60.0,
+                 structured_output: bool = False):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        # Send response_schema as responseMimeType/responseSchema (models from gemini-1.5 on)
+        self.structured_output = structured_output
+        self._http = None
+
+    @property
+    def http(self):
+        """Created on first use, inside the event loop that will use it"""
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                # In a header rather than ?key=, which ends up in proxy/access logs and httpx error messages
+                headers={"x-goog-api-key": self.api_key},
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self._http
+
+    def _request(self, prompt: str, generation_config: Dict[str, Any]) -> Dict[str, Any]:
+        config = {
+            "temperature": generation_config.get("temperature"),
+            "maxOutputTokens": generation_config.get("max_output_tokens")
+        }
+        if self.structured_output and generation_config.get("response_schema"):
+            config["responseMimeType"] = "application/json"
+            config["responseSchema"] = generation_config["response_schema"]
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "generationConfig": config}
+
+    @staticmethod
+    def _raise_for_status(response):
+        if response.status_code < 400:
+            return
+        message = f"Gemini API error: HTTP {response.status_code}"
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            raise RateLimitError(message, float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if response.status_code >= 500 or response.status_code == 408:
+            raise RetryableLLMError(message)
+        raise LLMError(f"{message}: {response.text[:500]}")
+
+    @staticmethod
+    def _text(payload: Dict[str, Any]) -> str:
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            reason = payload.get("promptFeedback", {}).get("blockReason", "no candidates returned")
+            raise LLMError(f"Gemini API error: {reason}")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+        import httpx
+        try:
+            response = await self.http.post(
+                f"{GEMINI_API_URL}/{model}:generateContent",
+                json=self._request(prompt, generation_config)
+            )
+        except httpx.TransportError as e:
+            raise RetryableLLMError(f"Gemini API error: {e}") from e
+        self._raise_for_status(response)
+        return self._text(response.json())
+
+    async def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[str]:
+        import httpx
+        try:
+            async with self.http.stream(
+                "POST",
+                f"{GEMINI_API_URL}/{model}:streamGenerateContent",
+                params={"alt": "sse"},
+                json=self._request(prompt, generation_config)
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                self._raise_for_status(response)
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        text = self._text(json.loads(line[5:]))
+                        if text:
+                            yield text
+        except httpx.TransportError as e:
+            raise RetryableLLMError(f"Gemini API error: {e}") from e
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+class StubBackend:
+    """
+    Offline stand-in for the API, for load tests and local development.
+
+    Responses are deterministic for a prompt, latency is base_latency plus a
+    per-output-token cost, and failure_rate / rate_limit_rate inject retryable
+    errors and 429s.
+    """
+
+    def __init__(self, base_latency: float = 0.5, seconds_per_token: float = 0.002, output_tokens: int = 200,
+                 failure_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: Optional[int] = None):
+        self.base_latency = base_latency
+        self.seconds_per_token = seconds_per_token
+        self.output_tokens = output_tokens
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def _maybe_fail(self):
+        self.calls += 1
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            raise RateLimitError("Stub backend: rate limited")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise RetryableLLMError("Stub backend: transient failure")
+
+    def _response_words(self, prompt: str):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        words = [f"## Stub summary {digest}\n"]
+        words += [f"- point {i + 1}\n" if i % 12 == 11 else f"word{i} " for i in range(self.output_tokens)]
+        return words
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+        await asyncio.sleep(self.base_latency)
+        self._maybe_fail()
+        words = self._response_words(prompt)
+        await asyncio.sleep(len(words) * self.seconds_per_token)
+        schema = generation_config.get("response_schema")
+        if schema:
+            # JSON answers fill every requested property with the same text
+            return json.dumps({name: "".join(words) for name in schema.get("properties", {})})
+        return "".join(words)
+
+    async def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[str]:
+        await asyncio.sleep(self.base_latency)
+        self._maybe_fail()
+        for word in self._response_words(prompt):
+            await asyncio.sleep(self.seconds_per_token)
+            yield word
+
+    async def close(self):
+        pass
+
+class AsyncLLMClient:
+    """
+    Async LLM calls with rate limiting, per-call timeouts and retries.
+
+    Every call first takes one request and its estimated tokens (prompt plus
+    maximum output) from the rate limiter. Retryable errors are retried with
+    exponential backoff and full jitter; a 429's Retry-After is respected.
+    A stream is only retried until its first chunk has been delivered.
+    """
+
+    def __init__(self, backend, limiter: Optional[RateLimiter] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 30.0, timeout: float = 60.0,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        self.backend = backend
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.count_tokens = count_tokens or (lambda text: len(text) // 4 + 1)
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "timeouts": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str], count_tokens: Optional[Callable[[str], int]] = None) -> "AsyncLLMClient":
+        timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+        if os.getenv("LLM_BACKEND", "gemini").lower() == "stub":
+            backend = StubBackend(
+                base_latency=float(os.getenv("LLM_STUB_LATENCY", "0.5")),
+                failure_rate=float(os.getenv("LLM_STUB_FAILURE_RATE", "0")),
+                rate_limit_rate=float(os.getenv("LLM_STUB_RATE_LIMIT_RATE", "0"))
+            )
+        else:
+            backend = GeminiBackend(
+                api_key,
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+                timeout=timeout,
+                structured_output=os.getenv("LLM_STRUCTURED_OUTPUT", "false").lower() == "true"
+            )
+        return cls(
+            backend,
+            RateLimiter(
+                requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+                tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+            ),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+            timeout=timeout,
+            count_tokens=count_tokens
+        )
+
+    def _backoff(self, attempt: int, error: RetryableLLMError) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if isinstance(error, RateLimitError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+        return delay
+
+    def _record_failure(self, error: Exception):
+        if isinstance(error, RateLimitError):
+            self.stats["rate_limited"] += 1
+        elif isinstance(error, LLMTimeoutError):
+            self.stats["timeouts"] += 1
+
+    async def _acquire(self, prompt: str, generation_config: Dict[str, Any]):
+        await self.limiter.acquire(self.count_tokens(prompt) + generation_config.get("max_output_tokens", 0))
+
+    async def generate(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+        self.stats["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(prompt, generation_config)
+            try:
+                try:
+                    return await asyncio.wait_for(self.backend.generate(model, prompt, generation_config), self.timeout)
+                except asyncio.TimeoutError as e:
+                    raise LLMTimeoutError(f"LLM call timed out after {self.timeout}s") from e
+            except RetryableLLMError as e:
+                self._record_failure(e)
+                if attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+            except LLMError:
+                self.stats["failures"] += 1
+                raise
+
+    async def stream(self, model: str, prompt: str, generation_config: Dict[str, Any]) -> AsyncIterator[str]:
+        self.stats["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(prompt, generation_config)
+            started = False
+            chunks = self.backend.stream(model, prompt, generation_config)
+            try:
+                while True:
+                    try:
+                        # The timeout applies to the wait for each chunk
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError as e:
+                        raise LLMTimeoutError(f"LLM stream stalled for {self.timeout}s") from e
+                    started = True
+                    yield chunk
+            except RetryableLLMError as e:
+                self._record_failure(e)
+                if started or attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+            except LLMError:
+                self.stats["failures"] += 1
+                raise
+            finally:
+                # Releases the HTTP connection of an abandoned stream
+                await chunks.aclose()
+
+    async def close(self):
+        await self.backend.close()
+
+class BackgroundLoop:
+    """
+    An event loop on a daemon thread, so synchronous code (the summarization
+    chain runs in worker threads) can share one AsyncLLMClient, its connection
+    pool and its rate limiter.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="llm-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """Run a coroutine on the loop and block until it is done"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def iterate(self, iterable: AsyncIterator) -> Iterator:
+        """Consume an async iterator on the loop, yielding its items to the calling thread"""
+        items = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for item in iterable:
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+            finally:
+                items.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item = items.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # The consumer stopped early (client disconnected): stop the upstream call
+            future.cancel()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+def rss_bytes() -> int:
+    """Resident memory of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs (macOS): peak RSS is the best available approximation
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class ModelRegistry:
+    """
+    Loads each model once per process and shares it between all code paths.
+
+    Load time, resident memory added by the load and warm-up time are recorded
+    per model. When metrics_path is set, every change is also written there as
+    JSON so the API process can report on models loaded in worker processes.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], warmer: Optional[Callable[[Any], None]] = None,
+                 metrics_path: Optional[str] = None):
+        self.loader = loader
+        self.warmer = warmer
+        self.metrics_path = metrics_path
+        self._models: Dict[str, Any] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """The model called name, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                rss_before = rss_bytes()
+                start_time = time.perf_counter()
+                self._models[name] = self.loader(name)
+                self._metrics[name] = {
+                    "load_seconds": round(time.perf_counter() - start_time, 3),
+                    "rss_bytes": max(0, rss_bytes() - rss_before),
+                    "warmup_seconds": None,
+                    "loaded_at": time.time()
+                }
+                self._publish()
+            return self._models[name]
+
+    def warm_up(self, name: str) -> Any:
+        """Load the model and run one dummy inference so the first real call is not slower"""
+        model = self.get(name)
+        if self.warmer is not None and self._metrics[name]["warmup_seconds"] is None:
+            start_time = time.perf_counter()
+            self.warmer(model)
+            with self._lock:
+                self._metrics[name]["warmup_seconds"] = round(time.perf_counter() - start_time, 3)
+                self._publish()
+        return model
+
+    def loaded(self) -> List[str]:
+        return list(self._models)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "rss_bytes": rss_bytes(),
+            "models": {name: dict(metrics) for name, metrics in self._metrics.items()}
+        }
+
+    def _publish(self):
+        if not self.metrics_path:
+            return
+        Path(self.metrics_path).parent.mkdir(parents=True, exist_ok=True)
+        temp_path = f"{self.metrics_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.stats(), f)
+        os.replace(temp_path, self.metrics_path)
+
+def read_model_metrics(metrics_dir: str) -> List[Dict[str, Any]]:
+    """Metrics published by the registries of all processes writing to metrics_dir"""
+    snapshots = []
+    for path in sorted(Path(metrics_dir).glob("*.json")):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Being replaced right now, or the process died mid-write
+            continue
+    return snapshots
+
+def _process_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def remove_dead_worker_metrics(metrics_dir: str) -> int:
+    """
+    Delete the worker-<pid>.json files of processes that have exited. The
+    directory is shared by every API worker and batch run, so files of live
+    processes are left alone: their registries only republish on the next load.
+    """
+    removed = 0
+    for path in Path(metrics_dir).glob("worker-*.json"):
+        try:
+            pid = int(path.stem[len("worker-"):])
+        except ValueError:
+            continue
+        if not _process_alive(pid):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+def _load_whisper(name: str):
+    import whisper
+    return whisper.load_model(name)
+
+def _warm_whisper(model):
+    # One second of silence exercises the decoder once (kernels, caches, mel filters)
+    import numpy as np
+    model.transcribe(np.zeros(16000, dtype=np.float32))
+
+# Whisper models of this process
+whisper_models = ModelRegistry(_load_whisper, _warm_whisper)
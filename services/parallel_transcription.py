@@ -0,0 +1,115 @@
+import asyncio
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.document_processor import AUDIO_EXTENSIONS, WHISPER_SAMPLE_RATE
+from services.streaming_transcription import decode_to_pcm, pcm_duration
+
+# Energy is measured over 30 ms frames when looking for a pause
+SILENCE_FRAME_SECONDS = 0.03
+
+def quietest_point(pcm_path: str, start: float, end: float) -> float:
+    """Time (seconds) of the lowest-energy frame between start and end"""
+    import numpy as np
+    samples = np.memmap(pcm_path, dtype=np.int16, mode="r")
+    frame = int(SILENCE_FRAME_SECONDS * WHISPER_SAMPLE_RATE)
+    first = int(start * WHISPER_SAMPLE_RATE)
+    count = (int(end * WHISPER_SAMPLE_RATE) - first) // frame
+    if count < 1:
+        return (start + end) / 2
+    frames = samples[first:first + count * frame].astype(np.float32).reshape(count, frame)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    return (first + int(np.argmin(energy)) * frame + frame // 2) / WHISPER_SAMPLE_RATE
+
+def plan_silence_segments(pcm_path: str, segment_seconds: float = 60.0,
+                          search_seconds: float = 5.0) -> List[Tuple[float, float]]:
+    """
+    Split audio into roughly segment_seconds long (start, end) pieces. Each cut is
+    placed at the quietest frame within search_seconds of the target, so words are
+    not split between segments and no overlap is needed.
+    """
+    duration = pcm_duration(pcm_path)
+    search_seconds = min(search_seconds, segment_seconds / 2)
+    segments = []
+    start = 0.0
+    while duration - start > segment_seconds + search_seconds:
+        target = start + segment_seconds
+        cut = quietest_point(pcm_path, target - search_seconds, target + search_seconds)
+        segments.append((start, cut))
+        start = cut
+    if duration > start:
+        segments.append((start, duration))
+    return segments
+
+def merge_segment_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Concatenate per-segment Whisper results (in segment order) into one transcript"""
+    segments = [segment for result in results for segment in result["segments"]]
+    segments.sort(key=lambda segment: segment["start"])
+    languages = Counter(result["language"] for result in results if result["segments"])
+    return {
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else "unknown"
+    }
+
+class ParallelTranscriber:
+    """
+    Transcribes one recording on all CPU workers at once.
+
+    The audio is cut at pauses into independent segments, each worker transcribes
+    segments with its own Whisper model, and the absolute timestamps put the
+    pieces back in order. Other file types go through the regular process_file.
+    """
+
+    def __init__(self, pools, processor, segment_seconds: float = 60.0, search_seconds: float = 5.0):
+        self.pools = pools
+        self.processor = processor
+        self.segment_seconds = segment_seconds
+        self.search_seconds = search_seconds
+
+    async def process_file(self, filepath: str, content_hash: Optional[str] = None,
+                           decoded_audio: Optional[str] = None, whisper_model: Optional[str] = None) -> Dict[str, Any]:
+        """Drop-in replacement for ExecutionPools.process_file"""
+        file_extension = Path(filepath).suffix.lower()
+        if file_extension not in AUDIO_EXTENSIONS:
+            return await self.pools.process_file(filepath, content_hash, decoded_audio, whisper_model)
+
+        try:
+            cache_key = await self.pools.run_io(self.processor.cache_key, filepath, content_hash, whisper_model)
+            if cache_key is not None:
+                cached = await self.pools.run_io(self.processor.cache.get, cache_key)
+                if cached is not None:
+                    cached["metadata"]["cache_hit"] = True
+                    return cached
+
+            pcm_path = decoded_audio or await self.pools.run_io(decode_to_pcm, filepath)
+            try:
+                segments = await self.pools.run_io(
+                    plan_silence_segments, pcm_path, self.segment_seconds, self.search_seconds
+                )
+                # The process pool caps how many segments are transcribed at a time
+                results = await asyncio.gather(*(
+                    self.pools.transcribe_window(pcm_path, start, end, whisper_model) for start, end in segments
+                ))
+                duration = pcm_duration(pcm_path)
+            finally:
+                # PCM decoded here is only needed for the transcription; decoded_audio belongs to the upload
+                if pcm_path != decoded_audio:
+                    await self.pools.run_io(Path(pcm_path).unlink, True)
+            merged = merge_segment_results(results)
+
+            result = self.processor._build_audio_result(merged["text"], duration, merged["language"])
+            result["segments"] = merged["segments"]
+            result["metadata"]["parallel_segments"] = len(segments)
+            if cache_key is not None:
+                result["metadata"]["cache_hit"] = False
+                await self.pools.run_io(self.processor.cache.put, cache_key, result)
+            return result
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "file_type": file_extension
+            }
@@ -0,0 +1,41 @@
+import importlib
+import time
+from typing import Dict, List
+
+# Optional dependencies imported on first use, grouped by the code path that needs them.
+# The API process only runs the request path: LLM calls over httpx and PCM analysis for
+# parallel transcription (the text splitter and orjson are imported with the app anyway).
+PRELOAD_GROUPS = {
+    "audio": ["numpy"],
+    "llm": ["httpx"],
+    "pdf": [],
+    "docx": []
+}
+# Whisper and the document loaders only run in the process-pool workers, which import
+# these in the pool initializer (services/executors.py); the Gemini SDK is legacy-only
+WORKER_PRELOAD_GROUPS = {
+    "audio": ["numpy", "whisper"],
+    "llm": [],
+    "pdf": ["langchain_community.document_loaders.pdf", "pypdf"],
+    "docx": ["langchain_community.document_loaders.word_document", "docx2txt"]
+}
+
+def parse_preload_groups(value: str) -> List[str]:
+    """Comma-separated group names, or "all"; unknown names raise ValueError"""
+    groups = [name.strip().lower() for name in (value or "").split(",") if name.strip()]
+    if "all" in groups:
+        return list(PRELOAD_GROUPS)
+    unknown = [name for name in groups if name not in PRELOAD_GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown preload group(s) {', '.join(unknown)}; choose from {', '.join(PRELOAD_GROUPS)} or all")
+    return groups
+
+def preload(groups: List[str], modules: Dict[str, List[str]] = PRELOAD_GROUPS) -> Dict[str, float]:
+    """Import the modules of each group now; returns the import time per group in seconds"""
+    timings = {}
+    for group in groups:
+        start_time = time.perf_counter()
+        for module in modules[group]:
+            importlib.import_module(module)
+        timings[group] = round(time.perf_counter() - start_time, 3)
+    return timings
@@ -3,6 +3,16 @@ from langchain.prompts import PromptTemplate
 class MeetingPromptTemplates:
     """Collection of prompt templates for meeting summarization"""
     
+    @classmethod
+    def get_section_prompts(cls):
+        """Templates used for the final analysis sections"""
+        return [
+            cls.get_comprehensive_summary_prompt(),
+            cls.get_topic_extraction_prompt(),
+            cls.get_action_items_prompt(),
+            cls.get_sentiment_analysis_prompt()
+        ]
+    
     @staticmethod
     def get_executive_summary_prompt():
         """Template for executive summary"""
@@ -167,3 +177,65 @@ Format the response in clean markdown. Be specific and actionable. If informatio
             input_variables=["transcript"],
             template=template
         )
+    
+    @staticmethod
+    def get_combined_analysis_prompt():
+        """Template for all four sections in one call, answered as a JSON object"""
+        template = """
+You are an expert meeting analyst. Analyze the following meeting transcript once and produce four analyses of it.
+
+MEETING TRANSCRIPT:
+{transcript}
+
+Respond with a single JSON object and nothing else (no code fences, no commentary). It must have exactly these keys, each holding a markdown string:
+
+"comprehensive_summary": A structured report with the sections Executive Summary (2-3 sentences), Key Discussion Points, Decisions Made (what and by whom), Action Items ("- [ ] Task - Assigned to: Person - Due: Date"), Next Steps, Participants and Important Notes.
+"topic_analysis": The 3-5 main topics with their subtopics, the importance of each (High/Medium/Low) and any recurring themes.
+"action_items": Every task or commitment with the responsible person, deadline, priority and dependencies; write "Not specified" for anything not stated.
+"sentiment_analysis": Overall tone, key sentiment indicators, areas of agreement and disagreement, engagement of participants and concerns raised.
+
+Be specific and concise; do not invent details that are not in the transcript. Escape quotes and newlines so the object is valid JSON.
+"""
+        return PromptTemplate(
+            input_variables=["transcript"],
+            template=template
+        )
+    
+    @staticmethod
+    def get_chunk_summary_prompt():
+        """Template for summarizing one section of a long transcript (map stage)"""
+        template = """
+You are summarizing one section of a longer meeting transcript. Other sections are summarized separately and combined later.
+
+TRANSCRIPT SECTION:
+{transcript}
+
+Write a dense summary of this section that preserves:
+- Topics discussed and the key points made
+- Decisions reached, including who made them
+- Action items with owners and deadlines, exactly as stated
+- Notable concerns, disagreements or changes in tone
+- Names of participants and their roles where mentioned
+
+Do not add an introduction or conclusion. If the section contains none of an item, omit it rather than guessing.
+"""
+        return PromptTemplate(
+            input_variables=["transcript"],
+            template=template
+        )
+    
+    @staticmethod
+    def get_reduce_summaries_prompt():
+        """Template for merging consecutive section summaries (reduce stage)"""
+        template = """
+The following are summaries of consecutive parts of one meeting, in chronological order.
+
+SECTION SUMMARIES:
+{summaries}
+
+Merge them into a single summary covering all parts. Keep every decision, action item (with owner and deadline), participant name and concern. Combine duplicates, keep the chronological flow, and do not invent details that are not in the summaries.
+"""
+        return PromptTemplate(
+            input_variables=["summaries"],
+            template=template
+        )
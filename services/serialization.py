@@ -0,0 +1,17 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: responses fall back to the standard library encoder
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON. orjson (when installed) is several times faster than
+    json.dumps on large responses such as chunk_results arrays; both produce
+    the same JSON for the plain dicts, lists, strings and numbers the API returns.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,147 @@
+import asyncio
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from services.streaming_transcription import (
+    IncrementalChunker, SegmentStitcher, decode_to_pcm, pcm_duration, plan_windows
+)
+
+class StreamingAudioPipeline:
+    """
+    Overlaps Whisper transcription with summarization for long recordings.
+
+    Audio is transcribed in fixed windows on the CPU pool. Stitched segments are
+    cleaned and chunked as they arrive, and each completed chunk goes straight to
+    the map stage on the I/O pool while later windows are still being transcribed.
+    Once the last window is done only the reduce and final stages remain.
+    """
+
+    def __init__(self, pools, processor, chain, window_seconds: float = 30.0,
+                 overlap_seconds: float = 2.0, max_inflight_windows: int = 2):
+        self.pools = pools
+        self.processor = processor
+        self.chain = chain
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_inflight_windows = max(1, max_inflight_windows)
+
+    async def run(self, filepath: str, content_hash: Optional[str] = None, decoded_audio: Optional[str] = None,
+                  analysis_type: str = "comprehensive", use_cache: bool = True,
+                  report: Optional[Callable[[str, str, int], None]] = None,
+                  whisper_model: Optional[str] = None) -> Dict[str, Any]:
+        report = report or (lambda stage, message, progress: None)
+
+        # A recording that was transcribed before only needs the summarization stages
+        cache_key = await self.pools.run_io(
+            self.processor.cache_key, filepath, content_hash, whisper_model, "streaming"
+        )
+        cached = await self.pools.run_io(self.processor.cache.get, cache_key) if cache_key is not None else None
+        if cached is not None:
+            cached["metadata"]["cache_hit"] = True
+            report("summarizing", "Transcript found in cache, summarizing", 60)
+            cached["analysis"] = await self.pools.run_io(
+                self.chain.process_chunks, cached["chunks"], analysis_type, use_cache, cached["cleaned_transcript"]
+            )
+            return cached
+
+        pcm_path = decoded_audio or await self.pools.run_io(decode_to_pcm, filepath)
+        duration = pcm_duration(pcm_path)
+        windows = plan_windows(duration, self.window_seconds, self.overlap_seconds)
+        stitcher = SegmentStitcher(windows)
+        chunker = IncrementalChunker(self.processor)
+        map_slots = asyncio.Semaphore(self.chain.max_concurrency)
+
+        segments: List[Dict[str, Any]] = []
+        cleaned_pieces: List[str] = []
+        chunks: List[Dict[str, Any]] = []
+        map_tasks: List[asyncio.Task] = []
+        language = None
+
+        async def summarize_chunk(index: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
+            async with map_slots:
+                return await self.pools.run_io(self.chain.summarize_chunk, index, chunk, use_cache)
+
+        def start_map(new_chunks: List[Dict[str, Any]]):
+            for chunk in new_chunks:
+                map_tasks.append(asyncio.create_task(summarize_chunk(len(chunks), chunk)))
+                # The result keeps offsets into the cleaned transcript, not a copy of the text
+                chunks.append({key: value for key, value in chunk.items() if key != "content"})
+
+        def transcribe(window):
+            return asyncio.ensure_future(self.pools.transcribe_window(pcm_path, *window, whisper_model))
+
+        # Keep a few windows in flight so the CPU pool never waits on stitching
+        pending = deque()
+        next_window = 0
+        try:
+            while next_window < len(windows) and len(pending) < self.max_inflight_windows:
+                pending.append(transcribe(windows[next_window]))
+                next_window += 1
+
+            for index in range(len(windows)):
+                result = await pending.popleft()
+                if next_window < len(windows):
+                    pending.append(transcribe(windows[next_window]))
+                    next_window += 1
+
+                language = language or result["language"]
+                for segment in stitcher.add(index, result["segments"]):
+                    segments.append(segment)
+                    cleaned_pieces.append(self.processor._clean_text(segment["text"]))
+                    start_map(chunker.add(cleaned_pieces[-1]))
+
+                report(
+                    "transcribing",
+                    f"Transcribed {windows[index][1]:.0f}s of {duration:.0f}s ({len(map_tasks)} chunks summarizing)",
+                    10 + int(70 * (index + 1) / len(windows))
+                )
+        except BaseException:
+            for task in list(pending) + map_tasks:
+                task.cancel()
+            raise
+        finally:
+            # Every window is transcribed (or the run failed); the decoded audio is not needed any more
+            await self._discard_pcm(pcm_path, decoded_audio)
+
+        raw_transcript = " ".join(segment["text"] for segment in segments)
+        # Segments were cleaned as they arrived; only the separators are left to add
+        cleaned_transcript = "".join(self.processor.cleaner.join_cleaned(cleaned_pieces))
+        remaining = chunker.finish()
+
+        report("summarizing", "Transcription complete, combining chunk summaries", 85)
+        if not map_tasks:
+            # Short recording: nothing was mapped early, let process_chunks pick single-pass or map-reduce
+            chunks.extend({key: value for key, value in chunk.items() if key != "content"} for chunk in remaining)
+            analysis = await self.pools.run_io(
+                self.chain.process_chunks, chunks, analysis_type, use_cache, cleaned_transcript
+            )
+        else:
+            start_map(remaining)
+            chunk_results = await asyncio.gather(*map_tasks)
+            analysis = await self.pools.run_io(self.chain.reduce_chunk_results, chunk_results, analysis_type, use_cache)
+
+        result = {
+            "success": True,
+            "file_type": "audio",
+            "raw_transcript": raw_transcript,
+            "cleaned_transcript": cleaned_transcript,
+            "chunks": chunks,
+            "segments": segments,
+            "metadata": {
+                "duration": duration,
+                "language": language or "unknown",
+                "windows": len(windows),
+                "cache_hit": False
+            }
+        }
+        if cache_key is not None:
+            await self.pools.run_io(self.processor.cache.put, cache_key, result)
+
+        result["analysis"] = analysis
+        return result
+
+    async def _discard_pcm(self, pcm_path: str, decoded_audio: Optional[str]):
+        """Delete PCM decoded here; a caller-provided decoded_audio belongs to the upload"""
+        if pcm_path != decoded_audio:
+            await self.pools.run_io(Path(pcm_path).unlink, True)
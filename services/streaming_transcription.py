@@ -0,0 +1,175 @@
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services.document_processor import WHISPER_SAMPLE_RATE
+
+BYTES_PER_SAMPLE = 2  # s16le
+
+def decode_to_pcm(filepath: str, pcm_path: Optional[str] = None) -> str:
+    """Decode any audio file to 16 kHz mono s16le PCM on disk (ffmpeg streams it; memory stays flat)"""
+    pcm_path = pcm_path or str(Path(filepath).with_suffix(".pcm"))
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", filepath,
+            "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), pcm_path
+        ],
+        check=True
+    )
+    return pcm_path
+
+def pcm_duration(pcm_path: str) -> float:
+    return Path(pcm_path).stat().st_size / BYTES_PER_SAMPLE / WHISPER_SAMPLE_RATE
+
+def plan_windows(duration: float, window_seconds: float = 30.0, overlap_seconds: float = 2.0) -> List[Tuple[float, float]]:
+    """Fixed (start, end) windows in seconds; consecutive windows share overlap_seconds"""
+    step = max(window_seconds - overlap_seconds, 1.0)
+    windows = []
+    start = 0.0
+    while start < duration:
+        end = min(start + window_seconds, duration)
+        windows.append((start, end))
+        if end >= duration:
+            break
+        start += step
+    return windows
+
+def read_pcm_window(pcm_path: str, start: float, end: float):
+    """Load only one window of samples as float32 in [-1, 1]"""
+    import numpy as np
+    offset = int(start * WHISPER_SAMPLE_RATE) * BYTES_PER_SAMPLE
+    count = int((end - start) * WHISPER_SAMPLE_RATE)
+    samples = np.fromfile(pcm_path, dtype=np.int16, count=count, offset=offset)
+    return samples.astype(np.float32) / 32768.0
+
+def pcm_to_float(pcm: bytes):
+    """s16le bytes held in memory (e.g. received over a WebSocket) as float32 in [-1, 1]"""
+    import numpy as np
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+def transcribe_window(model, pcm_path: str, start: float, end: float) -> Dict[str, Any]:
+    """Transcribe one window; segment timestamps are made absolute"""
+    return transcribe_samples(model, read_pcm_window(pcm_path, start, end), start)
+
+def transcribe_samples(model, samples, start: float) -> Dict[str, Any]:
+    """Transcribe float32 samples that begin at `start` seconds; segment timestamps are made absolute"""
+    result = model.transcribe(samples, condition_on_previous_text=False)
+    segments = [
+        {"start": round(start + segment["start"], 2), "end": round(start + segment["end"], 2), "text": segment["text"].strip()}
+        for segment in result.get("segments", [])
+        if segment["text"].strip()
+    ]
+    return {"segments": segments, "language": result.get("language", "unknown")}
+
+class SegmentStitcher:
+    """
+    Merges segments from overlapping windows into one ordered transcript.
+
+    Each overlap region is split at its midpoint: a window keeps the segments
+    whose midpoint falls before the cut, the next window keeps those after it.
+    A segment that mostly overlaps the last kept one in time is the same speech
+    heard by both windows and is dropped as well; repeated words said at
+    different times ("Yes." / "Yes.") are kept.
+    """
+
+    def __init__(self, windows: Optional[List[Tuple[float, float]]] = None):
+        self.windows = windows or []
+        self._last_start = None
+        self._last_end = None
+
+    def add(self, window_index: int, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start, end = self.windows[window_index]
+        lower = -1.0
+        if window_index > 0:
+            lower = (start + self.windows[window_index - 1][1]) / 2
+        upper = float("inf")
+        if window_index + 1 < len(self.windows):
+            upper = (self.windows[window_index + 1][0] + end) / 2
+        return self.keep(segments, lower, upper)
+
+    def keep(self, segments: List[Dict[str, Any]], lower: float, upper: float) -> List[Dict[str, Any]]:
+        """Segments whose midpoint lies in [lower, upper), for windows that are planned as audio arrives"""
+        kept = []
+        for segment in segments:
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if not lower <= midpoint < upper:
+                continue
+            if self._last_end is not None and segment["start"] < self._last_end:
+                overlap = min(segment["end"], self._last_end) - max(segment["start"], self._last_start)
+                if overlap > (segment["end"] - segment["start"]) / 2:
+                    continue
+            kept.append(segment)
+            self._last_start, self._last_end = segment["start"], segment["end"]
+        return kept
+
+class IncrementalChunker:
+    """
+    Builds chunks from cleaned text that arrives piece by piece, using the
+    DocumentProcessor's splitter so chunk sizes match file-based processing.
+    Complete chunks are released as soon as the buffer exceeds one chunk.
+
+    Pieces are joined like TextCleaner.join_cleaned, so each chunk's
+    start/end offsets point into the transcript that join produces; released
+    chunks also carry their "content" for the map stage.
+    """
+
+    def __init__(self, processor):
+        self.processor = processor
+        self._buffer = ""
+        # Position of the buffer's first character in the joined transcript
+        self._offset = 0
+        self._started = False
+
+    def add(self, text: str) -> List[Dict[str, Any]]:
+        if not text:
+            return []
+        if self._started and text[0] not in self.processor.cleaner.punctuation:
+            text = " " + text
+        self._started = True
+        self._buffer += text
+        if self.processor.length_function(self._buffer) <= self.processor.chunk_size:
+            return []
+        chunks = self._split()
+        # The last chunk may still grow; keep it buffered
+        kept_from = chunks[-1]["start"] - self._offset
+        self._buffer = self._buffer[kept_from:]
+        self._offset += kept_from
+        return chunks[:-1]
+
+    def pending(self) -> str:
+        """Text that has not been released as a chunk yet"""
+        return self._buffer.strip()
+
+    def finish(self) -> List[Dict[str, Any]]:
+        if not self._buffer.strip():
+            return []
+        chunks = self._split()
+        self._offset += len(self._buffer)
+        self._buffer = ""
+        return chunks
+
+    def _split(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                **chunk,
+                "start": self._offset + chunk["start"],
+                "end": self._offset + chunk["end"],
+                "content": self._buffer[chunk["start"]:chunk["end"]]
+            }
+            for chunk in self.processor._split_text(self._buffer)
+        ]
+
+class StreamingTranscriber:
+    """Transcribes audio window by window and yields stitched segments as they are ready"""
+
+    def __init__(self, model, window_seconds: float = 30.0, overlap_seconds: float = 2.0):
+        self.model = model
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+
+    def transcribe(self, pcm_path: str) -> Iterator[Dict[str, Any]]:
+        windows = plan_windows(pcm_duration(pcm_path), self.window_seconds, self.overlap_seconds)
+        stitcher = SegmentStitcher(windows)
+        for index, (start, end) in enumerate(windows):
+            result = transcribe_window(self.model, pcm_path, start, end)
+            yield from stitcher.add(index, result["segments"])
@@ -1,47 +1,165 @@
+import json
 import os
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from services import tracing
 from services.prompt_templates import MeetingPromptTemplates
+from services.llm_cache import LLMResponseCache, SingleFlight
+from services.token_budget import TokenBudget
+from services.llm_client import AsyncLLMClient, BackgroundLoop
+from services.summary_store import ChunkSummaryStore, stable_chunks
+from models.meeting_models import ANALYSIS_TYPES, CombinedAnalysis
 
 class GeminiLLM:
     """Simple Gemini API wrapper"""
     
-    def __init__(self, api_key: str, model: str = "gemini-pro"):
+    def __init__(self, api_key: str, model: str = "gemini-pro", temperature: float = 0.7,
+                 max_output_tokens: int = 2000, cache: Optional[LLMResponseCache] = None,
+                 client: Optional[AsyncLLMClient] = None):
         self.api_key = api_key
         self.model = model
-        self._client = None
-        # Configure the API key
-        genai.configure(api_key=api_key)
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+        self.cache = cache
+        # Connection pool, rate limits and retries; shared by all calling threads
+        self.client = client or AsyncLLMClient.from_env(api_key)
+        # Concurrent identical prompts (e.g. a shared meeting opened by many users) share one call
+        self.single_flight = SingleFlight()
+        self._loop = None
     
     @property
-    def client(self):
-        """Lazy initialization of Gemini client"""
-        if self._client is None:
-            self._client = genai.GenerativeModel(self.model)
-        return self._client
-    
-    def generate(self, prompt: str) -> str:
-        """Generate response from Gemini API"""
-        try:
-            response = self.client.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=2000,
-                )
-            )
-            return response.text
-        except Exception as e:
-            raise Exception(f"Gemini API error: {str(e)}")
+    def loop(self) -> BackgroundLoop:
+        """Event loop the async client runs on (started on first use)"""
+        if self._loop is None:
+            self._loop = BackgroundLoop()
+        return self._loop
+    
+    @property
+    def generation_config(self) -> Dict[str, Any]:
+        return {"temperature": self.temperature, "max_output_tokens": self.max_output_tokens}
+    
+    def _cache_lookup(self, prompt: str, use_cache: bool,
+                      generation_config: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Return (cache key to store under, cached response) for a prompt"""
+        if self.cache is None:
+            return None, None
+        if not use_cache:
+            self.cache.record_bypass()
+            return None, None
+        cache_key = self.cache.make_key(self.model, generation_config or self.generation_config, prompt)
+        return cache_key, self.cache.get(cache_key)
+    
+    def generate(self, prompt: str, use_cache: bool = True, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate response from Gemini API, served from the response cache when possible.
+        json_schema asks for a JSON answer of that shape (enforced by the API when
+        structured output is enabled on the backend, otherwise the prompt must ask for it).
+        """
+        return self.generate_with_status(prompt, use_cache, json_schema)[0]
+    
+    def generate_with_status(self, prompt: str, use_cache: bool = True,
+                             json_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+        """generate() plus whether this caller sent the request (False for cache hits and coalesced waits)"""
+        generation_config = self.generation_config
+        if json_schema is not None:
+            generation_config = {**generation_config, "response_schema": json_schema}
+        cache_key, cached = self._cache_lookup(prompt, use_cache, generation_config)
+        if cached is not None:
+            tracing.LLM_CACHE_HITS.inc()
+            tracing.count("llm_cache_hits")
+            return cached, False
+        
+        flight_key = cache_key or LLMResponseCache.make_key(self.model, generation_config, prompt)
+        called = []
+        
+        def call() -> str:
+            called.append(True)
+            return self._call(prompt, cache_key, generation_config)
+        
+        text = self.single_flight.do(flight_key, call)
+        return text, bool(called)
+    
+    def _call(self, prompt: str, cache_key: Optional[str], generation_config: Dict[str, Any]) -> str:
+        with tracing.span("llm.call"):
+            text = self.loop.run(self.client.generate(self.model, prompt, generation_config))
+        tracing.count_llm_tokens(self.client.count_tokens(prompt), self.client.count_tokens(text))
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+        return text
+    
+    def generate_stream(self, prompt: str, use_cache: bool = True) -> Iterator[str]:
+        """Yield the response text as Gemini streams it; cached responses arrive in one piece"""
+        cache_key, cached = self._cache_lookup(prompt, use_cache)
+        if cached is not None:
+            tracing.LLM_CACHE_HITS.inc()
+            yield cached
+            return
+        
+        parts = []
+        with tracing.span("llm.stream"):
+            for chunk in self.loop.iterate(self.client.stream(self.model, prompt, self.generation_config)):
+                parts.append(chunk)
+                yield chunk
+        tracing.count_llm_tokens(self.client.count_tokens(prompt), self.client.count_tokens("".join(parts)))
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, "".join(parts))
+    
+    def close(self):
+        """Close the HTTP connections and stop the background loop"""
+        if self._loop is not None:
+            self._loop.run(self.client.close())
+            self._loop.stop()
+            self._loop = None
 
 class SummarizationChain:
     """Multi-stage summarization pipeline"""
     
-    def __init__(self, gemini_api_key: str):
-        self.llm = GeminiLLM(api_key=gemini_api_key)
+    # analysis type -> (response key, generator method, prompt template)
+    SECTION_HANDLERS = {
+        "comprehensive": ("comprehensive_summary", "_generate_comprehensive_summary", "get_comprehensive_summary_prompt"),
+        "topics": ("topic_analysis", "_extract_topics", "get_topic_extraction_prompt"),
+        "actions": ("action_items", "_extract_action_items", "get_action_items_prompt"),
+        "sentiment": ("sentiment_analysis", "_analyze_sentiment", "get_sentiment_analysis_prompt"),
+    }
+    # Appended to partial summaries cut to fit the final prompt
+    TRUNCATION_MARKER = " [Summary truncated to fit the final prompt]"
+    # Shape of the single-call answer for "all" (see get_combined_analysis_prompt),
+    # in the OpenAPI subset Gemini's responseSchema takes (upper-case type names)
+    COMBINED_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {key: {"type": "STRING"} for key, _, _ in SECTION_HANDLERS.values()},
+        "required": [key for key, _, _ in SECTION_HANDLERS.values()]
+    }
+    
+    def __init__(self, gemini_api_key: str, max_concurrency: int = 4, parallel_sections: bool = True,
+                 response_cache: Optional[LLMResponseCache] = None, token_budget: Optional[TokenBudget] = None,
+                 max_reduce_levels: int = 5, llm_client: Optional[AsyncLLMClient] = None,
+                 combined_sections: bool = False, summary_store: Optional[ChunkSummaryStore] = None,
+                 incremental_chunk_tokens: int = 1500):
+        self.llm = GeminiLLM(api_key=gemini_api_key, cache=response_cache, client=llm_client)
         self.templates = MeetingPromptTemplates()
+        # Upper bound on simultaneous LLM calls during the map stage
+        self.max_concurrency = max(1, max_concurrency)
+        # Send the section prompts of "all" at once instead of one after another
+        self.parallel_sections = parallel_sections
+        # Answer "all" with one JSON prompt instead of one call per section (per-section calls on parse failure)
+        self.combined_sections = combined_sections
+        # Map-reduce budgets (tokens): text handed to the final analysis, and to each reduce call
+        self.token_budget = token_budget or TokenBudget(max_output_tokens=self.llm.max_output_tokens)
+        final_templates = self.templates.get_section_prompts()
+        if combined_sections:
+            final_templates.append(self.templates.get_combined_analysis_prompt())
+        self.final_input_tokens = self.token_budget.content_budget(final_templates)
+        self.reduce_batch_tokens = self.token_budget.content_budget([self.templates.get_reduce_summaries_prompt()])
+        self.max_reduce_levels = max_reduce_levels
+        # Chunk and reduce summaries by content hash, reused when a transcript is resubmitted
+        self.summary_store = summary_store
+        self.incremental_chunk_tokens = incremental_chunk_tokens
     
-    def process_transcript(self, transcript: str, analysis_type: str = "comprehensive") -> Dict[str, Any]:
+    def process_transcript(self, transcript: str, analysis_type: str = "comprehensive", use_cache: bool = True) -> Dict[str, Any]:
         """
         Process transcript through the summarization pipeline
         
@@ -53,6 +171,7 @@ class SummarizationChain:
                 - "actions": Action items only
                 - "sentiment": Sentiment analysis only
                 - "all": All types of analysis
+            use_cache: Set to False to bypass the LLM response cache
         """
         
         try:
@@ -62,19 +181,34 @@ class SummarizationChain:
                 "input_length": len(transcript),
                 "word_count": len(transcript.split())
             }
+            calls = 0
             
-            if analysis_type == "comprehensive" or analysis_type == "all":
-                results["comprehensive_summary"] = self._generate_comprehensive_summary(transcript)
-            
-            if analysis_type == "topics" or analysis_type == "all":
-                results["topic_analysis"] = self._extract_topics(transcript)
+            if analysis_type == "all" and self.combined_sections:
+                calls += 1
+                try:
+                    results.update(self._run_section("combined", self._generate_combined, transcript, use_cache))
+                    results["combined"] = True
+                    results["llm_calls"] = {"map": 0, "reduce": 0, "final": calls, "total": calls}
+                    return results
+                except ValueError as e:
+                    # Malformed or incomplete JSON: fall back to one call per section
+                    results["combined"] = False
+                    results["combined_error"] = str(e)
             
-            if analysis_type == "actions" or analysis_type == "all":
-                results["action_items"] = self._extract_action_items(transcript)
+            sections = [
+                (key, getattr(self, method))
+                for section, (key, method, _) in self.SECTION_HANDLERS.items()
+                if analysis_type == section or analysis_type == "all"
+            ]
+            calls += len(sections)
             
-            if analysis_type == "sentiment" or analysis_type == "all":
-                results["sentiment_analysis"] = self._analyze_sentiment(transcript)
+            if self.parallel_sections and len(sections) > 1:
+                self._run_sections_parallel(transcript, sections, results, use_cache)
+            else:
+                for key, handler in sections:
+                    results[key] = self._run_section(key, handler, transcript, use_cache)
             
+            results["llm_calls"] = {"map": 0, "reduce": 0, "final": calls, "total": calls}
             return results
             
         except Exception as e:
@@ -84,32 +218,203 @@ class SummarizationChain:
                 "analysis_type": analysis_type
             }
     
-    def process_chunks(self, chunks: List[Dict], analysis_type: str = "comprehensive") -> Dict[str, Any]:
+    def stream_transcript(self, transcript: str, analysis_type: str = "comprehensive",
+                          use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the analysis as events while Gemini generates it.
+        
+        Yields dicts with an "event" field:
+            - "section_start" / "section_end": a section began / finished
+            - "token": partial text for a section
+            - "section_error": a section failed (the others continue)
+            - "done": final event with timing, including time_to_first_token
+        Sections of "all" are streamed concurrently and their events interleave.
+        """
+        start_time = time.time()
+        sections = [
+            (key, self._format_prompt(getattr(self.templates, template)(), transcript=transcript))
+            for section, (key, _, template) in self.SECTION_HANDLERS.items()
+            if analysis_type == section or analysis_type == "all"
+        ]
+        events = queue.Queue()
+        
+        def run_section(key: str, prompt: str):
+            events.put({"event": "section_start", "section": key})
+            try:
+                for text in self.llm.generate_stream(prompt, use_cache):
+                    events.put({"event": "token", "section": key, "text": text})
+                events.put({"event": "section_end", "section": key})
+            except Exception as e:
+                events.put({"event": "section_error", "section": key, "error": str(e)})
+        
+        first_token_time = None
+        section_errors = {}
+        workers = len(sections) if self.parallel_sections else 1
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="section-stream") as executor:
+            for key, prompt in sections:
+                executor.submit(tracing.in_context(run_section), key, prompt)
+            
+            finished = 0
+            while finished < len(sections):
+                event = events.get()
+                if event["event"] == "token" and first_token_time is None:
+                    first_token_time = time.time()
+                elif event["event"] in ("section_end", "section_error"):
+                    finished += 1
+                    if event["event"] == "section_error":
+                        section_errors[event["section"]] = event["error"]
+                yield event
+        
+        yield {
+            "event": "done",
+            "success": not sections or len(section_errors) < len(sections),
+            "analysis_type": analysis_type,
+            "input_length": len(transcript),
+            "word_count": len(transcript.split()),
+            "time_to_first_token": round(first_token_time - start_time, 2) if first_token_time else None,
+            "section_errors": section_errors
+        }
+    
+    def process_chunks(self, chunks: List[Dict], analysis_type: str = "comprehensive", use_cache: bool = True,
+                       text: Optional[str] = None) -> Dict[str, Any]:
         """
-        Process multiple text chunks and combine results
+        Process multiple text chunks and combine results with hierarchical map-reduce
+        
+        Documents that fit the final prompt's token budget are analyzed in one pass. Longer ones are
+        summarized chunk by chunk (map), the partial summaries are packed into batches
+        and merged level by level (reduce) until they fit, and the final analysis runs
+        on the merged summaries. No part of the transcript is dropped.
+        
+        Chunks either carry their "content" or are (start, end) offsets into `text`,
+        as produced by DocumentProcessor; offset chunks are sliced only for this call.
         """
         try:
-            # For long documents, process chunks separately and then combine
-            if len(chunks) == 1:
-                return self.process_transcript(chunks[0]["content"], analysis_type)
+            if text is not None:
+                chunks = [
+                    chunk if "content" in chunk else {**chunk, "content": text[chunk["start"]:chunk["end"]]}
+                    for chunk in chunks
+                ]
+            combined_text = "\n\n".join([chunk["content"] for chunk in chunks])
+            final_calls = self._section_count(analysis_type)
             
-            # Process each chunk
-            chunk_results = []
-            for i, chunk in enumerate(chunks):
-                chunk_result = self.process_transcript(chunk["content"], "topics")
-                chunk_result["chunk_index"] = i
-                chunk_results.append(chunk_result)
+            # For short documents, analyze the full text directly
+            if len(chunks) == 1 or self.token_budget.count(combined_text) <= self.final_input_tokens:
+                final_result = self.process_transcript(combined_text, analysis_type, use_cache)
+                final_result["chunk_results"] = []
+                final_result["total_chunks"] = len(chunks)
+                final_result["reduce_levels"] = 0
+                final_result.setdefault("llm_calls", {"map": 0, "reduce": 0, "final": final_calls, "total": final_calls})
+                return final_result
             
-            # Combine all chunks for final comprehensive analysis
-            combined_text = "\n\n".join([chunk["content"] for chunk in chunks])
+            # Map: summarize chunks concurrently; map() keeps results in chunk order
+            workers = min(self.max_concurrency, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-map") as executor:
+                chunk_results = list(executor.map(
+                    tracing.in_context(self.summarize_chunk), range(len(chunks)), chunks, [use_cache] * len(chunks)
+                ))
+            
+            return self.reduce_chunk_results(chunk_results, analysis_type, use_cache)
             
-            # Limit combined text to avoid token limits
-            if len(combined_text) > 15000:  # Rough token limit
-                combined_text = combined_text[:15000] + "\n\n[Content truncated for processing]"
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "analysis_type": analysis_type
+            }
+    
+    def summarize_incremental(self, transcript: str, analysis_type: str = "comprehensive",
+                              use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Map-reduce over content-defined chunks, for transcripts that are resubmitted
+        after an edit or an appended section. Chunks whose summary is already in the
+        summary store skip the map stage, unchanged reduce batches skip the reduce
+        stage, and the result reports chunks_reused / chunks_recomputed.
+        """
+        try:
+            chunks = [
+                {"content": content}
+                for content in stable_chunks(transcript, self.incremental_chunk_tokens, self.token_budget.count)
+            ]
+            if len(chunks) <= 1:
+                # Fits one chunk: a map call would only add a summary of the whole text
+                final_calls = self._section_count(analysis_type)
+                final_result = self.process_transcript(transcript, analysis_type, use_cache)
+                final_result.update({
+                    "chunk_results": [], "total_chunks": len(chunks), "chunks_reused": 0,
+                    "chunks_recomputed": 0, "reduce_levels": 0
+                })
+                final_result.setdefault("llm_calls", {"map": 0, "reduce": 0, "final": final_calls, "total": final_calls})
+                return final_result
+            workers = max(1, min(self.max_concurrency, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-map") as executor:
+                chunk_results = list(executor.map(
+                    tracing.in_context(self.summarize_chunk), range(len(chunks)), chunks, [use_cache] * len(chunks)
+                ))
+            return self.reduce_chunk_results(chunk_results, analysis_type, use_cache)
             
-            final_result = self.process_transcript(combined_text, analysis_type)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "analysis_type": analysis_type
+            }
+    
+    def reduce_chunk_results(self, chunk_results: List[Dict], analysis_type: str = "comprehensive",
+                             use_cache: bool = True, tail: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Reduce and final stages for chunk summaries that are already computed,
+        e.g. by a pipeline that summarizes chunks while transcription is still running.
+        tail is text that has not filled a chunk yet (a live meeting's latest
+        words); it joins the partials as is, without a map call of its own.
+        """
+        try:
+            # Reduce: merge partial summaries until they fit the final prompt (failed chunks are left out)
+            partials = [chunk_result["summary"] for chunk_result in chunk_results if chunk_result["success"]]
+            failed = [chunk_result for chunk_result in chunk_results if not chunk_result["success"]]
+            if tail:
+                partials.append(tail)
+            if not partials:
+                return {
+                    "success": False,
+                    "error": (f"All {len(chunk_results)} chunks failed to summarize: {failed[0].get('error')}"
+                              if failed else "Nothing to summarize"),
+                    "analysis_type": analysis_type,
+                    "chunk_results": chunk_results
+                }
+            reduce_calls = 0
+            reduce_levels = 0
+            while (self.token_budget.count(self._join_partials(partials)) > self.final_input_tokens
+                   and reduce_levels < self.max_reduce_levels):
+                batches = self._pack_batches(partials)
+                if len(batches) >= len(partials):
+                    break  # every summary already fills a batch on its own
+                workers = min(self.max_concurrency, len(batches))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reduce") as executor:
+                    reduced = list(executor.map(tracing.in_context(self._reduce_batch), batches, [use_cache] * len(batches)))
+                partials = [summary for summary, _ in reduced]
+                reduce_calls += sum(1 for _, called in reduced if called)
+                reduce_levels += 1
+            
+            # Reduction stopped short (level limit, or batches no longer shrink): cut the partials to fit
+            partials, truncated = self._fit_partials(partials)
+            
+            final_result = self.process_transcript(self._join_partials(partials), analysis_type, use_cache)
+            final_calls = final_result.get("llm_calls", {}).get("final", self._section_count(analysis_type))
+            succeeded = [chunk_result for chunk_result in chunk_results if chunk_result["success"]]
+            map_calls = sum(1 for chunk_result in succeeded if not chunk_result.get("reused"))
             final_result["chunk_results"] = chunk_results
-            final_result["total_chunks"] = len(chunks)
+            final_result["total_chunks"] = len(chunk_results)
+            final_result["chunks_reused"] = len(succeeded) - map_calls
+            final_result["chunks_recomputed"] = map_calls
+            final_result["chunks_failed"] = len(failed)
+            final_result["reduce_levels"] = reduce_levels
+            final_result["partials_truncated"] = truncated
+            final_result["llm_calls"] = {
+                "map": map_calls,
+                "reduce": reduce_calls,
+                "final": final_calls,
+                "total": map_calls + reduce_calls + final_calls
+            }
             
             return final_result
             
@@ -120,26 +425,198 @@ class SummarizationChain:
                 "analysis_type": analysis_type
             }
     
-    def _generate_comprehensive_summary(self, transcript: str) -> str:
+    def _section_count(self, analysis_type: str) -> int:
+        """Number of LLM calls process_transcript makes for an analysis type"""
+        if analysis_type == "all" and self.combined_sections:
+            return 1
+        return sum(1 for section in self.SECTION_HANDLERS if analysis_type == section or analysis_type == "all")
+    
+    def _join_partials(self, partials: List[str]) -> str:
+        """Combine partial summaries into the text handed to the next stage"""
+        return "\n\n".join(
+            f"[Part {index + 1} of {len(partials)}]\n{partial}" for index, partial in enumerate(partials)
+        )
+    
+    def _fit_partials(self, partials: List[str]) -> Tuple[List[str], int]:
+        """
+        Partial summaries cut to an equal share of the final prompt's budget when
+        together they are still over it; returns (partials, number truncated)
+        """
+        if self.token_budget.count(self._join_partials(partials)) <= self.final_input_tokens:
+            return partials, 0
+        overhead = self.token_budget.count(self._join_partials([self.TRUNCATION_MARKER] * len(partials)))
+        share = max(1, (self.final_input_tokens - overhead) // len(partials))
+        while True:
+            fitted = []
+            truncated = 0
+            for partial in partials:
+                tokens = self.token_budget.count(partial)
+                if tokens > share:
+                    partial = partial[:len(partial) * share // tokens].rstrip() + self.TRUNCATION_MARKER
+                    truncated += 1
+                fitted.append(partial)
+            if self.token_budget.count(self._join_partials(fitted)) <= self.final_input_tokens:
+                return fitted, truncated
+            if share == 1:
+                raise ValueError(
+                    f"{len(partials)} partial summaries do not fit the final prompt even when truncated; "
+                    f"raise max_reduce_levels or the model's context window"
+                )
+            share = max(1, share * 9 // 10)
+    
+    def _pack_batches(self, partials: List[str]) -> List[List[str]]:
+        """Greedily pack consecutive partial summaries into batches of at most reduce_batch_tokens"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for partial in partials:
+            tokens = self.token_budget.count(partial)
+            if current and current_tokens + tokens > self.reduce_batch_tokens:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(partial)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _reduce_batch(self, batch: List[str], use_cache: bool = True) -> Tuple[str, bool]:
+        """Merge a batch of consecutive partial summaries into one; returns (summary, LLM was called)"""
+        if len(batch) == 1:
+            return batch[0], False
+        with tracing.span("reduce.batch", summaries=len(batch)):
+            prompt = self._format_prompt(self.templates.get_reduce_summaries_prompt(), summaries=self._join_partials(batch))
+            return self._generate_stored(prompt, use_cache)
+    
+    def _generate_stored(self, prompt: str, use_cache: bool = True) -> Tuple[str, bool]:
+        """
+        Generate through the summary store, if there is one: the key is the full prompt
+        (template + content) with the model settings. Returns (text, LLM was called).
+        """
+        if self.summary_store is None:
+            return self._generate(prompt, use_cache)
+        key = ChunkSummaryStore.make_key(prompt, getattr(self.llm, "model", None), getattr(self.llm, "generation_config", None))
+        stored = self.summary_store.get(key) if use_cache else None
+        if stored is not None:
+            return stored, False
+        text, called = self._generate(prompt, use_cache)
+        self.summary_store.put(key, text)
+        return text, called
+    
+    def _generate(self, prompt: str, use_cache: bool = True) -> Tuple[str, bool]:
+        """(text, an LLM request was sent); response-cache hits and coalesced calls are not counted"""
+        generate_with_status = getattr(self.llm, "generate_with_status", None)
+        if generate_with_status is None:
+            return self.llm.generate(prompt, use_cache), True
+        return generate_with_status(prompt, use_cache)
+    
+    def _format_prompt(self, template: str, **values: str) -> str:
+        with tracing.span("prompt.format"):
+            return template.format(**values)
+    
+    def _run_section(self, key: str, handler, transcript: str, use_cache: bool = True) -> str:
+        with tracing.span(f"section.{key}"):
+            return handler(transcript, use_cache)
+    
+    def _run_sections_parallel(self, transcript: str, sections: List, results: Dict[str, Any], use_cache: bool = True):
+        """
+        Run independent analysis sections concurrently.
+        A failing section is reported in "section_errors" without discarding the others.
+        """
+        with ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix="section") as executor:
+            futures = {
+                key: executor.submit(tracing.in_context(self._run_section), key, handler, transcript, use_cache)
+                for key, handler in sections
+            }
+        
+        errors = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+        
+        if errors:
+            results["section_errors"] = errors
+            if len(errors) == len(sections):
+                results["success"] = False
+                results["error"] = "; ".join(f"{key}: {error}" for key, error in errors.items())
+    
+    def summarize_chunk(self, index: int, chunk: Dict, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Summarize a single chunk for the map stage and record its latency.
+        A failed chunk is reported with its error instead of aborting the whole run.
+        """
+        start_time = time.time()
+        try:
+            with tracing.span("map.chunk", chunk=index):
+                prompt = self._format_prompt(self.templates.get_chunk_summary_prompt(), transcript=chunk["content"])
+                summary, called = self._generate_stored(prompt, use_cache)
+        except Exception as e:
+            return {
+                "success": False,
+                "chunk_index": index,
+                "error": str(e),
+                "input_length": len(chunk["content"]),
+                "latency": round(time.time() - start_time, 2)
+            }
+        return {
+            "success": True,
+            "chunk_index": index,
+            "summary": summary,
+            "reused": not called,
+            "input_length": len(chunk["content"]),
+            "latency": round(time.time() - start_time, 2)
+        }
+    
+    def _generate_combined(self, transcript: str, use_cache: bool = True) -> Dict[str, str]:
+        """All sections of "all" from one prompt; raises ValueError if the answer is not valid"""
+        prompt = self._format_prompt(self.templates.get_combined_analysis_prompt(), transcript=transcript)
+        return self._parse_combined(self.llm.generate(prompt, use_cache, json_schema=self.COMBINED_SCHEMA))
+    
+    @staticmethod
+    def _parse_combined(text: str) -> Dict[str, str]:
+        """Validate the combined JSON answer into the SummaryResponse section fields"""
+        text = text.strip()
+        if text.startswith("```"):
+            # Models sometimes wrap JSON in a code fence despite the instructions
+            text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end < start:
+            raise ValueError("No JSON object in the combined response")
+        data = json.loads(text[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("The combined response is not a JSON object")
+        for key, value in data.items():
+            if isinstance(value, list):
+                data[key] = "\n".join(f"- {item}" for item in value)
+        sections = dict(CombinedAnalysis(**data))
+        empty = [key for key, value in sections.items() if not value.strip()]
+        if empty:
+            raise ValueError(f"Empty sections in the combined response: {', '.join(empty)}")
+        return sections
+    
+    def _generate_comprehensive_summary(self, transcript: str, use_cache: bool = True) -> str:
         """Generate comprehensive structured summary"""
-        prompt = self.templates.get_comprehensive_summary_prompt().format(transcript=transcript)
-        return self.llm.generate(prompt)
+        prompt = self._format_prompt(self.templates.get_comprehensive_summary_prompt(), transcript=transcript)
+        return self.llm.generate(prompt, use_cache)
     
-    def _extract_topics(self, transcript: str) -> str:
+    def _extract_topics(self, transcript: str, use_cache: bool = True) -> str:
         """Extract key topics from transcript"""
-        prompt = self.templates.get_topic_extraction_prompt().format(transcript=transcript)
-        return self.llm.generate(prompt)
+        prompt = self._format_prompt(self.templates.get_topic_extraction_prompt(), transcript=transcript)
+        return self.llm.generate(prompt, use_cache)
     
-    def _extract_action_items(self, transcript: str) -> str:
+    def _extract_action_items(self, transcript: str, use_cache: bool = True) -> str:
         """Extract action items from transcript"""
-        prompt = self.templates.get_action_items_prompt().format(transcript=transcript)
-        return self.llm.generate(prompt)
+        prompt = self._format_prompt(self.templates.get_action_items_prompt(), transcript=transcript)
+        return self.llm.generate(prompt, use_cache)
     
-    def _analyze_sentiment(self, transcript: str) -> str:
+    def _analyze_sentiment(self, transcript: str, use_cache: bool = True) -> str:
         """Analyze sentiment and tone of transcript"""
-        prompt = self.templates.get_sentiment_analysis_prompt().format(transcript=transcript)
-        return self.llm.generate(prompt)
+        prompt = self._format_prompt(self.templates.get_sentiment_analysis_prompt(), transcript=transcript)
+        return self.llm.generate(prompt, use_cache)
     
     def get_summary_types(self) -> List[str]:
         """Return available summary types"""
-        return ["comprehensive", "topics", "actions", "sentiment", "all"]
+        return list(ANALYSIS_TYPES)
@@ -0,0 +1,144 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Sentence ends and blank lines; chunk boundaries only fall between these units
+_UNIT_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+def stable_chunks(text: str, target_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    Content-defined chunking: a chunk may end after a sentence whose hash has
+    its low bits clear (once it holds half the target) and must end at 1.5x the
+    target. Boundaries depend only on the nearby sentences, so an edit or an
+    appended section changes the chunks around it and leaves the others as
+    they were (fixed-size splitting would shift every later chunk).
+
+    A unit larger than the target (unpunctuated text, e.g. a raw transcript)
+    is first cut at word boundaries into pieces of at most target_tokens, so
+    no chunk can outgrow the map prompt.
+    """
+    units = [
+        piece
+        for unit in _UNIT_BOUNDARY.split(text) if unit and unit.strip()
+        for piece in _split_oversized(unit.strip(), target_tokens, count_tokens)
+    ]
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = count_tokens(unit)
+        if current and current_tokens + tokens > target_tokens * 1.5:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+        anchor = int(hashlib.sha1(unit.encode("utf-8")).hexdigest()[:8], 16) % 4 == 0
+        if anchor and current_tokens >= target_tokens / 2:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def _split_oversized(unit: str, target_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    Cuts a unit over target_tokens at word boundaries, content-defined like
+    the chunks: after a word pair whose hash has its low bits clear (once the
+    piece holds half the target), and always before the target is exceeded.
+    """
+    if count_tokens(unit) <= target_tokens:
+        return [unit]
+    pieces = []
+    current: List[str] = []
+    current_tokens = 0
+    previous = ""
+    for word in unit.split():
+        # Counted with its separator, so the sum never underestimates the joined piece
+        tokens = count_tokens(word + " ")
+        if tokens > target_tokens:
+            # A single "word" over the target (no whitespace at all): cut it by characters
+            step = max(1, len(word) * target_tokens // (tokens + 1))
+            parts = [word[offset:offset + step] for offset in range(0, len(word), step)]
+        else:
+            parts = [word]
+        for part in parts:
+            part_tokens = tokens if len(parts) == 1 else count_tokens(part + " ")
+            if current and current_tokens + part_tokens > target_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+            anchor = int(hashlib.sha1(f"{previous} {part}".encode("utf-8")).hexdigest()[:8], 16) % 64 == 0
+            previous = part
+            if anchor and current_tokens >= target_tokens / 2:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+class ChunkSummaryStore:
+    """
+    Chunk-level summaries keyed by a hash of the chunk content and everything
+    that shapes the summary (model, prompt template, generation config).
+
+    Unlike the LLM response cache there is no TTL: a chunk summary stays valid
+    as long as its inputs are the same. The least recently used entries beyond
+    max_entries are dropped. Without db_path the store lives in memory only.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stored": 0}
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ":memory:", timeout=30, check_same_thread=False)
+        with self._conn:
+            if db_path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries "
+                "(key TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def make_key(content: str, *settings: Any) -> str:
+        digest = hashlib.sha256()
+        for setting in settings:
+            digest.update(repr(setting).encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._counters["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, summary: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)", (key, summary, time.time()))
+            self._counters["stored"] += 1
+            # Trimming scans the table, so it only runs every 100 writes
+            if self._counters["stored"] % 100 == 0:
+                self._conn.execute(
+                    "DELETE FROM summaries WHERE key NOT IN "
+                    "(SELECT key FROM summaries ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            return {**self._counters, "entries": entries, "max_entries": self.max_entries}
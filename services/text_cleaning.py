@@ -0,0 +1,106 @@
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+DEFAULT_FILLERS = ("um", "uh")
+# Only fillers when followed by a comma ("you know, the plan" vs "you know the plan")
+DEFAULT_COMMA_FILLERS = ("you know",)
+DEFAULT_PUNCTUATION = ",.!?;:"
+
+class TextCleaner:
+    """
+    Transcript cleaning in one regex pass.
+
+    All rules are branches of a single compiled pattern, so the text is
+    scanned once and copied once. Every branch starts at a whitespace
+    character, which lets the regex engine skip straight from one whitespace
+    to the next. The replacement callback only runs where something changes,
+    not once per word:
+
+    - fillers are removed as whole words, case-insensitively, together with a
+      following comma and the whitespace before them (bare "um"/"uh" too, not
+      only "um,"/"uh,");
+    - comma fillers are removed only when followed by a comma;
+    - whitespace before punctuation is dropped;
+    - any other whitespace run becomes one space;
+    - punctuation left at the start by leading fillers ("Um um. Yes") goes too.
+    """
+
+    def __init__(self, fillers: Sequence[str] = DEFAULT_FILLERS, comma_fillers: Sequence[str] = DEFAULT_COMMA_FILLERS,
+                 punctuation: str = DEFAULT_PUNCTUATION):
+        self.fillers = tuple(fillers)
+        self.comma_fillers = tuple(comma_fillers)
+        self.punctuation = punctuation
+
+        fillers_branches = []
+        # Whole words only: not "umbrella" or "uh-huh"
+        if self.fillers:
+            fillers_branches.append(rf"(?i:{self._phrases(self.fillers)})(?![\w-]),?")
+        if self.comma_fillers:
+            fillers_branches.append(rf"(?i:{self._phrases(self.comma_fillers)}),")
+        removals = list(fillers_branches)
+        if punctuation:
+            removals.append(rf"(?=[{re.escape(punctuation)}])")
+
+        # A single space is left alone; "  " or a line break becomes one space
+        space = r"(?P<space>(?<= )\s+|(?<! )\s*)"
+        if removals:
+            self._pattern = re.compile(rf"\s(?:\s*(?:{'|'.join(removals)})|{space})")
+        else:
+            self._pattern = re.compile(rf"\s{space}")
+        # Fillers at the very start have no whitespace before them
+        self._leading = re.compile(rf"(?:\s*(?:{'|'.join(fillers_branches)}))+") if fillers_branches else None
+        # ...nor should the punctuation that followed them be left in front
+        self._leading_punctuation = re.compile(rf"[\s{re.escape(punctuation)}]*") if punctuation else None
+
+    @staticmethod
+    def _phrases(phrases: Sequence[str]) -> str:
+        # Longest phrases first, so "uh huh" wins over "uh"
+        ordered = sorted({phrase.strip().lower() for phrase in phrases if phrase.strip()}, key=len, reverse=True)
+        return "|".join(r"\s+".join(re.escape(word) for word in phrase.split()) for phrase in ordered)
+
+    @classmethod
+    def from_env(cls) -> "TextCleaner":
+        """FILLER_WORDS / COMMA_FILLERS: comma-separated lists ("" disables that rule)"""
+        fillers = os.getenv("FILLER_WORDS", ",".join(DEFAULT_FILLERS))
+        comma_fillers = os.getenv("COMMA_FILLERS", ",".join(DEFAULT_COMMA_FILLERS))
+        return cls(
+            fillers=[phrase for phrase in fillers.split(",") if phrase.strip()],
+            comma_fillers=[phrase for phrase in comma_fillers.split(",") if phrase.strip()]
+        )
+
+    def settings(self) -> Dict[str, Any]:
+        """Rule set as plain data, for cache keys"""
+        return {"fillers": sorted(self.fillers), "comma_fillers": sorted(self.comma_fillers), "punctuation": self.punctuation}
+
+    @staticmethod
+    def _replace(match: "re.Match") -> str:
+        return " " if match.group("space") is not None else ""
+
+    def clean(self, text: str) -> str:
+        if self._leading is not None:
+            match = self._leading.match(text)
+            if match:
+                text = text[match.end():]
+                if self._leading_punctuation is not None:
+                    text = text[self._leading_punctuation.match(text).end():]
+        return self._pattern.sub(self._replace, text).strip()
+
+    def clean_segments(self, segments: Iterable[str]) -> Iterator[str]:
+        """
+        Clean text that arrives piece by piece (e.g. Whisper segments while
+        transcription is still running). "".join() of the output equals clean()
+        of the space-joined input, except for a multi-word filler split
+        between two pieces and the punctuation after fillers that start a
+        piece ("We agreed." + "Um. Next" gives "We agreed. Next").
+        """
+        return self.join_cleaned(self.clean(segment) for segment in segments)
+
+    def join_cleaned(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Separators for pieces that are already cleaned; no space before leading punctuation"""
+        first = True
+        for piece in pieces:
+            if not piece:
+                continue
+            yield piece if first or piece[0] in self.punctuation else " " + piece
+            first = False
@@ -0,0 +1,66 @@
+import math
+import re
+from typing import Iterable
+
+# Gemini Pro accepts 30720 input tokens and returns at most 2048
+DEFAULT_CONTEXT_WINDOW = 30720
+DEFAULT_MAX_OUTPUT_TOKENS = 2000
+
+_WORD_OR_SYMBOL = re.compile(r"\w+|[^\w\s]")
+
+class TokenBudget:
+    """
+    Local token estimator and prompt budget for the LLM context window.
+
+    The estimate is the larger of a characters-per-token ratio and a word/punctuation
+    count, so counting needs no network round-trip. The ratio can be re-fitted
+    against the real tokenizer with calibrate().
+    """
+
+    def __init__(self, context_window: int = DEFAULT_CONTEXT_WINDOW,
+                 max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+                 chars_per_token: float = 4.0, safety_margin: float = 0.1):
+        self.context_window = context_window
+        self.max_output_tokens = max_output_tokens
+        self.chars_per_token = chars_per_token
+        self.safety_margin = safety_margin
+
+    def count(self, text: str) -> int:
+        """Estimated token count of text"""
+        if not text:
+            return 0
+        by_chars = len(text) / self.chars_per_token
+        # Every word and punctuation mark costs at least one token
+        by_words = len(_WORD_OR_SYMBOL.findall(text))
+        return math.ceil(max(by_chars, by_words))
+
+    def input_budget(self) -> int:
+        """Tokens available for a whole prompt after reserving output and a safety margin"""
+        usable = self.context_window * (1 - self.safety_margin)
+        return int(usable) - self.max_output_tokens
+
+    def template_overhead(self, templates: Iterable) -> int:
+        """Largest token count among prompt templates rendered with empty inputs"""
+        overhead = 0
+        for template in templates:
+            empty = {name: "" for name in template.input_variables}
+            overhead = max(overhead, self.count(template.format(**empty)))
+        return overhead
+
+    def content_budget(self, templates: Iterable) -> int:
+        """Tokens of content that fit into any of the templates together with the template text"""
+        return max(1, self.input_budget() - self.template_overhead(templates))
+
+    def calibrate(self, samples: Iterable[str], count_tokens) -> float:
+        """
+        Fit chars_per_token against a real tokenizer (e.g. GenerativeModel.count_tokens)
+        using representative text samples, and return the new ratio.
+        """
+        total_chars = 0
+        total_tokens = 0
+        for sample in samples:
+            total_chars += len(sample)
+            total_tokens += count_tokens(sample)
+        if total_tokens:
+            self.chars_per_token = total_chars / total_tokens
+        return self.chars_per_token
@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from services.metrics import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "meeting_stage_seconds", "Duration of pipeline stages (extraction, cleaning, prompts, LLM calls)", ["stage"]
+)
+LLM_TOKENS = REGISTRY.counter("meeting_llm_tokens_total", "Estimated LLM tokens sent and received", ["direction"])
+LLM_CACHE_HITS = REGISTRY.counter("meeting_llm_cache_hits_total", "LLM prompts answered from the response cache")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "meeting_http_request_seconds", "HTTP request duration until the response starts", ["method", "route", "status"]
+)
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+class Trace:
+    """
+    Timings of one request (or one worker task): every span and counter
+    recorded while the trace is current. Spans may run in several threads at
+    once, so stage totals can add up to more than the wall-clock time.
+    """
+
+    # Spans kept individually for the breakdown; beyond this only the totals grow
+    MAX_SPANS = 200
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float, start: Optional[float] = None, **attributes: Any):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += seconds
+            if len(self.spans) < self.MAX_SPANS:
+                offset = (start - self.start) if start is not None else None
+                self.spans.append({
+                    "name": name,
+                    "start": round(offset, 4) if offset is not None else None,
+                    "seconds": round(seconds, 4),
+                    **attributes
+                })
+
+    def count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Total seconds per stage; what worker processes send back with their result"""
+        with self._lock:
+            return {name: stage["seconds"] for name, stage in self.stages.items()}
+
+    def breakdown(self, include_spans: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            breakdown = {
+                "total_seconds": round(time.perf_counter() - self.start, 4),
+                "stages": {
+                    name: {"count": stage["count"], "seconds": round(stage["seconds"], 4)}
+                    for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"])
+                },
+                "counters": dict(self.counters)
+            }
+            if include_spans:
+                breakdown["spans"] = list(self.spans)
+        return breakdown
+
+    def server_timing(self) -> str:
+        """Stage totals as a Server-Timing header value (shown by browser dev tools)"""
+        with self._lock:
+            return ", ".join(
+                f"{name.replace(' ', '_')};dur={stage['seconds'] * 1000:.1f}" for name, stage in self.stages.items()
+            )
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Make a new Trace current for the code inside the block (and the tasks it starts)"""
+    new_trace = Trace()
+    token = _current.set(new_trace)
+    try:
+        yield new_trace
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Time a stage: observed in the stage histogram and added to the current trace, if any"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage=name)
+        active = _current.get()
+        if active is not None:
+            active.add_span(name, seconds, start, **attributes)
+
+def record_stages(stages: Optional[Dict[str, float]]):
+    """Stage timings measured elsewhere (a worker process) into the histogram and the current trace"""
+    active = _current.get()
+    for name, seconds in (stages or {}).items():
+        STAGE_SECONDS.observe(seconds, stage=name)
+        if active is not None:
+            active.add_span(name, seconds)
+
+def count(name: str, amount: float = 1):
+    active = _current.get()
+    if active is not None:
+        active.count(name, amount)
+
+def count_llm_tokens(prompt_tokens: int, output_tokens: int):
+    LLM_TOKENS.inc(prompt_tokens, direction="prompt")
+    LLM_TOKENS.inc(output_tokens, direction="output")
+    count("llm_calls")
+    count("llm_prompt_tokens", prompt_tokens)
+    count("llm_output_tokens", output_tokens)
+
+def in_context(func: Callable) -> Callable:
+    """
+    func bound to the caller's trace, for thread pools: executor threads do
+    not inherit context variables, so spans recorded there would be lost.
+    """
+    active = _current.get()
+    if active is None:
+        return func
+
+    def run(*args, **kwargs):
+        token = _current.set(active)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
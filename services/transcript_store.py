@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+class TranscriptStore:
+    """
+    Server-side copies of extracted transcripts, so clients can refer to one
+    by ID instead of posting the text back for every analysis.
+
+    An entry holds the cleaned transcript once, its chunks as (start, end)
+    offsets into it, and the extraction metadata. The ID is a hash of the
+    text, so uploading the same recording twice stores it once. With db_path
+    the entries live in SQLite, survive restarts and are shared by every
+    worker on the host; without it the store is in memory only.
+
+    Retention: entries expire ttl_seconds after they were last stored, and
+    the least recently used ones are dropped once there are more than
+    max_entries or the texts add up to more than max_bytes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024,
+                 max_entries: int = 10000, ttl_seconds: float = 24 * 3600):
+        self.max_bytes = max_bytes
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ":memory:", timeout=30, check_same_thread=False)
+        with self._conn:
+            if db_path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts "
+                "(id TEXT PRIMARY KEY, text TEXT NOT NULL, chunks TEXT NOT NULL, metadata TEXT NOT NULL, "
+                "size INTEGER NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def make_id(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    def put(self, text: str, chunks: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        transcript_id = self.make_id(text)
+        # Offsets only: a chunk's text is text[start:end]
+        chunks_json = json.dumps([{key: value for key, value in chunk.items() if key != "content"} for chunk in chunks])
+        metadata_json = json.dumps(metadata or {}, default=str)
+        now = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE transcripts SET chunks = ?, metadata = ?, expires_at = ?, last_used = ? WHERE id = ?",
+                (chunks_json, metadata_json, now + self.ttl_seconds, now, transcript_id)
+            ).rowcount
+            if not updated:
+                # The same text is only written once
+                self._conn.execute(
+                    "INSERT INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (transcript_id, text, chunks_json, metadata_json, len(text.encode("utf-8")),
+                     now + self.ttl_seconds, now)
+                )
+            self._counters["stored"] += 1
+            self._evict(transcript_id)
+        return transcript_id
+
+    def get(self, transcript_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, chunks, metadata, expires_at FROM transcripts WHERE id = ? AND expires_at > ?",
+                (transcript_id, now)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE transcripts SET last_used = ? WHERE id = ?", (now, transcript_id))
+            self._counters["hits"] += 1
+        return {
+            "transcript_id": transcript_id,
+            "text": row[0],
+            "chunks": json.loads(row[1]),
+            "metadata": json.loads(row[2]),
+            "expires_at": row[3]
+        }
+
+    def delete(self, transcript_id: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM transcripts WHERE id = ?", (transcript_id,)).rowcount > 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+            return {
+                **self._counters,
+                "entries": entries,
+                "bytes": size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+    def _evict(self, keep: str):
+        self._counters["evictions"] += self._conn.execute(
+            "DELETE FROM transcripts WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        # Least recently used first; the entry just stored stays even if it alone is larger than max_bytes
+        dropped = []
+        for transcript_id, entry_size in self._conn.execute(
+            "SELECT id, size FROM transcripts WHERE id != ? ORDER BY last_used", (keep,)
+        ).fetchall():
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            dropped.append((transcript_id,))
+            entries -= 1
+            size -= entry_size
+        self._conn.executemany("DELETE FROM transcripts WHERE id = ?", dropped)
+        self._counters["evictions"] += len(dropped)
@@ -1,4 +1,5 @@
 let currentTranscript = "";
+let currentTranscriptId = null;
 let currentFileData = null;
 
 document.getElementById("transcribe-btn").addEventListener("click", async function () {
@@ -13,12 +14,19 @@ document.getElementById("transcribe-btn").addEventListener("click", async functi
   document.getElementById("status").innerText = "⏳ Processing file...";
 
   try {
-    const response = await fetch("/upload", {
+    const response = await fetch("/jobs", {
       method: "POST",
       body: formData
     });
 
-    const data = await response.json();
+    const job = await response.json();
+
+    if (job.error) {
+      document.getElementById("status").innerText = `❌ ${job.error}`;
+      return;
+    }
+
+    const data = await waitForJob(job.status_url);
 
     if (data.error) {
       document.getElementById("status").innerText = `❌ ${data.error}`;
@@ -26,6 +34,7 @@ document.getElementById("transcribe-btn").addEventListener("click", async functi
     }
 
     currentTranscript = data.transcript;
+    currentTranscriptId = data.transcript_id || null;
     currentFileData = data;
     
     // Display enhanced status with file info
@@ -44,54 +53,128 @@ document.getElementById("transcribe-btn").addEventListener("click", async functi
   }
 });
 
+function requestSummary(body) {
+  if (!body.transcript_id) {
+    delete body.transcript_id;
+    body.transcript = body.transcript || currentTranscript;
+  }
+  return fetch("/summarize/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body)
+  });
+}
+
+async function waitForJob(statusUrl) {
+  // Poll the job until it finishes, showing its progress in the status bar
+  while (true) {
+    const response = await fetch(statusUrl);
+    const job = await response.json();
+
+    if (job.state === "completed") return job.result;
+    if (job.state === "failed" || job.error) return { error: job.error || "Processing failed" };
+
+    document.getElementById("status").innerText = `⏳ ${job.status.message} (${job.status.progress}%)`;
+    await new Promise(resolve => setTimeout(resolve, 1000));
+  }
+}
+
 document.getElementById("summarize-btn").addEventListener("click", async function () {
   if (!currentTranscript) return;
 
   const analysisType = document.getElementById("analysis-type").value;
   document.getElementById("status").innerText = `📝 Analyzing (${analysisType})...`;
 
-  try {
-    const response = await fetch("/summarize", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ 
-        transcript: currentTranscript,
-        analysis_type: analysisType
-      })
-    });
+  const requestStart = performance.now();
+  let firstTokenReceived = false;
+  const data = { section_errors: {} };
 
-    const data = await response.json();
+  try {
+    // The server keeps the transcript from the upload; only its ID is sent back
+    let response = await requestSummary({ transcript_id: currentTranscriptId, analysis_type: analysisType });
+    if (response.status === 404) {
+      // Stored transcript expired: fall back to posting the text
+      currentTranscriptId = null;
+      response = await requestSummary({ transcript: currentTranscript, analysis_type: analysisType });
+    }
 
-    if (data.error) {
-      document.getElementById("status").innerText = `❌ ${data.error}`;
+    if (!response.ok) {
+      const error = await response.json();
+      document.getElementById("status").innerText = `❌ ${error.error}`;
       return;
     }
 
-    // Display processing info
-    const processingInfo = `✅ Analysis complete! Processing time: ${data.processing_time}s | Words: ${data.word_count}`;
-    document.getElementById("status").innerText = processingInfo;
-
-    // Display results based on analysis type
-    displayAnalysisResults(data, analysisType);
+    // Render empty sections first and fill them in as tokens arrive
+    renderAnalysisLayout(analysisType);
     document.getElementById("summary-section").style.display = "block";
 
+    await readEventStream(response, (event, payload) => {
+      if (event === "token") {
+        if (!firstTokenReceived) {
+          firstTokenReceived = true;
+          const firstToken = ((performance.now() - requestStart) / 1000).toFixed(2);
+          document.getElementById("status").innerText = `✍️ Receiving analysis... first token after ${firstToken}s`;
+        }
+        data[payload.section] = (data[payload.section] || "") + payload.text;
+        renderSection(payload.section, data[payload.section]);
+      } else if (event === "section_error") {
+        data.section_errors[payload.section] = payload.error;
+        renderSection(payload.section, sectionError(data, payload.section));
+      } else if (event === "done") {
+        // Display processing info
+        const processingInfo = payload.success
+          ? `✅ Analysis complete! Processing time: ${payload.processing_time}s | First token: ${payload.time_to_first_token}s | Words: ${payload.word_count}`
+          : `❌ Analysis failed: ${Object.values(payload.section_errors).join("; ")}`;
+        document.getElementById("status").innerText = processingInfo;
+      } else if (event === "error") {
+        document.getElementById("status").innerText = `❌ ${payload.error}`;
+      }
+    });
+
   } catch (error) {
     document.getElementById("status").innerText = `❌ Error: ${error.message}`;
   }
 });
 
-function displayAnalysisResults(data, analysisType) {
+async function readEventStream(response, onEvent) {
+  // Minimal Server-Sent Events parser for a fetch() response body
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let payload = "";
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) payload += line.slice(6);
+      }
+      if (payload) onEvent(event, JSON.parse(payload));
+    }
+  }
+}
+
+function renderAnalysisLayout(analysisType) {
   const summaryDiv = document.getElementById("summary");
   let content = "";
 
   if (analysisType === "comprehensive") {
-    content = marked.parse(data.comprehensive_summary || data.summary);
+    content = `<div id="section-comprehensive_summary"></div>`;
   } else if (analysisType === "topics") {
-    content = `<h3>📋 Topic Analysis</h3>${marked.parse(data.topic_analysis)}`;
+    content = `<h3>📋 Topic Analysis</h3><div id="section-topic_analysis"></div>`;
   } else if (analysisType === "actions") {
-    content = `<h3>✅ Action Items</h3>${marked.parse(data.action_items)}`;
+    content = `<h3>✅ Action Items</h3><div id="section-action_items"></div>`;
   } else if (analysisType === "sentiment") {
-    content = `<h3>😊 Sentiment Analysis</h3>${marked.parse(data.sentiment_analysis)}`;
+    content = `<h3>😊 Sentiment Analysis</h3><div id="section-sentiment_analysis"></div>`;
   } else if (analysisType === "all") {
     content = `
       <div class="analysis-tabs">
@@ -102,16 +185,16 @@ function displayAnalysisResults(data, analysisType) {
           <button class="tab-btn" onclick="showTab('sentiment')">😊 Sentiment</button>
         </div>
         <div id="comprehensive" class="tab-content active">
-          ${marked.parse(data.comprehensive_summary || "")}
+          <div id="section-comprehensive_summary"></div>
         </div>
         <div id="topics" class="tab-content">
-          ${marked.parse(data.topic_analysis || "")}
+          <div id="section-topic_analysis"></div>
         </div>
         <div id="actions" class="tab-content">
-          ${marked.parse(data.action_items || "")}
+          <div id="section-action_items"></div>
         </div>
         <div id="sentiment" class="tab-content">
-          ${marked.parse(data.sentiment_analysis || "")}
+          <div id="section-sentiment_analysis"></div>
         </div>
       </div>
     `;
@@ -120,6 +203,16 @@ function displayAnalysisResults(data, analysisType) {
   summaryDiv.innerHTML = content;
 }
 
+function renderSection(key, markdown) {
+  const element = document.getElementById(`section-${key}`);
+  if (element) element.innerHTML = marked.parse(markdown || "");
+}
+
+function sectionError(data, key) {
+  const errors = data.section_errors || {};
+  return errors[key] ? `❌ This section could not be generated: ${errors[key]}` : "";
+}
+
 function showTab(tabName) {
   // Hide all tab contents
   const tabContents = document.querySelectorAll('.tab-content');
@@ -3,10 +3,31 @@
 Simple test script to verify the enhanced meeting summarizer works
 """
 
+import json
 import os
 import sys
+from functools import wraps
 from pathlib import Path
 
+def checked(test):
+    """
+    Tests return True/False for main() below, but pytest only sees a failure when
+    one raises: turn a False into an AssertionError so `pytest test_app.py` works too.
+    """
+    @wraps(test)
+    def run():
+        assert test(), f"{test.__name__} failed"
+        return True
+    return run
+
+def skipped(reason: str) -> bool:
+    """A test whose optional dependency is missing: a skip under pytest, a pass with a warning in main()"""
+    print(f"⚠️  {reason}, skipped")
+    if "pytest" in sys.modules:
+        import pytest
+        pytest.skip(reason)
+    return True
+
 def test_imports():
     """Test if all imports work correctly"""
     try:
@@ -138,6 +159,1365 @@ def test_summarization():
         print(f"❌ Summarization error: {e}")
         return False
 
+@checked
+def test_concurrent_chunk_map():
+    """Test that chunk analysis runs concurrently and keeps chunk order"""
+    try:
+        print("Testing concurrent chunk map stage...")
+        import time
+        from services.summarization_chain import SummarizationChain
+        
+        class SlowLLM:
+            def generate(self, prompt, use_cache=True):
+                time.sleep(0.2)
+                return prompt[-20:]
+        
+        chain = SummarizationChain(gemini_api_key="test-key", max_concurrency=4)
+        chain.llm = SlowLLM()
+        chain.final_input_tokens = 100  # force the map stage; the four partial summaries still fit
+        chunks = [{"content": f"Chunk number {i} of the meeting. " + "discussion " * 50} for i in range(4)]
+        
+        start_time = time.time()
+        result = chain.process_chunks(chunks, "topics")
+        elapsed = time.time() - start_time
+        
+        indexes = [r["chunk_index"] for r in result["chunk_results"]]
+        if result["success"] and indexes == [0, 1, 2, 3] and elapsed < 0.8:
+            print(f"✅ Chunk map stage ran concurrently in {elapsed:.2f}s")
+            return True
+        else:
+            print(f"❌ Chunk map stage was not concurrent ({elapsed:.2f}s, order {indexes})")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Concurrent chunk map error: {e}")
+        return False
+
+@checked
+def test_parallel_all_sections():
+    """Test that "all" runs sections in parallel and survives a failing section"""
+    try:
+        print("Testing parallel analysis sections...")
+        import time
+        from services.summarization_chain import SummarizationChain
+        
+        class FlakyLLM:
+            def generate(self, prompt, use_cache=True):
+                time.sleep(0.2)
+                if "sentiment" in prompt:
+                    raise Exception("Gemini API error: quota exceeded")
+                return "ok"
+        
+        chain = SummarizationChain(gemini_api_key="test-key")
+        chain.llm = FlakyLLM()
+        
+        start_time = time.time()
+        result = chain.process_transcript("We agreed to ship on Friday.", "all")
+        elapsed = time.time() - start_time
+        
+        sections_ok = all(result.get(key) == "ok" for key in ["comprehensive_summary", "topic_analysis", "action_items"])
+        if result["success"] and sections_ok and "sentiment_analysis" in result["section_errors"] and elapsed < 0.6:
+            print(f"✅ Parallel sections completed in {elapsed:.2f}s with one reported failure")
+            return True
+        else:
+            print(f"❌ Parallel sections failed ({elapsed:.2f}s): {result}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Parallel sections error: {e}")
+        return False
+
+@checked
+def test_job_queue():
+    """Test background job submission, progress reporting, lease-based recovery and retention"""
+    try:
+        print("Testing job queue...")
+        import asyncio
+        import tempfile
+        from services.job_queue import JobQueue, JobStore
+        
+        import time
+        
+        class SlowStore(JobStore):
+            """A database held by another process: every write waits"""
+            def update(self, *args, **kwargs):
+                time.sleep(0.1)
+                return super().update(*args, **kwargs)
+        
+        async def handler(job, report):
+            report("extracting", "Working", 40)
+            report("extracting", "Working", 50)
+            return {"filename": job["filename"]}
+        
+        async def run(db_path):
+            store = SlowStore(db_path)
+            # A job left unfinished by a process that died, and one held by a worker that is still alive
+            leftover = store.create("old.txt", "uploads/old.txt", {}, owner="dead-worker")
+            store._conn.execute("UPDATE jobs SET heartbeat = 0 WHERE id = ?", (leftover,))
+            running_elsewhere = store.create("busy.txt", "uploads/busy.txt", {}, owner="live-worker")
+            # A finished job past the retention period
+            expired = store.create("done.txt", "uploads/done.txt", {})
+            store.update(expired, "completed", "completed", "Processing complete", 100, result={"transcript": "x"})
+            store._conn.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00' WHERE id = ?", (expired,))
+            store._conn.commit()
+            
+            queue = JobQueue(store, handler, concurrency=2, max_depth=10, lease_seconds=30, retention_seconds=3600)
+            await queue.start()
+            
+            # Slow store writes must not stall the event loop
+            stalls = []
+            async def watch_loop():
+                while True:
+                    before = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    stalls.append(time.perf_counter() - before)
+            watcher = asyncio.create_task(watch_loop())
+            job_id = await queue.submit("meeting.txt", "uploads/meeting.txt", {"summarize": False})
+            await queue._queue.join()
+            watcher.cancel()
+            await queue.stop()
+            return (store.get(job_id), store.get(leftover), store.get(running_elsewhere), store.get(expired),
+                    max(stalls))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            job, leftover, running_elsewhere, expired, stall = asyncio.run(run(os.path.join(tmp, "jobs.db")))
+        
+        status = JobStore.to_status(job)
+        if (job["state"] == "completed" and status.progress == 100 and leftover["state"] == "completed"
+                and running_elsewhere["state"] == "queued" and running_elsewhere["owner"] == "live-worker"
+                and expired is None and stall < 0.08):
+            print("✅ Job queue processed new and expired-lease jobs, left a live worker's job alone")
+            return True
+        else:
+            print(f"❌ Unexpected job state: {job}, {leftover}, {running_elsewhere}, {expired}, "
+                  f"loop stalled {stall:.2f}s")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Job queue error: {e}")
+        return False
+
+@checked
+def test_extraction_cache():
+    """Test content-addressed extraction cache hits, misses and LRU eviction"""
+    try:
+        print("Testing extraction cache...")
+        import tempfile
+        from services.extraction_cache import ExtractionCache, hash_file
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ExtractionCache(os.path.join(tmp, "cache"), max_bytes=300)
+            source = os.path.join(tmp, "meeting.txt")
+            with open(source, "w") as f:
+                f.write("Budget review with John and Sarah.")
+            
+            key = cache.make_key(hash_file(source), {"chunk_size": 2000})
+            other_key = cache.make_key(hash_file(source), {"chunk_size": 1000})
+            
+            miss = cache.get(key)
+            cache.put(key, {"cleaned_transcript": "x" * 100, "metadata": {}})
+            hit = cache.get(key)
+            settings_miss = cache.get(other_key)
+            
+            # Touch the first entry, then overflow the cache so the second one is evicted
+            cache.put(other_key, {"cleaned_transcript": "y" * 100, "metadata": {}})
+            cache.get(key)
+            cache.put(cache.make_key("another file", {}), {"cleaned_transcript": "z" * 100, "metadata": {}})
+            stats = cache.stats()
+            evicted = cache.get(other_key) is None and cache.get(key) is not None
+        
+        if miss is None and hit is not None and settings_miss is None and evicted and stats["evictions"] == 1:
+            print(f"✅ Extraction cache working! Stats: {stats}")
+            return True
+        else:
+            print(f"❌ Unexpected extraction cache behaviour: {stats}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Extraction cache error: {e}")
+        return False
+
+@checked
+def test_llm_response_cache():
+    """Test LLM response cache tiers, TTL and LRU size limit"""
+    try:
+        print("Testing LLM response cache...")
+        import tempfile
+        import time
+        from services.llm_cache import LLMResponseCache
+        
+        config = {"temperature": 0.7, "max_output_tokens": 2000}
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "llm_cache.db")
+            cache = LLMResponseCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+            keys = [cache.make_key("gemini-pro", config, f"prompt {i}") for i in range(3)]
+            for i, key in enumerate(keys):
+                cache.put(key, f"response {i}")
+            
+            # The oldest entry fell out of memory but is still on disk
+            disk_hit = cache.get(keys[0])
+            memory_hit = cache.get(keys[2])
+            different_config = cache.get(cache.make_key("gemini-pro", {"temperature": 0.2}, "prompt 0"))
+            
+            # A fresh process sees the disk tier; a zero TTL cache never hits
+            restarted = LLMResponseCache(db_path=db_path).get(keys[1])
+            expiring = LLMResponseCache(ttl_seconds=0)
+            expiring.put(keys[0], "stale")
+            time.sleep(0.01)
+            expired = expiring.get(keys[0])
+            stats = cache.stats()
+            
+            # The disk tier is trimmed to disk_max_entries every 100 writes, not on each one
+            bounded = LLMResponseCache(db_path=os.path.join(tmp, "bounded.db"), disk_max_entries=50)
+            for i in range(250):
+                bounded.put(bounded.make_key("gemini-pro", config, f"bulk {i}"), f"response {i}")
+            disk_entries = bounded.stats()["disk_entries"]
+        
+        if (disk_hit == "response 0" and memory_hit == "response 2" and different_config is None
+                and restarted == "response 1" and expired is None and stats["memory_entries"] == 2
+                and disk_entries == 100):
+            print(f"✅ LLM response cache working! Stats: {stats}")
+            return True
+        else:
+            print(f"❌ Unexpected LLM response cache behaviour: {stats}, {disk_entries} bounded disk entries")
+            return False
+            
+    except Exception as e:
+        print(f"❌ LLM response cache error: {e}")
+        return False
+
+@checked
+def test_streaming_summary():
+    """Test that streamed sections arrive as token events followed by a done event"""
+    try:
+        print("Testing streaming summarization...")
+        from services.summarization_chain import SummarizationChain
+        
+        class StreamingLLM:
+            def generate_stream(self, prompt, use_cache=True):
+                if "sentiment" in prompt:
+                    raise Exception("Gemini API error: blocked")
+                yield "Part one. "
+                yield "Part two."
+        
+        chain = SummarizationChain(gemini_api_key="test-key")
+        chain.llm = StreamingLLM()
+        events = list(chain.stream_transcript("We agreed to ship on Friday.", "all"))
+        
+        texts = {}
+        for event in events:
+            if event["event"] == "token":
+                texts[event["section"]] = texts.get(event["section"], "") + event["text"]
+        done = events[-1]
+        
+        if (done["event"] == "done" and done["success"] and done["time_to_first_token"] is not None
+                and texts.get("topic_analysis") == "Part one. Part two."
+                and "sentiment_analysis" in done["section_errors"]):
+            print(f"✅ Streaming produced {len(events)} events, first token after {done['time_to_first_token']}s")
+            return True
+        else:
+            print(f"❌ Unexpected streaming events: {events}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Streaming summarization error: {e}")
+        return False
+
+@checked
+def test_streaming_ingestion():
+    """Test chunked upload ingestion: hashing, unique paths, the size limit, I/O off the loop and cleanup"""
+    try:
+        print("Testing streaming upload ingestion...")
+        import asyncio
+        import hashlib
+        import tempfile
+        from services.ingestion import UploadIngestor, UploadTooLargeError, remove_upload
+        
+        payload = [b"Meeting notes. " * 1000, b"Action items follow."]
+        offloaded = []
+        
+        async def body():
+            for chunk in payload:
+                yield chunk
+        
+        async def run_io(func, *args):
+            offloaded.append(getattr(func, "__name__", str(func)))
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        
+        async def run(upload_dir):
+            ingestor = UploadIngestor(upload_dir, max_bytes=20000, run_io=run_io)
+            upload = await ingestor.ingest(body(), "../../etc/meeting.txt")
+            try:
+                await UploadIngestor(upload_dir, max_bytes=1000).ingest(body(), "big.txt")
+                rejected = False
+            except UploadTooLargeError:
+                rejected = True
+            return upload, rejected, sorted(os.listdir(upload_dir))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            upload, rejected, files = asyncio.run(run(tmp))
+            inside = os.path.dirname(upload["filepath"]) == tmp
+            Path(upload["filepath"]).with_suffix(".pcm").write_bytes(b"\0\0")
+            remove_upload(upload["filepath"])
+            left_over = os.listdir(tmp)
+        
+        expected_hash = hashlib.sha256(b"".join(payload)).hexdigest()
+        if (upload["content_hash"] == expected_hash and rejected and inside and len(files) == 1
+                and "_write_batch" in offloaded and not left_over):
+            print(f"✅ Ingested {upload['size']} bytes to {os.path.basename(upload['filepath'])}")
+            return True
+        else:
+            print(f"❌ Unexpected ingestion result: {upload}, rejected={rejected}, files={files}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Streaming ingestion error: {e}")
+        return False
+
+@checked
+def test_hierarchical_map_reduce():
+    """Test that long documents are reduced level by level without truncation, and survive failed chunks"""
+    try:
+        print("Testing hierarchical map-reduce...")
+        import threading
+        from services.llm_cache import LLMResponseCache
+        from services.llm_client import AsyncLLMClient, StubBackend
+        from services.summarization_chain import GeminiLLM, SummarizationChain
+        
+        class RecordingLLM:
+            def __init__(self, failing=None):
+                self.prompts = []
+                self.failing = failing
+                self.lock = threading.Lock()
+            
+            def generate(self, prompt, use_cache=True):
+                if self.failing and self.failing in prompt and "[Part" not in prompt:
+                    raise Exception("Gemini API error: 429 after retries")
+                with self.lock:
+                    self.prompts.append(prompt)
+                return "Summary " + "x" * 300
+        
+        chain = SummarizationChain(gemini_api_key="test-key")
+        chain.llm = RecordingLLM()
+        chain.final_input_tokens = 500
+        chain.reduce_batch_tokens = 375
+        chunks = [{"content": f"Section {i}: " + "discussion " * 200} for i in range(40)]
+        result = chain.process_chunks(chunks, "comprehensive")
+        
+        every_chunk_seen = all(
+            any(f"Section {i}:" in prompt for prompt in chain.llm.prompts) for i in range(40)
+        )
+        final_prompt = chain.llm.prompts[-1]
+        recorded_calls = len(chain.llm.prompts)
+        calls = result.get("llm_calls", {})
+        
+        # One chunk fails: it is reported and the others are still reduced
+        chain.llm = RecordingLLM(failing="Section 7:")
+        partial_run = chain.process_chunks(chunks, "comprehensive")
+        failed_chunk = partial_run["chunk_results"][7]
+        
+        # Reduction capped before it fits: the partials are cut to the final prompt's budget
+        chain.llm = RecordingLLM()
+        chain.max_reduce_levels = 1
+        capped = chain.process_chunks(chunks, "comprehensive")
+        chain.max_reduce_levels = 5
+        capped_prompt = chain.llm.prompts[-1]
+        
+        # Response-cache hits are not counted as map calls
+        chain.llm = GeminiLLM(api_key="test", cache=LLMResponseCache(),
+                              client=AsyncLLMClient(StubBackend(base_latency=0, seconds_per_token=0)))
+        chain.process_chunks(chunks[:6], "comprehensive")
+        repeated = chain.process_chunks(chunks[:6], "comprehensive")
+        chain.llm.close()
+        
+        if (result["success"] and every_chunk_seen and result["reduce_levels"] >= 2
+                and calls["total"] == recorded_calls and "[Content truncated" not in final_prompt
+                and partial_run["success"] and partial_run["chunks_failed"] == 1
+                and not failed_chunk["success"] and "429" in failed_chunk["error"]
+                and capped["success"] and capped["partials_truncated"] > 0
+                and chain.token_budget.count(capped_prompt) <= chain.final_input_tokens + 400
+                and repeated["llm_calls"]["map"] == 0 and repeated["chunks_reused"] == 6):
+            print(f"✅ Map-reduce covered 40 chunks with {calls['total']} calls over {result['reduce_levels']} levels")
+            return True
+        else:
+            print(f"❌ Unexpected map-reduce result: {calls}, levels={result.get('reduce_levels')}, "
+                  f"failed run {partial_run.get('chunks_failed')}, truncated {capped.get('partials_truncated')}, "
+                  f"repeated map calls {repeated.get('llm_calls')}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Map-reduce error: {e}")
+        return False
+
+@checked
+def test_token_budget_chunking():
+    """Test that token-budget chunks plus any prompt template fit the model window"""
+    try:
+        print("Testing token-budget chunking...")
+        from services.document_processor import DocumentProcessor
+        from services.prompt_templates import MeetingPromptTemplates
+        from services.token_budget import TokenBudget
+        
+        budget = TokenBudget(context_window=4000, max_output_tokens=500)
+        processor = DocumentProcessor(chunking="tokens", token_budget=budget)
+        text = " ".join(f"Speaker {i % 3} raised point number {i} about the roadmap." for i in range(3000))
+        chunks = processor._split_text(text)
+        
+        templates = MeetingPromptTemplates.get_section_prompts() + [MeetingPromptTemplates.get_chunk_summary_prompt()]
+        largest_prompt = max(
+            budget.count(template.format(transcript=text[chunk["start"]:chunk["end"]]))
+            for chunk in chunks for template in templates
+        )
+        
+        if len(chunks) > 1 and largest_prompt <= budget.input_budget():
+            print(f"✅ {len(chunks)} chunks, largest prompt {largest_prompt}/{budget.input_budget()} tokens")
+            return True
+        else:
+            print(f"❌ Prompt of {largest_prompt} tokens exceeds budget {budget.input_budget()}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Token-budget chunking error: {e}")
+        return False
+
+@checked
+def test_streaming_transcription():
+    """Test window stitching across overlaps and early chunk release"""
+    try:
+        print("Testing streaming transcription...")
+        from services.document_processor import DocumentProcessor
+        from services.streaming_transcription import IncrementalChunker, SegmentStitcher, plan_windows
+        
+        windows = plan_windows(70, window_seconds=30, overlap_seconds=4)
+        stitcher = SegmentStitcher(windows)
+        # The segment at 25-27s is heard by both of the first two windows
+        first = stitcher.add(0, [
+            {"start": 0.0, "end": 12.0, "text": "Welcome everyone."},
+            {"start": 25.0, "end": 27.0, "text": "Let's review the budget."},
+            {"start": 27.0, "end": 27.9, "text": "Okay."},
+            {"start": 28.0, "end": 30.0, "text": "First the"}
+        ])
+        second = stitcher.add(1, [
+            {"start": 25.0, "end": 27.0, "text": "Let's review the budget."},
+            # Same word as the previous window's last segment, timestamps jittered across the cut
+            {"start": 27.1, "end": 28.0, "text": "Okay."},
+            {"start": 28.0, "end": 31.0, "text": "First the marketing line."},
+            # Said twice, at different times: both are kept
+            {"start": 40.0, "end": 41.0, "text": "Yes."},
+            {"start": 41.5, "end": 42.5, "text": "Yes."}
+        ])
+        texts = [segment["text"] for segment in first + second]
+        
+        import tempfile
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_processor = DocumentProcessor(cache_dir=cache_dir)
+            pipeline_keys = {
+                cached_processor.cache_key("meeting.wav", "same-bytes", "base", pipeline)
+                for pipeline in ("file", "streaming")
+            }
+        
+        processor = DocumentProcessor()
+        
+        chunker = IncrementalChunker(processor)
+        early = []
+        for i in range(400):
+            early.extend(chunker.add(f"Sentence {i} about the quarterly plan."))
+        rest = chunker.finish()
+        
+        if (windows[-1][1] == 70 and texts.count("Let's review the budget.") == 1
+                and texts.count("Okay.") == 1 and texts.count("Yes.") == 2
+                and "First the" not in texts and early and rest and len(pipeline_keys) == 2):
+            print(f"✅ {len(windows)} windows stitched, {len(early)} chunks released before the end")
+            return True
+        else:
+            print(f"❌ Unexpected stitching or chunking: {texts}, early={len(early)}, rest={len(rest)}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Streaming transcription error: {e}")
+        return False
+
+@checked
+def test_parallel_transcription():
+    """Test that segments are cut at pauses and merged back in order"""
+    try:
+        print("Testing parallel transcription planning...")
+        import array
+        import tempfile
+        from services.parallel_transcription import merge_segment_results, plan_silence_segments
+        
+        # 130 s of loud audio with 0.6 s pauses starting at 58 s and 118 s
+        samples = array.array("h", [8000, -8000] * (130 * 8000))
+        for pause in (58.0, 118.0):
+            first = int(pause * 16000)
+            samples[first:first + 9600] = array.array("h", [0] * 9600)
+        with tempfile.NamedTemporaryFile(suffix=".pcm", delete=False) as pcm:
+            samples.tofile(pcm)
+        segments = plan_silence_segments(pcm.name, segment_seconds=60, search_seconds=5)
+        os.unlink(pcm.name)
+        
+        # Results arrive per segment; timestamps are already absolute
+        merged = merge_segment_results([
+            {"language": "en", "segments": [{"start": 0.0, "end": 4.0, "text": "Good morning."}]},
+            {"language": "en", "segments": [{"start": 58.5, "end": 61.0, "text": "Next item."}]},
+            {"language": "de", "segments": []}
+        ])
+        
+        cuts = [end for _, end in segments[:-1]]
+        if (len(segments) == 3 and all(pause <= cut <= pause + 0.6 for cut, pause in zip(cuts, (58.0, 118.0)))
+                and merged["text"] == "Good morning. Next item." and merged["language"] == "en"):
+            print(f"✅ Cut at pauses {[round(cut, 2) for cut in cuts]}, merged transcript in order")
+            return True
+        else:
+            print(f"❌ Unexpected segments {segments} or merge {merged}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Parallel transcription error: {e}")
+        return False
+
+@checked
+def test_model_registry():
+    """Test that a model is loaded once for concurrent callers and its metrics are published"""
+    try:
+        print("Testing model registry...")
+        import tempfile
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        import subprocess
+        from services.model_registry import ModelRegistry, read_model_metrics, remove_dead_worker_metrics
+        
+        loads = []
+        def loader(name):
+            loads.append(name)
+            time.sleep(0.05)
+            return {"name": name}
+        
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            registry = ModelRegistry(loader, lambda model: None, metrics_path=os.path.join(metrics_dir, "worker-1.json"))
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                models = list(executor.map(registry.get, ["base"] * 8))
+            registry.warm_up("tiny")
+            metrics = read_model_metrics(metrics_dir)
+            
+            # A new pool only removes the files of exited processes, not those of other live servers
+            exited = subprocess.Popen([sys.executable, "-c", "pass"])
+            exited.wait()
+            for pid in (os.getpid(), exited.pid):
+                Path(metrics_dir, f"worker-{pid}.json").write_text("{}")
+            removed = remove_dead_worker_metrics(metrics_dir)
+            kept = sorted(path.name for path in Path(metrics_dir).glob("*.json"))
+        
+        published = metrics[0]["models"] if metrics else {}
+        if (sorted(loads) == ["base", "tiny"] and all(model is models[0] for model in models)
+                and published.get("base", {}).get("load_seconds", 0) >= 0.05
+                and published.get("tiny", {}).get("warmup_seconds") is not None
+                and removed == 1 and kept == sorted(["worker-1.json", f"worker-{os.getpid()}.json"])):
+            print(f"✅ Loaded once per model, metrics published for {sorted(published)}")
+            return True
+        else:
+            print(f"❌ Unexpected loads {loads}, metrics {metrics} or kept metrics files {kept}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Model registry error: {e}")
+        return False
+
+@checked
+def test_lazy_imports():
+    """Test that importing the services does not load Whisper, the Gemini SDK or the document loaders"""
+    try:
+        print("Testing lazy imports...")
+        import subprocess
+        from services.preload import PRELOAD_GROUPS, WORKER_PRELOAD_GROUPS, parse_preload_groups
+        
+        probe = (
+            "import sys; import services.document_processor, services.summarization_chain, services.executors; "
+            "print(','.join(m for m in ['whisper', 'torch', 'google.generativeai', 'pypdf', 'docx2txt'] if m in sys.modules))"
+        )
+        loaded = subprocess.run(
+            [sys.executable, "-c", probe], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        
+        try:
+            parse_preload_groups("audio,videos")
+            rejected = False
+        except ValueError:
+            rejected = True
+        
+        # Preloading keeps Whisper and the document loaders out of the API process
+        api_modules = {module for modules in PRELOAD_GROUPS.values() for module in modules}
+        worker_modules = {module for modules in WORKER_PRELOAD_GROUPS.values() for module in modules}
+        split = (not api_modules & {"whisper", "google.generativeai", "pypdf", "docx2txt"}
+                 and {"whisper", "pypdf", "docx2txt"} <= worker_modules and "httpx" in api_modules)
+        
+        if (not loaded and rejected and parse_preload_groups("all") == ["audio", "llm", "pdf", "docx"]
+                and split and set(WORKER_PRELOAD_GROUPS) == set(PRELOAD_GROUPS)):
+            print("✅ Heavy dependencies stay unloaded until used")
+            return True
+        else:
+            print(f"❌ Loaded at import: {loaded or '-'}, unknown group rejected: {rejected}, "
+                  f"API/worker preload split: {split}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Lazy import error: {e}")
+        return False
+
+@checked
+def test_broken_process_pool():
+    """Test that a process pool broken by a dead worker is replaced on the next call"""
+    try:
+        print("Testing broken process pool recovery...")
+        import asyncio
+        from concurrent.futures import Executor, Future
+        from concurrent.futures.process import BrokenProcessPool
+        from services.executors import ExecutionPools
+        
+        class FakePool(Executor):
+            """Fails every task like a pool whose worker was killed, or runs it inline"""
+            def __init__(self, broken):
+                self.broken = broken
+                self.shut_down = False
+            
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+                else:
+                    future.set_result(fn(*args, **kwargs))
+                return future
+            
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                self.shut_down = True
+        
+        class FakePools(ExecutionPools):
+            created = []
+            
+            @property
+            def cpu_pool(self):
+                if self._cpu_pool is None:
+                    # The first pool is broken, the replacement works
+                    self._cpu_pool = FakePool(broken=not self.created)
+                    self.created.append(self._cpu_pool)
+                return self._cpu_pool
+        
+        pools = FakePools(cpu_workers=1, model_metrics_dir=None)
+        
+        async def run():
+            outcomes = await asyncio.gather(pools.run_cpu(len, "abc"), pools.run_cpu(len, "abc"),
+                                            return_exceptions=True)
+            return outcomes, await pools.run_cpu(len, "abcd")
+        
+        outcomes, recovered = asyncio.run(run())
+        
+        if (all(isinstance(outcome, BrokenProcessPool) for outcome in outcomes) and recovered == 4
+                and len(FakePools.created) == 2 and FakePools.created[0].shut_down):
+            print("✅ Broken pool dropped and replaced, next task ran on the new pool")
+            return True
+        else:
+            print(f"❌ Outcomes {outcomes}, recovered {recovered}, pools created {len(FakePools.created)}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Broken process pool error: {e}")
+        return False
+
+@checked
+def test_async_llm_client():
+    """Test retries with backoff on rate limits, per-call timeouts and the request rate limiter"""
+    try:
+        print("Testing async LLM client...")
+        import asyncio
+        import time
+        from services.llm_client import (
+            AsyncLLMClient, BackgroundLoop, GeminiBackend, LLMTimeoutError, RateLimiter, RateLimitError, StubBackend
+        )
+        
+        class FlakyBackend(StubBackend):
+            """Answers 429 twice, then succeeds"""
+            async def generate(self, model, prompt, generation_config):
+                self.calls += 1
+                if self.calls <= 2:
+                    raise RateLimitError("rate limited")
+                return "ok"
+        
+        async def run():
+            config = {"max_output_tokens": 10}
+            flaky = AsyncLLMClient(FlakyBackend(), max_retries=3, base_delay=0.01)
+            text = await flaky.generate("stub", "hello", config)
+            
+            slow = AsyncLLMClient(StubBackend(base_latency=1.0), max_retries=1, base_delay=0.01, timeout=0.05)
+            try:
+                await slow.generate("stub", "hello", config)
+                timed_out = False
+            except LLMTimeoutError:
+                timed_out = True
+            
+            # 600 requests/minute = one every 0.1 s once the burst of 600 is used up
+            limited = AsyncLLMClient(StubBackend(base_latency=0), RateLimiter(requests_per_minute=600))
+            limited.limiter.requests._available = 0
+            start_time = time.perf_counter()
+            await asyncio.gather(*(limited.generate("stub", f"prompt {i}", config) for i in range(3)))
+            return text, flaky.stats, timed_out, slow.stats, time.perf_counter() - start_time
+        
+        text, flaky_stats, timed_out, slow_stats, limited_seconds = asyncio.run(run())
+        
+        # The same limiter keeps working after its loop is replaced (BackgroundLoop closed and restarted)
+        shared = RateLimiter(requests_per_minute=6000)
+        
+        async def burst():
+            await asyncio.gather(shared.acquire(10), shared.acquire(10))
+        
+        restarted = []
+        for _ in range(2):
+            loop = BackgroundLoop()
+            shared.requests._available = 0
+            loop.run(burst())
+            restarted.append(True)
+            loop.stop()
+        
+        # The API key travels in a header, never in the URL
+        backend = GeminiBackend(api_key="secret-key")
+        request = backend.http.build_request("POST", "https://example.invalid/models/x:generateContent")
+        key_in_header = request.headers.get("x-goog-api-key") == "secret-key" and "secret-key" not in str(request.url)
+        
+        if (text == "ok" and flaky_stats["retries"] == 2 and flaky_stats["rate_limited"] == 2
+                and timed_out and slow_stats["timeouts"] == 2 and limited_seconds >= 0.25
+                and len(restarted) == 2 and key_in_header):
+            print(f"✅ 2 retries after 429s, timeouts raised, 3 limited calls took {limited_seconds:.2f}s")
+            return True
+        else:
+            print(f"❌ Unexpected client behaviour: {text}, {flaky_stats}, {timed_out}, {slow_stats}, {limited_seconds:.2f}s")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Async LLM client error: {e}")
+        return False
+
+@checked
+def test_request_coalescing():
+    """Test that concurrent identical prompts share one upstream call"""
+    try:
+        print("Testing request coalescing...")
+        from concurrent.futures import ThreadPoolExecutor
+        from services.llm_client import AsyncLLMClient, StubBackend
+        from services.summarization_chain import GeminiLLM
+        
+        backend = StubBackend(base_latency=0.2, seconds_per_token=0)
+        llm = GeminiLLM(api_key="test", client=AsyncLLMClient(backend))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            answers = list(executor.map(llm.generate, ["Summarize: weekly sync"] * 8))
+        llm.generate("Summarize: retro")
+        llm.close()
+        
+        stats = llm.single_flight.stats()
+        if len(set(answers)) == 1 and backend.calls == 2 and stats["coalesced"] == 7 and stats["in_flight"] == 0:
+            print(f"✅ 9 requests, {backend.calls} upstream calls, {stats['coalesced']} coalesced")
+            return True
+        else:
+            print(f"❌ {backend.calls} upstream calls, stats {stats}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Request coalescing error: {e}")
+        return False
+
+@checked
+def test_combined_sections():
+    """Test the single JSON prompt for "all" and the fallback to section calls"""
+    try:
+        print("Testing combined sections...")
+        import json
+        from services.summarization_chain import SummarizationChain
+        
+        class JsonLLM:
+            def __init__(self, answer):
+                self.answer = answer
+                self.calls = 0
+            
+            def generate(self, prompt, use_cache=True, json_schema=None):
+                self.calls += 1
+                if json_schema is not None:
+                    return self.answer
+                return "Section result"
+        
+        sections = {
+            "comprehensive_summary": "## Summary\nBudget approved.",
+            "topic_analysis": ["Budget", "Hiring"],
+            "action_items": "- [ ] Send minutes - Assigned to: Ana",
+            "sentiment_analysis": "Collaborative"
+        }
+        chain = SummarizationChain(gemini_api_key="test", combined_sections=True)
+        chain.llm = JsonLLM("```json\n" + json.dumps(sections) + "\n```")
+        combined = chain.process_transcript("We approved the budget.", "all")
+        combined_calls = chain.llm.calls
+        
+        chain.llm = JsonLLM('{"comprehensive_summary": "cut off')
+        fallback = chain.process_transcript("We approved the budget.", "all")
+        
+        # Gemini's responseSchema takes upper-case OpenAPI type names
+        schema = SummarizationChain.COMBINED_SCHEMA
+        gemini_types = schema["type"] == "OBJECT" and all(
+            prop["type"] == "STRING" for prop in schema["properties"].values()
+        )
+        
+        if (combined.get("combined") and combined_calls == 1 and gemini_types and combined["topic_analysis"] == "- Budget\n- Hiring"
+                and fallback.get("combined") is False and chain.llm.calls == 5
+                and fallback["sentiment_analysis"] == "Section result" and fallback["llm_calls"]["final"] == 5):
+            print("✅ One call for all sections, per-section fallback on invalid JSON")
+            return True
+        else:
+            print(f"❌ Unexpected results: {combined}, {fallback}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Combined sections error: {e}")
+        return False
+
+@checked
+def test_incremental_summarization():
+    """Test that resubmitting an extended transcript only re-summarizes new chunks"""
+    try:
+        print("Testing incremental summarization...")
+        import threading
+        from services.summarization_chain import SummarizationChain
+        from services.summary_store import ChunkSummaryStore, stable_chunks
+        
+        class CountingLLM:
+            def __init__(self):
+                self.calls = 0
+                self._lock = threading.Lock()
+            
+            def generate(self, prompt, use_cache=True):
+                with self._lock:
+                    self.calls += 1
+                return f"Summary {hash(prompt) % 1000}."
+        
+        chain = SummarizationChain(
+            gemini_api_key="test", summary_store=ChunkSummaryStore(), incremental_chunk_tokens=60
+        )
+        chain.final_input_tokens = 10000
+        llm = chain.llm = CountingLLM()
+        
+        meeting = " ".join(f"Item {i}: the team reviewed topic {i} and agreed on next steps." for i in range(120))
+        first = chain.summarize_incremental(meeting, "comprehensive")
+        first_calls = llm.calls
+        
+        continued = meeting + " " + " ".join(f"Item {i}: a late addition about topic {i}." for i in range(120, 130))
+        second = chain.summarize_incremental(continued, "comprehensive")
+        second_calls = llm.calls - first_calls
+        
+        # Unpunctuated text has no sentence units; it must still be cut near the target, content-defined
+        import random
+        rng = random.Random(0)
+        words = ["budget", "roadmap", "hiring", "launch", "customer", "agreed", "review", "design", "we", "the"]
+        unpunctuated = " ".join(rng.choice(words) for _ in range(20000))
+        pieces = stable_chunks(unpunctuated, 500, chain.token_budget.count)
+        edited = stable_chunks("opening remarks " + unpunctuated, 500, chain.token_budget.count)
+        largest = max(chain.token_budget.count(piece) for piece in pieces)
+        shared = len(set(pieces) & set(edited))
+        
+        # A transcript that fits one chunk skips the map stage
+        before_short = llm.calls
+        short = chain.summarize_incremental("Quick sync. Nothing to report.", "comprehensive")
+        short_calls = llm.calls - before_short
+        
+        if (first["success"] and second["success"] and first["chunks_reused"] == 0
+                and second["chunks_reused"] >= first["total_chunks"] - 1
+                and second["chunks_recomputed"] <= 3 and second_calls < first_calls / 3
+                and largest <= 750 and shared >= 0.8 * len(pieces)
+                and short["success"] and short_calls == 1 and short["llm_calls"]["map"] == 0):
+            print(f"✅ Reused {second['chunks_reused']}/{second['total_chunks']} chunks, "
+                  f"{second_calls} calls vs {first_calls} for the first run")
+            return True
+        else:
+            print(f"❌ Reused {second.get('chunks_reused')}, recomputed {second.get('chunks_recomputed')}, "
+                  f"calls {second_calls} vs {first_calls}, largest unpunctuated chunk {largest} tokens, "
+                  f"short transcript {short_calls} calls")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Incremental summarization error: {e}")
+        return False
+
+@checked
+def test_live_session():
+    """Test that a live session stitches windows, bounds its audio buffer and summarizes incrementally"""
+    try:
+        print("Testing live meeting session...")
+        import asyncio
+        import threading
+        from services.document_processor import DocumentProcessor
+        from services.live_session import BYTES_PER_SECOND, LiveSession
+        from services.summarization_chain import SummarizationChain
+        from services.summary_store import ChunkSummaryStore
+        
+        class FakePools:
+            """A segment every 5 s of audio; overlapping windows hear the same segments"""
+            async def transcribe_pcm(self, pcm, start, whisper_model=None):
+                await asyncio.sleep(0.01)
+                end = start + len(pcm) / BYTES_PER_SECOND
+                first = int(-(-start // 5) * 5)
+                return {"language": "en", "segments": [
+                    {"start": t, "end": t + 2, "text": f"At second {t} the team discussed item {t} in detail. " * 4}
+                    for t in range(first, int(end), 5) if t + 2 <= end
+                ]}
+            
+            async def run_io(self, func, *args):
+                return await asyncio.to_thread(func, *args)
+        
+        class CountingLLM:
+            def __init__(self):
+                self.prompts = []
+                self._lock = threading.Lock()
+            
+            def generate(self, prompt, use_cache=True):
+                with self._lock:
+                    self.prompts.append(prompt)
+                return f"Summary {len(prompt)}."
+        
+        chain = SummarizationChain(gemini_api_key="test", summary_store=ChunkSummaryStore())
+        llm = chain.llm = CountingLLM()
+        messages = []
+        sending = {"active": False, "overlaps": 0}
+        async def emit(message):
+            # A socket write that yields; two tasks writing at once would overlap here
+            if sending["active"]:
+                sending["overlaps"] += 1
+            sending["active"] = True
+            await asyncio.sleep(0.001)
+            sending["active"] = False
+            messages.append(message)
+        
+        async def replay():
+            session = LiveSession(
+                FakePools(), DocumentProcessor(), chain, emit, window_seconds=30, overlap_seconds=2,
+                refresh_chunks=1, max_pending_seconds=30
+            )
+            peak = 0
+            for _ in range(360):
+                await session.feed(b"\0\0" * 8000)  # 0.5 s frames
+                peak = max(peak, len(session._audio))
+            await session.close()
+            # Transcription and refresh tasks send concurrently; frames must go out one at a time
+            await asyncio.gather(*(session.send({"type": "ping"}) for _ in range(3)))
+            return session, peak
+        
+        session, peak = asyncio.run(replay())
+        starts = [message["start"] for message in messages if message["type"] == "segment"]
+        summaries = [message for message in messages if message["type"] == "summary"]
+        final = [message for message in messages if message["type"] != "ping"][-1]
+        chunk_prompts = [prompt for prompt in llm.prompts if "TRANSCRIPT SECTION" in prompt]
+        
+        if (starts == list(range(0, 180, 5)) and summaries and final["type"] == "final"
+                and final["analysis"]["success"] and peak <= 31 * BYTES_PER_SECOND
+                and len(chunk_prompts) <= session.stats["chunks"] and sending["overlaps"] == 0):
+            print(f"✅ {len(starts)} segments, {len(summaries)} running summaries, "
+                  f"{len(chunk_prompts)} chunk calls for {session.stats['chunks']} chunks")
+            return True
+        else:
+            print(f"❌ Segments {starts}, {len(summaries)} summaries, final {final.get('type')}, "
+                  f"peak buffer {peak}, {len(chunk_prompts)} chunk calls, {sending['overlaps']} overlapping sends")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Live session error: {e}")
+        return False
+
+@checked
+def test_batch_processing():
+    """Test that a batch run writes every file once and resumes after an interruption"""
+    try:
+        print("Testing batch processing...")
+        import asyncio
+        import subprocess
+        import tempfile
+        from services.batch import BatchCheckpoint, BatchRunner, JsonlWriter, discover, file_key
+        from services.document_processor import DocumentProcessor
+        
+        class FakeWhisper:
+            def transcribe(self, audio):
+                # Like whisper's transcribe(): segments, but no "duration" key
+                return {"text": "Recorded standup about the launch.", "language": "en",
+                        "segments": [{"start": 0.0, "end": 42.5, "text": "Recorded standup about the launch."}]}
+        
+        class FakePools:
+            cpu_workers = 2
+            def __init__(self):
+                self.extracted = []
+                self.processor = DocumentProcessor()
+                self.processor._get_whisper_model = lambda whisper_model=None: FakeWhisper()
+            
+            async def process_file(self, filepath, content_hash=None, decoded_audio=None, whisper_model=None):
+                self.extracted.append(filepath)
+                if filepath.endswith(".wav"):
+                    # Batch passes no decoded audio: the real extraction path, with a fake model
+                    return self.processor._process_audio(filepath, decoded_audio, whisper_model)
+                text = Path(filepath).read_text()
+                return {"success": True, "file_type": "text", "cleaned_transcript": text,
+                        "chunks": [{"start": 0, "end": len(text)}], "metadata": {}}
+            
+            async def run_io(self, func, *args):
+                return await asyncio.to_thread(func, *args)
+        
+        class FakeChain:
+            def process_chunks(self, chunks, analysis_type="comprehensive", use_cache=True, text=None):
+                return {"success": True, "comprehensive_summary": f"Summary of {len(chunks)} chunk(s)"}
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(12):
+                Path(tmp, f"meeting-{i:02d}.txt").write_text(f"Meeting {i} notes about the roadmap.")
+            Path(tmp, "notes.xyz").write_text("ignored")
+            Path(tmp, "standup.wav").write_bytes(b"RIFF")
+            items = list(discover(tmp))
+            output = os.path.join(tmp, "out", "results.jsonl")
+            
+            def run(pools, batch):
+                runner = BatchRunner(
+                    pools, FakeChain(), JsonlWriter(output), BatchCheckpoint(output + ".checkpoint.db"),
+                    lambda text: len(text) // 4, report=lambda line: None
+                )
+                return asyncio.run(runner.run(batch))
+            
+            # Interrupted after 5 files, the 6th written but not checkpointed yet
+            run(FakePools(), items[:5])
+            with open(output, "a") as results:
+                results.write(json.dumps({"key": file_key(items[5]["path"]), "path": items[5]["path"],
+                                          "analysis": {"comprehensive_summary": "Summary of 1 chunk(s)"}}) + "\n")
+            resumed = FakePools()
+            stats = run(resumed, items)
+            with open(output) as results:
+                records = [json.loads(line) for line in results]
+            
+            # A misspelled analysis type fails before extraction instead of writing a "done" record
+            Path(tmp, "typo.txt").write_text("Notes.")
+            misspelled = FakePools()
+            typo_stats = run(misspelled, [{"path": str(Path(tmp, "typo.txt")), "analysis_type": "sumary"}])
+            cli = subprocess.run(
+                [sys.executable, "batch.py", tmp, "--output", output, "--analysis-type", "sumary"],
+                cwd=Path(__file__).parent, capture_output=True, text=True
+            )
+        
+        paths = [record["path"] for record in records]
+        audio = [record for record in records if record["path"].endswith(".wav")]
+        if (len(items) == 13 and len(records) == 13 and len(set(paths)) == 13
+                and stats["skipped"] == 6 and len(resumed.extracted) == 7
+                and all(record["analysis"]["comprehensive_summary"] for record in records)
+                and len(audio) == 1 and audio[0]["duration"] == 42.5 and stats["audio_seconds"] == 42.5
+                and typo_stats["failed"] == 1 and not misspelled.extracted
+                and cli.returncode == 2 and "invalid choice" in cli.stderr):
+            print(f"✅ 13 files written once; resumed run skipped {stats['skipped']} finished files")
+            return True
+        else:
+            print(f"❌ {len(records)} records for {len(items)} files, stats {stats}, resumed {len(resumed.extracted)}, "
+                  f"misspelled type {typo_stats}, CLI exit {cli.returncode}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Batch processing error: {e}")
+        return False
+
+@checked
+def test_text_cleaning():
+    """Test the single-pass cleaner's rules and that streaming cleaning matches whole-text cleaning"""
+    try:
+        print("Testing transcript cleaning...")
+        from services.document_processor import DocumentProcessor
+        from services.text_cleaning import TextCleaner
+        
+        cleaner = TextCleaner()
+        cleaned = cleaner.clean("Um, so  we reviewed , the drum, budget .\n\nUH, you know, the plan you know the plan uh-huh")
+        expected = "so we reviewed, the drum, budget. the plan you know the plan uh-huh"
+        
+        segments = ["Welcome  everyone", ", um, let's start.", "uh,", "First\titem , the roadmap"]
+        streamed = "".join(cleaner.clean_segments(segments))
+        
+        # Punctuation after leading fillers goes with them
+        leading = [cleaner.clean(text) for text in ("Um um um. Yes", "Uh? Right", " um  , ok", "...and so")]
+        
+        custom = DocumentProcessor(cleaner=TextCleaner(fillers=["basically", "like"], comma_fillers=[]))
+        custom_cleaned = custom._clean_text("It's basically, like, done um, today")
+        
+        if (cleaned == expected and streamed == cleaner.clean(" ".join(segments))
+                and leading == ["Yes", "Right", "ok", "...and so"]
+                and custom_cleaned == "It's done um, today"
+                and custom._cache_settings(".txt") != DocumentProcessor()._cache_settings(".txt")):
+            print(f"✅ Cleaned in one pass: {cleaned!r}")
+            return True
+        else:
+            print(f"❌ Unexpected cleaning: {cleaned!r}, streamed {streamed!r}, leading {leading}, custom {custom_cleaned!r}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Text cleaning error: {e}")
+        return False
+
+@checked
+def test_transcript_handles():
+    """Test offset chunks, the streaming chunker's offsets and slicing them for the map stage"""
+    try:
+        print("Testing transcript handles...")
+        from services.document_processor import DocumentProcessor
+        from services.streaming_transcription import IncrementalChunker
+        from services.summarization_chain import SummarizationChain
+        
+        processor = DocumentProcessor()
+        text = " ".join(f"Point {i} on the hiring plan." for i in range(600))
+        chunks = processor._split_text(text)
+        offsets_only = all("content" not in chunk and chunk["length"] == chunk["end"] - chunk["start"] for chunk in chunks)
+        
+        pieces = [f"Sentence {i} about the quarterly plan" if i % 5 else ", and more." for i in range(400)]
+        chunker = IncrementalChunker(processor)
+        streamed = [chunk for piece in pieces for chunk in chunker.add(piece)] + chunker.finish()
+        joined = "".join(processor.cleaner.join_cleaned(pieces))
+        offsets_match = all(joined[chunk["start"]:chunk["end"]] == chunk["content"] for chunk in streamed)
+        
+        class RecordingLLM:
+            def __init__(self):
+                self.prompts = []
+            def generate(self, prompt, use_cache=True):
+                self.prompts.append(prompt)
+                return "Summary"
+        
+        chain = SummarizationChain(gemini_api_key="test-key")
+        chain.llm = RecordingLLM()
+        chain.final_input_tokens = 100  # force the map stage; the three partial summaries still fit
+        result = chain.process_chunks(chunks[:3], "topics", text=text)
+        sliced = all(any(text[c["start"]:c["end"]] in p for p in chain.llm.prompts) for c in chunks[:3])
+        
+        if offsets_only and len(streamed) > 1 and offsets_match and result["success"] and sliced:
+            print(f"✅ {len(chunks)} offset chunks, {len(streamed)} streamed chunks sliced from one transcript")
+            return True
+        else:
+            print(f"❌ Unexpected handles: offsets={offsets_only} streamed={offsets_match} "
+                  f"sliced={sliced}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Transcript handle error: {e}")
+        return False
+
+@checked
+def test_transcript_store():
+    """Test that stored transcripts persist across instances and are evicted by size, count and age"""
+    try:
+        print("Testing transcript store...")
+        import tempfile
+        import time
+        from services.transcript_store import TranscriptStore
+        
+        text = "We agreed on the launch date. " * 100
+        chunks = [{"start": 0, "end": 1500, "length": 1500, "tokens": 375, "content": text[:1500]},
+                  {"start": 1350, "end": len(text), "length": len(text) - 1350, "tokens": 400}]
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "transcripts.db")
+            transcript_id = TranscriptStore(db_path).put(text, chunks, {"duration": 42.0})
+            # A new instance (restart or another worker) sees the same entry
+            entry = TranscriptStore(db_path).get(transcript_id)
+            
+            store = TranscriptStore(db_path, max_entries=2)
+            for meeting in ("Second", "Third"):
+                time.sleep(0.01)
+                store.put(f"{meeting} meeting notes.", [])
+            evicted_by_count = store.get(transcript_id) is None
+            deleted = store.delete(store.make_id("Third meeting notes.")) and store.stats()["entries"] == 1
+            
+            small = TranscriptStore(max_bytes=len(text) + 10)
+            first = small.put(text, chunks)
+            small.put("x" + text, chunks)
+            expiring = TranscriptStore(ttl_seconds=0.01)
+            expired_id = expiring.put("short", [])
+            time.sleep(0.02)
+        
+        if (entry and entry["text"] == text and entry["metadata"] == {"duration": 42.0}
+                and all("content" not in chunk for chunk in entry["chunks"]) and evicted_by_count and deleted
+                and small.get(first) is None and small.stats()["entries"] == 1 and expiring.get(expired_id) is None):
+            print(f"✅ Transcript reloaded from SQLite with {len(entry['chunks'])} chunk offsets, evictions work")
+            return True
+        else:
+            print(f"❌ Unexpected store state: entry={bool(entry)} count={evicted_by_count} "
+                  f"deleted={deleted} small={small.stats()}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Transcript store error: {e}")
+        return False
+
+@checked
+def test_request_models():
+    """Test request validation limits and that typed responses serialize like the plain dicts"""
+    try:
+        print("Testing request/response models...")
+        from pydantic import ValidationError
+        from models import meeting_models
+        from models.meeting_models import ProcessRequest, SummaryRequest, SummaryResponse
+        from services.serialization import dumps
+        from services.summarization_chain import SummarizationChain
+        
+        rejected = []
+        for body in ({"transcript": "Notes", "analysis_type": "poem"},
+                     {"transcript": "x" * (meeting_models.MAX_TRANSCRIPT_CHARS + 1)},
+                     {"chunks": [{"start": 0, "end": 10}]}):
+            try:
+                (ProcessRequest if "chunks" in body else SummaryRequest)(**body)
+            except ValidationError as e:
+                rejected.append(e.errors()[0]["loc"])
+        accepted = SummaryRequest(transcript_id="abc", analysis_type="all")
+        offsets_with_id = ProcessRequest(transcript_id="abc", chunks=[{"start": 0, "end": 10}])
+        
+        result = {
+            "success": True, "analysis_type": "topics", "topic_analysis": "Roadmap — Q3 ✅",
+            "llm_calls": {"map": 2, "reduce": 0, "final": 1, "total": 3}, "reduce_levels": 0,
+            "chunk_results": [{"success": True, "chunk_index": i, "summary": f"Part {i}", "reused": False,
+                               "input_length": 10, "latency": 0.1} for i in range(2)],
+            "speaker_count": 3
+        }
+        typed = json.loads(SummaryResponse.model_validate(result).model_dump_json(exclude_none=True))
+        encoded = json.loads(dumps(result))
+        
+        types = SummarizationChain(gemini_api_key="test-key").get_summary_types()
+        if (len(rejected) == 3 and accepted.transcript is None and offsets_with_id.chunks
+                and typed == result and encoded == result and "all" in types):
+            print(f"✅ Rejected {rejected}; typed response matches the plain dict")
+            return True
+        else:
+            print(f"❌ Unexpected validation: rejected={rejected}, typed={typed}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Request model error: {e}")
+        return False
+
+@checked
+def test_tracing_metrics():
+    """Test that pipeline stages land in the request trace and in the /metrics histograms"""
+    try:
+        print("Testing tracing and metrics...")
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        from services import tracing
+        from services.document_processor import DocumentProcessor
+        from services.metrics import REGISTRY
+        from services.summarization_chain import SummarizationChain
+        
+        class StaticLLM:
+            def generate(self, prompt, use_cache=True):
+                return "Summary of the discussion."
+        
+        chain = SummarizationChain(gemini_api_key="test-key")
+        chain.llm = StaticLLM()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "notes.txt"
+            path.write_text("Um, the team reviewed the roadmap and the hiring plan. " * 2000, encoding="utf-8")
+            with tracing.trace() as request_trace:
+                extracted = DocumentProcessor().process_file(str(path))
+                result = chain.process_chunks(extracted["chunks"], "all", text=extracted["cleaned_transcript"])
+                # Worker processes send their stage totals back with the result
+                tracing.record_stages({"whisper.transcribe": 1.5})
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    def io_task():
+                        with tracing.span("io.task"):
+                            pass
+                    executor.submit(tracing.in_context(io_task)).result()
+            breakdown = request_trace.breakdown(include_spans=True)
+        
+        stages = breakdown["stages"]
+        expected = ["read.text", "clean", "split", "map.chunk", "prompt.format", "section.comprehensive_summary",
+                    "section.topic_analysis", "whisper.transcribe", "io.task"]
+        missing = [name for name in expected if name not in stages]
+        metrics = REGISTRY.render()
+        if (result["success"] and not missing and stages["map.chunk"]["count"] == len(extracted["chunks"])
+                and 'meeting_stage_seconds_bucket{stage="map.chunk",le="+Inf"}' in metrics
+                and 'meeting_stage_seconds_count{stage="clean"}' in metrics
+                and request_trace.server_timing().count("dur=") == len(stages)):
+            print(f"✅ Traced {len(stages)} stages over {len(breakdown['spans'])} spans in {breakdown['total_seconds']}s")
+            return True
+        else:
+            print(f"❌ Missing stages {missing}: {sorted(stages)}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Tracing error: {e}")
+        return False
+
+@checked
+def test_http_endpoints():
+    """Test /upload/stream, /transcripts, /summarize/stream, /jobs and /metrics through the app with the stub LLM backend"""
+    try:
+        print("Testing HTTP endpoints...")
+        try:
+            from fastapi.testclient import TestClient
+        except ImportError:
+            return skipped("FastAPI is not installed")
+        import tempfile
+        import time
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # main reads its settings at import time: offline LLM, throwaway stores, one worker process
+            settings = {
+                "LLM_BACKEND": "stub", "LLM_STUB_LATENCY": "0", "LLM_REQUESTS_PER_MINUTE": "0",
+                "JOB_DB_PATH": str(Path(temp_dir) / "jobs.db"), "EXTRACTION_CACHE_DIR": "",
+                "SUMMARY_STORE_DB": "", "TRANSCRIPT_STORE_DB": "", "MODEL_METRICS_DIR": "", "CPU_POOL_SIZE": "1"
+            }
+            saved = {name: os.environ.get(name) for name in settings}
+            os.environ.update(settings)
+            try:
+                import main as app_module
+            finally:
+                for name, value in saved.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+            
+            text = "The team agreed to ship the release on Friday. Priya owns the rollout plan. " * 40
+            uploads_before = set(Path(app_module.UPLOAD_FOLDER).iterdir())
+            with TestClient(app_module.app) as client:
+                upload = client.post("/upload/stream", params={"filename": "notes.txt"}, content=text.encode())
+                transcript_id = upload.json().get("transcript_id")
+                handle = client.get(f"/transcripts/{transcript_id}").json()
+                full = client.get(f"/transcripts/{transcript_id}", params={"include_text": True}).json()
+                missing = client.get("/transcripts/unknown").status_code
+                
+                stream = client.post("/summarize/stream", json={"transcript_id": transcript_id})
+                events = [
+                    json.loads(line[len("data: "):]) for line in stream.text.splitlines() if line.startswith("data: ")
+                ]
+                
+                misspelled = client.post(
+                    "/jobs", files={"file": ("agenda.txt", text.encode(), "text/plain")}, data={"analysis_type": "sumary"}
+                )
+                job = client.post("/jobs", files={"file": ("agenda.txt", text.encode(), "text/plain")}).json()
+                for _ in range(200):
+                    status = client.get(job["status_url"]).json()
+                    if status["state"] in ("completed", "failed"):
+                        break
+                    time.sleep(0.05)
+                
+                metrics = client.get("/metrics")
+            # Uploads are deleted once they are processed
+            leftover_uploads = sorted(path.name for path in set(Path(app_module.UPLOAD_FOLDER).iterdir()) - uploads_before)
+        
+        if (upload.status_code == 200 and "text" not in handle and full.get("text", "").strip() == text.strip()
+                and missing == 404 and stream.headers["content-type"].startswith("text/event-stream")
+                and events and events[-1]["event"] == "done" and any(event["event"] == "token" for event in events)
+                and status["state"] == "completed" and status["result"]["transcript_id"]
+                and misspelled.status_code == 422 and "analysis_type" in misspelled.json()["error"]
+                and metrics.status_code == 200 and 'route="/upload/stream"' in metrics.text
+                and not leftover_uploads):
+            print(f"✅ Upload, transcript handle, {len(events)} SSE events, job and metrics over HTTP")
+            return True
+        else:
+            print(f"❌ Unexpected responses: upload={upload.status_code} missing={missing} "
+                  f"events={[event['event'] for event in events][-3:]} job={status['state']} "
+                  f"metrics={metrics.status_code} leftover={leftover_uploads}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ HTTP endpoint error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🧪 Testing Enhanced Meeting Summarizer")
@@ -148,15 +1528,44 @@ def main():
         test_document_processor,
         test_summarization_chain,
         test_text_processing,
-        test_summarization
+        test_summarization,
+        test_concurrent_chunk_map,
+        test_parallel_all_sections,
+        test_job_queue,
+        test_extraction_cache,
+        test_llm_response_cache,
+        test_streaming_summary,
+        test_streaming_ingestion,
+        test_hierarchical_map_reduce,
+        test_token_budget_chunking,
+        test_streaming_transcription,
+        test_parallel_transcription,
+        test_model_registry,
+        test_lazy_imports,
+        test_broken_process_pool,
+        test_async_llm_client,
+        test_request_coalescing,
+        test_combined_sections,
+        test_incremental_summarization,
+        test_live_session,
+        test_batch_processing,
+        test_text_cleaning,
+        test_transcript_handles,
+        test_transcript_store,
+        test_request_models,
+        test_tracing_metrics,
+        test_http_endpoints
     ]
     
     passed = 0
     total = len(tests)
     
     for test in tests:
-        if test():
-            passed += 1
+        try:
+            if test():
+                passed += 1
+        except AssertionError:
+            pass
         print()
     
     print("=" * 50)